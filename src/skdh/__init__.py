@@ -29,16 +29,34 @@ __minimum_version__ = "0.9.10"
 from skdh.pipeline import Pipeline
 from skdh.base import BaseProcess, handle_process_returns
 
-from skdh import utility
-from skdh import io
-from skdh import preprocessing
-from skdh import sleep
-from skdh import activity
-from skdh import gait_old
-from skdh import gait
-from skdh import sit2stand
-from skdh import features
-from skdh import context
+# subpackages are imported on first attribute access (PEP 562), so that
+# `import skdh` does not pay for importing every submodule and their
+# dependencies (matplotlib, lightgbm, pywavelets, etc) up front
+_submodules = [
+    "utility",
+    "io",
+    "preprocessing",
+    "sleep",
+    "activity",
+    "gait_old",
+    "gait",
+    "sit2stand",
+    "features",
+    "context",
+]
+
+
+def __getattr__(name):
+    if name in _submodules:
+        import importlib
+
+        return importlib.import_module(f"skdh.{name}")
+    raise AttributeError(f"module 'skdh' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules))
+
 
 __skdh_version__ = __version__
 
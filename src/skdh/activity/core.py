@@ -24,13 +24,12 @@ from numpy import (
     full,
     arange,
 )
-import matplotlib
-from matplotlib.backends.backend_pdf import PdfPages
-import matplotlib.lines as mlines
-import matplotlib.pyplot as plt
 
 from skdh.base import BaseProcess, handle_process_returns
-from skdh.utility.internal import get_day_index_intersection
+from skdh.utility.internal import (
+    get_day_index_intersection,
+    get_days_index_intersection,
+)
 from skdh.activity.cutpoints import get_level_thresholds, get_metric
 from skdh.activity import endpoints as ept
 from skdh.activity.endpoints import ActivityEndpoint
@@ -147,6 +146,9 @@ class ActivityLevelClassification(BaseProcess):
 
     act_levels = ["MVPA", "sed", "light", "mod", "vig"]
 
+    _plan_work = 4.2
+    _plan_memory = 20.0
+
     def __init__(
         self,
         short_wlen=5,
@@ -306,6 +308,9 @@ class ActivityLevelClassification(BaseProcess):
             return
 
         # move this inside here so that it doesnt effect everything on load
+        import matplotlib
+        import matplotlib.pyplot as plt
+
         if gettrace() is None:  # only set if not debugging
             matplotlib.use("PDF")  # non-interactiv, dont want to spam plots
         plt.style.use("ggplot")
@@ -397,6 +402,24 @@ class ActivityLevelClassification(BaseProcess):
         # =============================================================================
         # PROCESSING
         # =============================================================================
+        # get the intersection of wear time (and sleep) with all the days at once
+        days_wear = get_days_index_intersection(
+            *self.wear_idx, True, *self.day_idx  # include wear time
+        )
+        if sleep_starts is not None and sleep_stops is not None:
+            days_wear_wake = get_days_index_intersection(
+                (self.wear_idx[0], sleep_starts),
+                (self.wear_idx[1], sleep_stops),
+                (True, False),  # include wear time, exclude sleeping time
+                *self.day_idx,
+            )
+            days_wear_sleep = get_days_index_intersection(
+                (self.wear_idx[0], sleep_starts),
+                (self.wear_idx[1], sleep_stops),
+                (True, True),  # now we want only sleep
+                *self.day_idx,
+            )
+
         for iday, day_idx in enumerate(zip(*self.day_idx)):
             day_start, day_stop = day_idx
             # update the results dictionary with date strings, # of hours, etc
@@ -404,10 +427,8 @@ class ActivityLevelClassification(BaseProcess):
                 res, time, iday, day_start, day_stop, self.day_key[0]
             )
 
-            # get the intersection of wear time and day
-            dwear_starts, dwear_stops = get_day_index_intersection(
-                *self.wear_idx, True, day_start, day_stop  # include wear time
-            )
+            # intersection of wear time and day
+            dwear_starts, dwear_stops = days_wear[iday]
 
             # PLOTTING. handle here before returning for minimal wear hours, etc
             self._plot_day_accel(
@@ -434,20 +455,8 @@ class ActivityLevelClassification(BaseProcess):
 
             # if there is sleep data, add it to the intersection of indices
             if sleep_starts is not None and sleep_stops is not None:
-                dwear_starts, dwear_stops = get_day_index_intersection(
-                    (self.wear_idx[0], sleep_starts),
-                    (self.wear_idx[1], sleep_stops),
-                    (True, False),  # include wear time, exclude sleeping time
-                    day_start,
-                    day_stop,
-                )
-                sleep_wear_starts, sleep_wear_stops = get_day_index_intersection(
-                    (self.wear_idx[0], sleep_starts),
-                    (self.wear_idx[1], sleep_stops),
-                    (True, True),  # now we want only sleep
-                    day_start,
-                    day_stop,
-                )
+                dwear_starts, dwear_stops = days_wear_wake[iday]
+                sleep_wear_starts, sleep_wear_stops = days_wear_sleep[iday]
 
                 res["N wear wake hours"][iday] = around(
                     sum(dwear_stops - dwear_starts) / fs / 3600, 1
@@ -569,6 +578,9 @@ class ActivityLevelClassification(BaseProcess):
         if self.f is None:
             return
 
+        import matplotlib.lines as mlines
+        import matplotlib.pyplot as plt
+
         f, ax = plt.subplots(
             nrows=4,
             figsize=(12, 6),
@@ -710,6 +722,8 @@ class ActivityLevelClassification(BaseProcess):
         if self.f is None:
             return
 
+        from matplotlib.backends.backend_pdf import PdfPages
+
         date = datetime.today().strftime("%Y%m%d")
         form_fname = self.plot_fname.format(date=date, file=self._file_name)
 
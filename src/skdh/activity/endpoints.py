@@ -31,7 +31,7 @@ from numpy import (
 )
 from scipy.stats import linregress
 
-from skdh.utility import moving_mean, get_windowed_view, DFA
+from skdh.utility import moving_mean, DFA
 from skdh.utility import fragmentation_endpoints as fe
 from skdh.utility.internal import rle
 from skdh.activity.cutpoints import get_level_thresholds
@@ -1040,11 +1040,8 @@ class SignalFeatures(ActivityEndpoint):
         if wlen > accel_metric.size:
             return
 
-        # get a windowed view of the acceleration metric
-        metric_w = get_windowed_view(accel_metric, wlen, skip, ensure_c_contiguity=True)
-
-        # compute the features
-        feats = self.bank.compute(metric_w, fs=1 / epoch_s, axis=1)
+        # compute the features for the windows of the acceleration metric
+        feats = self.bank.compute_windows(accel_metric, wlen, skip, fs=1 / epoch_s)
 
         self.vals.append(feats)
 
@@ -12,6 +12,7 @@ from numpy.linalg import norm
 from scipy.signal import butter, sosfiltfilt
 
 from skdh.utility import moving_mean
+from skdh.utility.internal import get_derived_signal
 
 
 __all__ = [
@@ -67,7 +68,9 @@ def metric_en(accel, wlen, *args, **kwargs):
     en : numpy.ndarray
         (N, ) array of euclidean norms.
     """
-    return moving_mean(norm(accel, axis=1), wlen, wlen)
+    return get_derived_signal(
+        "moving_mean", get_derived_signal("magnitude", accel), w_len=wlen, skip=wlen
+    )
 
 
 def metric_enmo(accel, wlen, *args, take_abs=False, trim_zero=True, **kwargs):
@@ -91,7 +94,7 @@ def metric_enmo(accel, wlen, *args, take_abs=False, trim_zero=True, **kwargs):
     enmo : numpy.ndarray
         (N, ) array of euclidean norms minus 1.
     """
-    enmo = norm(accel, axis=1) - 1
+    enmo = get_derived_signal("magnitude", accel) - 1
     if take_abs:
         enmo = abs(enmo)
     if trim_zero:
@@ -211,8 +214,10 @@ def metric_mad(accel, wlen, *args, **kwargs):
     mad : numpy.ndarray
         (N, ) array of computed MAD values.
     """
-    acc_norm = norm(accel, axis=1)
-    r_avg = repeat(moving_mean(acc_norm, wlen, wlen), wlen)
+    acc_norm = get_derived_signal("magnitude", accel)
+    r_avg = repeat(
+        get_derived_signal("moving_mean", acc_norm, w_len=wlen, skip=wlen), wlen
+    )
 
     mad = moving_mean(abs(acc_norm[: r_avg.size] - r_avg), wlen, wlen)
     return mad
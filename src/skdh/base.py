@@ -10,7 +10,6 @@ import logging
 from pathlib import Path
 import functools
 
-from pandas import DataFrame
 from numpy import array
 
 
@@ -89,6 +88,16 @@ class BaseProcess:
     _temp = "temperature"
     _days = "day_ends"
 
+    # cost model used by `Pipeline.plan`. Work is the processing time per input
+    # sample, relative to the reference benchmark (an 8th order zero-phase filter
+    # of 3-axis data). Memory is the peak working memory used by the process, and
+    # output the memory added to the pipeline data, both in bytes per input sample.
+    # Set `_plan_upcast` if the process converts compact raw data to float64.
+    _plan_work = 2.0
+    _plan_memory = 48.0
+    _plan_output = 0.0
+    _plan_upcast = False
+
     def __str__(self):
         return self._cls_name
 
@@ -124,6 +133,7 @@ class BaseProcess:
         self._in_pipeline = False  # initialize to false.  Will be set by the pipeline
         self.pipe_save_file = None  # initialize to None, will be set/used by pipeline
         self.pip_plot_file = None  # will be set/used by Pipeline only
+        self.pipe_writer = None  # will be set/used by Pipeline only
 
         self._kw = kwargs
 
@@ -201,9 +211,9 @@ class BaseProcess:
             msg = f"[{self!s}] Wear detection not provided. Assuming 100% wear time."
             self.wear_idx = self._check_if_idx_none(wear, msg, 0, n)
 
-    def save_results(self, results, file_name):
+    def save_results(self, results, file_name, writer=None):
         """
-        Save the results of the processing pipeline to a csv file
+        Save the results of the processing pipeline to a file.
 
         Parameters
         ----------
@@ -211,6 +221,11 @@ class BaseProcess:
             Dictionary of results from the output of predict
         file_name : str
             File name. Can be optionally formatted (see Notes)
+        writer : {None, skdh.io.writers.ResultWriter}, optional
+            Writer to use to save the results. Default is None, which will use
+            the pipeline writer if set, or otherwise infer the writer from the
+            suffix of `file_name` (eg ".parquet", ".feather"), defaulting to
+            CSV.
 
         Notes
         -----
@@ -222,31 +237,51 @@ class BaseProcess:
         """
         # avoid circular import
         from skdh import __skdh_version__ as skdh_version
+        from skdh.io.writers import get_writer
 
         date = dt_date.today().strftime("%Y%m%d")
         version = skdh_version.replace(".", "")
 
         file_name = file_name.format(date=date, file=self._file_name, version=version)
 
-        kw_line = [f"{k}: {self._kw[k]}".replace(",", "  ") for k in self._kw]
-
-        # get the information to save
-        lines = [
-            "Scikit-Digital-Health\n",
-            f"Version,{skdh_version}\n",
-            f"Date,{date}\n",
-            ",".join(kw_line),
-            "\n",
-            "\n",
-        ]
+        if writer is None:
+            writer = self.pipe_writer
+        if writer is None:
+            writer = get_writer(file_name)
 
-        with open(file_name, "w") as f:
-            f.writelines(lines)
+        metadata = {
+            "version": skdh_version,
+            "date": date,
+            "process": self._cls_name,
+            "file": self._file_name,
+            "parameters": self._kw,
+        }
 
-        DataFrame(results).to_csv(file_name, index=False, mode="a")
+        writer.write(results, file_name, metadata)
 
         return file_name
 
+    def _plan_inspect(self, file):
+        """
+        Inspect an input file without reading the data, for use by
+        :meth:`skdh.Pipeline.plan`. Implemented by processes that read files.
+
+        Parameters
+        ----------
+        file : {str, Path}
+            Path to the file to inspect.
+
+        Returns
+        -------
+        info : {None, dict}
+            None if the process does not read files. Otherwise a dictionary with
+            the number of samples (`n_samples`), sampling frequency (`fs`, None if
+            unknown), and the estimated size of the data read into memory in
+            bytes (`nbytes`). Optionally also the peak working memory used while
+            reading, in bytes (`memory`), if it depends on the file.
+        """
+        return None
+
     def _setup_plotting(self, save_name):
         """
         Setup plotting. If this needs to be available to the end user, it should be aliased as
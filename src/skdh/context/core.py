@@ -3,11 +3,10 @@ from importlib import resources
 
 import numpy as np
 from scipy.signal import butter, sosfiltfilt
-import lightgbm as lgb
 
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.utility import get_windowed_view
-from skdh.utility.internal import apply_resample, rle
+from skdh.utility.internal import apply_resample, rle, get_derived_signal
 from skdh.features import (
     Bank,
     Mean,
@@ -84,11 +83,19 @@ class Ambulation(BaseProcess):
     ----------
     pthresh : float
         Probability threshold for the classifier.
+    downsample_polyphase : bool, optional
+        Downsample to 20Hz with a polyphase filter, which is faster for rational,
+        non-integer downsampling factors (eg 50 -> 20Hz), but gives slightly
+        different results. Default is False.
     """
 
-    def __init__(self, pthresh=0.65):
-        super().__init__(pthresh=pthresh)
+    _plan_work = 5.4
+    _plan_memory = 75.0
+
+    def __init__(self, pthresh=0.65, downsample_polyphase=False):
+        super().__init__(pthresh=pthresh, downsample_polyphase=downsample_polyphase)
         self.pthresh = pthresh
+        self.polyphase = downsample_polyphase
 
     @handle_process_returns(results_to_kwargs=False)
     def predict(self, time, accel, **kwargs):
@@ -112,7 +119,7 @@ class Ambulation(BaseProcess):
             and unix timestamps.
         """
         # check that input matches expectations, downsample to 20hz if necessary
-        time_ds, accel_ds, fs = self._check_input(time, accel)
+        time_ds, accel_ds, fs = self._check_input(time, accel, polyphase=self.polyphase)
 
         # load model
         model = self._load_model("ambulation_model.txt")
@@ -168,8 +175,8 @@ class Ambulation(BaseProcess):
         """
         Preprocess acceleration signal:
 
-            1. Construct a non-overlapping 3-second-windowed view of the data.
-            2. Compute signal vector magnitude.
+            1. Compute signal vector magnitude.
+            2. Construct a non-overlapping 3-second-windowed view of the data.
             3. High-pass filter with cutoff at 0.25hz.
 
         Parameters
@@ -183,11 +190,9 @@ class Ambulation(BaseProcess):
             Preprocessed signal.
 
         """
-        c_contiguous = np.ascontiguousarray(accel)
-        windowed_accel = get_windowed_view(c_contiguous, 60, 60)
-
-        # Vector magnitude
-        x_mag = np.linalg.norm(windowed_accel, axis=2)
+        # Vector magnitude, shared with any other steps using the same data
+        mag = np.ascontiguousarray(get_derived_signal("magnitude", accel))
+        x_mag = get_windowed_view(mag, 60, 60)
 
         # High-pass filter at .25hz
         sos = butter(N=1, Wn=[2 * 0.25 / 20.0], btype="highpass", output="sos")
@@ -270,7 +275,7 @@ class Ambulation(BaseProcess):
         return features.T, names
 
     @staticmethod
-    def _check_input(time, accel):
+    def _check_input(time, accel, polyphase=False):
         """
         Checks that input meets requirements (see class docstring). Downsamples data >20hz to 20hz.
 
@@ -280,6 +285,8 @@ class Ambulation(BaseProcess):
             Numpy array of unix timestamps. Units of seconds.
         accel : array-like
             Numpy array of triaxial accelerometer data.
+        polyphase : bool, optional
+            Downsample with a polyphase filter. Default is False.
 
         Returns
         -------
@@ -315,6 +322,7 @@ class Ambulation(BaseProcess):
                 goal_fs=20.0,
                 data=(accel,),
                 fs=fs,
+                polyphase=polyphase,
             )
         else:
             time_ds = time
@@ -343,6 +351,8 @@ class Ambulation(BaseProcess):
         model : object
 
         """
+        import lightgbm as lgb
+
         # load the classification model
         lgb_file = str(_resolve_path("skdh.context.model", model_path))
         model = lgb.Booster(model_file=lgb_file)
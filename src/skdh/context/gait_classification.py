@@ -5,6 +5,7 @@ Lukas Adamowicz
 Copyright (c) 2023, Pfizer Inc. All rights reserved.
 """
 
+from functools import lru_cache
 from sys import version_info
 from warnings import warn
 
@@ -18,13 +19,11 @@ from numpy import (
     arange,
     concatenate,
 )
-from numpy.linalg import norm
 from scipy.signal import butter, sosfiltfilt
-import lightgbm as lgb
 
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.utility.exceptions import LowFrequencyError
-from skdh.utility.internal import apply_resample, rle
+from skdh.utility.internal import apply_resample, rle, get_derived_signal
 from skdh.utility.windowing import get_windowed_view
 
 from skdh.features import Bank
@@ -46,6 +45,14 @@ def _resolve_path(mod, file):
     return path
 
 
+@lru_cache(maxsize=None)
+def _load_bank(file):
+    """
+    Compiled feature bank from the model files, only loaded once per process.
+    """
+    return Bank(_resolve_path("skdh.context.model", file)).compile()
+
+
 class PredictGaitLumbarLgbm(BaseProcess):
     """
     Process lumbar acceleration data to predict bouts of gait using a Light Gradient
@@ -58,14 +65,23 @@ class PredictGaitLumbarLgbm(BaseProcess):
     downsample_aa_filter : bool, optional
         Apply an anti-aliasing filter when downsampling accelerometer data. Default
         is True.
+    downsample_polyphase : bool, optional
+        Downsample with a polyphase filter, which is faster for rational, non-integer
+        downsampling factors (eg 75 -> 50Hz), but gives slightly different results.
+        Only used with `downsample_aa_filter`. Default is False.
     """
 
-    def __init__(self, downsample_aa_filter=True):
+    _plan_work = 20.7
+    _plan_memory = 40.0
+
+    def __init__(self, downsample_aa_filter=True, downsample_polyphase=False):
         super().__init__(
             downsample_aa_filter=downsample_aa_filter,
+            downsample_polyphase=downsample_polyphase,
         )
 
         self.downsample_aa_filter = downsample_aa_filter
+        self.downsample_polyphase = downsample_polyphase
 
     @handle_process_returns(results_to_kwargs=False)
     def predict(self, *, time, accel, fs=None, **kwargs):
@@ -125,6 +141,7 @@ class PredictGaitLumbarLgbm(BaseProcess):
                 indices=(),
                 aa_filter=self.downsample_aa_filter,
                 fs=fs,
+                polyphase=self.downsample_polyphase,
             )
         else:
             time_ds = time
@@ -140,20 +157,23 @@ class PredictGaitLumbarLgbm(BaseProcess):
 
         # band pass filter
         sos = butter(1, [2 * 0.25 / fs, 2 * 5.0 / fs], btype="band", output="sos")
-        accel_filt = ascontiguousarray(sosfiltfilt(sos, norm(accel_ds, axis=1)))
+        accel_filt = ascontiguousarray(
+            sosfiltfilt(sos, get_derived_signal("magnitude", accel_ds))
+        )
 
         # window data, data will already be c-contiguous
         accel_w = get_windowed_view(accel_filt, wlen, wstep, ensure_c_contiguity=False)
 
-        # get the feature bank
-        feat_bank = Bank()  # data is already windowed
-        feat_bank.load(_resolve_path("skdh.context.model", "gait_final_features.json"))
+        # get the feature bank, data is already windowed
+        feat_bank = _load_bank("gait_final_features.json")
 
         # compute the features
         accel_feats = feat_bank.compute(accel_w, fs=goal_fs, axis=1, index_axis=None)
         # output shape is (18, 99), need to transpose when passing to classifier
 
         # load the classification model
+        import lightgbm as lgb
+
         lgb_file = str(
             _resolve_path(
                 "skdh.context.model", f"lgbm_gait_classifier_no-stairs_{suffix}.lgbm"
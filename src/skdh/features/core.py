@@ -7,14 +7,27 @@ Copyright (c) 2021. Pfizer Inc. All rights reserved.
 
 from abc import ABC, abstractmethod
 from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 import json
+from os import cpu_count
 from warnings import warn
 
 from pandas import DataFrame
-from numpy import float_, asarray, zeros, sum, moveaxis
+from numpy import (
+    float_,
+    asarray,
+    ascontiguousarray,
+    zeros,
+    sum,
+    moveaxis,
+    cumsum,
+    issubdtype,
+    number,
+)
+from numpy.lib.stride_tricks import sliding_window_view
 
 
-__all__ = ["Bank"]
+__all__ = ["Bank", "CompiledBank"]
 
 
 class ArrayConversionError(Exception):
@@ -57,6 +70,20 @@ def normalize_indices(nfeat, index):
         return IndexError(f"Index type ({type(index)}) not understood.")
 
 
+def index_key(index):
+    """
+    Hashable key for an index, so that features with the same index can be grouped.
+    """
+    if isinstance(index, slice):
+        return "slice", index.start, index.stop, index.step
+    elif isinstance(index, Sequence):
+        return "seq", tuple(index)
+    elif isinstance(index, (int, type(Ellipsis))):
+        return index
+    else:  # iterators can only be used once, never group them
+        return "id", id(index)
+
+
 def normalize_axes(ndim, axis, ind_axis):
     """
     Normalize input axes to be positive/correct for how the swapping has to work
@@ -228,8 +255,158 @@ class Bank:
             # add it to the feature bank
             self.add(getattr(lib, name)(**params), index=index)
 
+    def compile(self):
+        """
+        Compile the feature Bank into an immutable execution plan, that can be reused
+        for many computations (and sent to worker processes) without re-planning.
+
+        Returns
+        -------
+        bank : CompiledBank
+            Compiled copy of the feature Bank.
+        """
+        return CompiledBank(self)
+
+    def _duplicates(self, indices):
+        """
+        Features that have the same parameters and index as an earlier feature in the
+        Bank, and are only computed once.
+
+        Parameters
+        ----------
+        indices : list
+            Index for each feature.
+
+        Returns
+        -------
+        copies : dict
+            Position of the earlier feature for the position of each duplicate.
+        """
+        first = {}
+        copies = {}
+        for i, ft in enumerate(self._feats):
+            key = (repr(ft), index_key(indices[i]))
+            if key in first:
+                copies[i] = first[key]
+            else:
+                first[key] = i
+        return copies
+
+    def _resolve(self, indices):
+        """
+        Execution plan without the duplicate features, and the duplicates to copy
+        afterwards.
+        """
+        copies = self._duplicates(indices)
+        return self._plan(indices, skip=copies), copies
+
+    def _plan(self, indices, skip=()):
+        """
+        Execution plan for computing the features. Features that share an intermediate
+        result (see `Feature._shared_key`) and have the same index are grouped, so that
+        the intermediate result is only computed once for each window.
+
+        Parameters
+        ----------
+        indices : list
+            Index for each feature.
+        skip : container, optional
+            Positions of features to leave out of the plan.
+
+        Returns
+        -------
+        plan : list
+            List of `(fn, members)` steps, where `members` are the positions of the
+            features in the Bank, and `fn` computes all of them together, or is None
+            if they are computed individually.
+        """
+        plan = []
+        groups = {}
+        for i, ft in enumerate(self._feats):
+            if i in skip:
+                continue
+            key = ft._shared_key()
+            if key is None:
+                plan.append((None, [i]))
+                continue
+
+            gkey = (key, index_key(indices[i]))
+            if gkey not in groups:
+                groups[gkey] = (key[0], [])
+                plan.append(groups[gkey])
+            groups[gkey][1].append(i)
+
+        return plan
+
+    @staticmethod
+    def _copy_duplicates(copies, starts, n_feats, feats):
+        """
+        Fill in the features that were only computed once.
+        """
+        for i, j in copies.items():
+            feats[starts[i] : starts[i] + n_feats[i]] = feats[starts[j] : starts[j + 1]]
+
+    def _compute_plan(self, plan, x, fs, indices, starts, n_feats, feats):
+        """
+        Compute the features in `plan` for `x` (index axis first, if any, and
+        computation axis last), writing into `feats`.
+        """
+        for fn, members in plan:
+            if fn is None or len(members) == 1:
+                res = [
+                    self._feats[i].compute(x[indices[i]], fs=fs, axis=-1)
+                    for i in members
+                ]
+            else:
+                # shared intermediate, members all have the same index
+                res = fn([self._feats[i] for i in members], x[indices[members[0]]], fs)
+
+            for i, r in zip(members, res):
+                if self._feats[i]._n_out > 1:
+                    # values of the feature, each for all the indices
+                    r = r.reshape((n_feats[i],) + feats.shape[1:])
+                feats[starts[i] : starts[i] + n_feats[i]] = r
+
+    @staticmethod
+    def _run_chunks(call, n_rows, n_jobs, chunk_size):
+        """
+        Call `call(rows)` for chunks of `n_rows` rows, from `chunk_size`, or one chunk
+        per thread, using `n_jobs` threads.
+        """
+        if n_jobs is None or n_jobs == -1:
+            n_jobs = cpu_count() or 1
+
+        if chunk_size is None:
+            # one chunk per thread
+            n_chunks = max(min(n_jobs, n_rows), 1)
+            bounds = [n_rows * i // n_chunks for i in range(n_chunks + 1)]
+        else:
+            if chunk_size < 1:
+                raise ValueError("`chunk_size` must be at least 1.")
+            bounds = list(range(0, n_rows, chunk_size)) + [n_rows]
+        chunks = [slice(i, j) for i, j in zip(bounds[:-1], bounds[1:])]
+
+        n_jobs = min(n_jobs, len(chunks))
+        if n_jobs <= 1:
+            for rows in chunks:
+                call(rows)
+        else:
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                # list to re-raise any errors from the threads
+                list(pool.map(call, chunks))
+
     def compute(
-        self, signal, fs=1.0, *, axis=-1, index_axis=None, indices=None, columns=None
+        self,
+        signal,
+        fs=1.0,
+        *,
+        axis=-1,
+        index_axis=None,
+        indices=None,
+        columns=None,
+        n_jobs=1,
+        chunk_size=None,
+        out=None,
     ):
         """
         Compute the specified features for the given signal
@@ -253,11 +430,25 @@ class Bank:
             `Bank.add`. Default is None, which will use indices from `Bank.add`.
         columns : {None, list}, optional
             Columns to use if providing a dataframe. Default is None (uses all columns).
+        n_jobs : {int, None}, optional
+            Number of threads to use, splitting the first axis other than the computation
+            and index axes (eg the windows) between them. Feature extensions release the
+            GIL, so the splits are computed in parallel. None or -1 uses all available
+            CPUs. Default is 1.
+        chunk_size : {None, int}, optional
+            Number of rows of the first axis other than the computation and index axes (eg
+            the windows) to compute at once. Memory used in computing the features is then
+            proportional to `chunk_size`, instead of to the length of the signal, and
+            strided views (eg from `get_windowed_view`) are only copied a chunk at a time.
+            Default is None, which computes all the rows at once (or one chunk per thread).
+        out : {None, numpy.ndarray}, optional
+            Writeable float64 array with the shape of the computed features to write
+            them into, instead of allocating a new array. Default is None.
 
         Returns
         -------
         feats : numpy.ndarray
-            Computed features.
+            Computed features. `out` if provided.
         """
         # standardize the input signal
         if isinstance(signal, DataFrame):
@@ -265,7 +456,10 @@ class Bank:
             x = signal[columns].values.astype(float_)
         else:
             try:
-                x = asarray(signal, dtype=float_)
+                x = asarray(signal)
+                # numeric arrays are converted a chunk at a time
+                if chunk_size is None or not issubdtype(x.dtype, number):
+                    x = asarray(x, dtype=float_)
             except ValueError as e:
                 raise ArrayConversionError("Error converting signal to ndarray") from e
 
@@ -283,9 +477,9 @@ class Bank:
         if index_axis is None:
             # don't have to move any other axes than the computation axis
             x = moveaxis(x, axis, -1)
-            # number of feats is 1 per
-            n_feats = [1] * len(self)
-            feats = zeros((sum(n_feats),) + x.shape[:-1], dtype=float_)
+            # number of feats is the number of values each feature computes
+            n_feats = [ft._n_out for ft in self._feats]
+            shape = (sum(n_feats),) + x.shape[:-1]
         else:
             # move both the computation and index axis. do this in two steps to allow for undoing
             # just the index axis swap later. The index_axis has been adjusted appropriately
@@ -294,18 +488,52 @@ class Bank:
             x = moveaxis(x, index_axis, 0)
 
             n_feats = []
-            for ind in indices:
-                n_feats.append(get_n_feats(x.shape[0], ind))
+            for ft, ind in zip(self._feats, indices):
+                n_feats.append(get_n_feats(x.shape[0], ind) * ft._n_out)
 
-            feats = zeros((sum(n_feats),) + x.shape[1:-1], dtype=float_)
+            shape = (sum(n_feats),) + x.shape[1:-1]
 
-        feat_i = 0  # keep track of where in the feature array we are
-        for i, ft in enumerate(self._feats):
-            feats[feat_i : feat_i + n_feats[i]] = ft.compute(
-                x[indices[i]], fs=fs, axis=-1
+        if out is None:
+            feats = zeros(shape, dtype=float_)
+        else:
+            if out.dtype != float_ or not out.flags.writeable:
+                raise ValueError("`out` must be a writeable float64 array.")
+            if out.ndim != len(shape):
+                raise ValueError(f"`out` must have {len(shape)} dimensions.")
+            # same order as `x`, undone by the final axis move
+            feats = out if index_axis is None else moveaxis(out, index_axis, 0)
+            if feats.shape != shape:
+                raise ValueError("`out` does not have the shape of the features.")
+
+        # where each feature starts in the feature array
+        starts = cumsum([0] + n_feats)
+
+        plan, copies = self._resolve(indices)
+
+        # axis of `x` to split into chunks, which is always axis 1 of `feats`
+        split_axis = 0 if index_axis is None else 1
+
+        if x.ndim <= split_axis + 1:
+            # nothing to split
+            self._compute_plan(
+                plan, asarray(x, dtype=float_), fs, indices, starts, n_feats, feats
             )
+        else:
+
+            def call(rows):
+                # only convert the chunk, so that strided views are not copied as a whole
+                xc = asarray(x[(slice(None),) * split_axis + (rows,)], dtype=float_)
+                # each chunk is written into its own slice of the feature array
+                self._compute_plan(
+                    plan, xc, fs, indices, starts, n_feats, feats[:, rows]
+                )
+
+            self._run_chunks(call, x.shape[split_axis], n_jobs, chunk_size)
 
-            feat_i += n_feats[i]
+        self._copy_duplicates(copies, starts, n_feats, feats)
+
+        if out is not None:
+            return out
 
         # Move the shape back to the correct one.
         # only have to do this if there is an index axis, because otherwise the array is still in
@@ -315,6 +543,221 @@ class Bank:
 
         return feats
 
+    def compute_windows(
+        self,
+        signal,
+        window_length,
+        step,
+        fs=1.0,
+        *,
+        axis=-1,
+        index_axis=None,
+        indices=None,
+        columns=None,
+        n_jobs=1,
+        chunk_size=None,
+    ):
+        """
+        Compute the specified features for sliding windows of the given signal.
+
+        The result is the same as computing the features for the windowed signal (eg
+        from `get_windowed_view`), with the windows replacing `axis`. With overlapping
+        windows, features that allow it (eg the moments, range, mean cross rate, and
+        linear slope) are updated as the window slides instead of being computed from
+        scratch for every window, which takes time proportional to the signal length
+        instead of to the number of windows times their length.
+
+        Parameters
+        ----------
+        signal : {array-like}
+            Array-like signal to have features computed for.
+        window_length : int
+            Number of samples in each window.
+        step : int
+            Number of samples between the starts of consecutive windows.
+        fs : float, optional
+            Sampling frequency in Hz. Default is 1Hz
+        axis : int, optional
+            Axis along which to window the signal and compute the features. Default is
+            -1.
+        index_axis : {None, int}, optional
+            Axis corresponding to the indices specified in `Bank.add` or `indices`. See
+            :meth:`Bank.compute`. Default is None.
+        indices : {None, int, list-like, slice, ellipsis}, optional
+            Indices to apply to the input signal. See :meth:`Bank.compute`. Default is
+            None, which will use indices from `Bank.add`.
+        columns : {None, list}, optional
+            Columns to use if providing a dataframe. Default is None (uses all columns).
+        n_jobs : {int, None}, optional
+            Number of threads to use for the features computed separately for each
+            window, splitting the windows between them. None or -1 uses all available
+            CPUs. Default is 1.
+        chunk_size : {None, int}, optional
+            Number of windows to compute at once for the features computed separately
+            for each window. Default is None, which computes all the windows at once (or
+            one chunk per thread).
+
+        Returns
+        -------
+        feats : numpy.ndarray
+            Computed features.
+
+        Examples
+        --------
+        >>> bank = Bank()
+        >>> bank.add([Mean(), StdDev(), Range(), DominantFrequency()])
+        >>> x = np.random.random(3000)
+        >>> bank.compute_windows(x, 150, 15, fs=50.0).shape
+        (4, 191)
+        """
+        if window_length < 1 or step < 1:
+            raise ValueError("`window_length` and `step` must be at least 1.")
+
+        # standardize the input signal
+        if isinstance(signal, DataFrame):
+            columns = columns if columns is not None else signal.columns
+            x = signal[columns].values.astype(float_)
+        else:
+            try:
+                x = asarray(signal, dtype=float_)
+            except ValueError as e:
+                raise ArrayConversionError("Error converting signal to ndarray") from e
+
+        axis, index_axis = normalize_axes(x.ndim, axis, index_axis)
+
+        if index_axis is None:
+            indices = [...] * len(self)
+        else:
+            if indices is None:
+                indices = self._indices
+            else:
+                indices = normalize_indices(len(self), indices)
+
+        # same order as in `compute`, with the windows last instead of the samples
+        x = moveaxis(x, axis, -1)
+        if index_axis is None:
+            n_feats = [ft._n_out for ft in self._feats]
+            shape = (sum(n_feats),) + x.shape[:-1]
+        else:
+            x = moveaxis(x, index_axis, 0)
+            n_feats = []
+            for ft, ind in zip(self._feats, indices):
+                n_feats.append(get_n_feats(x.shape[0], ind) * ft._n_out)
+            shape = (sum(n_feats),) + x.shape[1:-1]
+
+        if window_length > x.shape[-1]:
+            raise ValueError("Window length is larger than the computation axis.")
+        n_windows = (x.shape[-1] - window_length) // step + 1
+
+        feats = zeros(shape + (n_windows,), dtype=float_)
+        starts = cumsum([0] + n_feats)
+
+        plan, copies = self._resolve(indices)
+
+        # features updated as the window slides, only worth it if the windows overlap
+        separate = set()
+        for i, ft in enumerate(self._feats):
+            if i in copies:
+                continue
+            r = None
+            if step < window_length:
+                r = ft._compute_windows(x[indices[i]], window_length, step, fs)
+            if r is None:
+                separate.add(i)
+                continue
+            if ft._n_out > 1:
+                r = r.reshape((n_feats[i],) + feats.shape[1:])
+            feats[starts[i] : starts[i] + n_feats[i]] = r
+
+        # the remaining features, for each window
+        plan = [
+            (fn, [i for i in members if i in separate])
+            for fn, members in plan
+            if any(i in separate for i in members)
+        ]
+
+        if plan:
+            # windows before the samples
+            xw = sliding_window_view(x, window_length, axis=-1)[..., ::step, :]
+
+            def call(rows):
+                # only copy the windows of the chunk
+                xc = ascontiguousarray(xw[..., rows, :])
+                self._compute_plan(
+                    plan, xc, fs, indices, starts, n_feats, feats[..., rows]
+                )
+
+            self._run_chunks(call, n_windows, n_jobs, chunk_size)
+
+        self._copy_duplicates(copies, starts, n_feats, feats)
+
+        # windows in place of `axis`, and the features in place of the index axis
+        if index_axis is None:
+            return moveaxis(feats, -1, axis + 1)
+        feats = moveaxis(feats, -1, 1 + axis - int(index_axis < axis))
+        return moveaxis(feats, 0, index_axis + int(index_axis >= axis))
+
+
+class CompiledBank(Bank):
+    """
+    An immutable feature bank with a precomputed execution plan, created with
+    :meth:`Bank.compile`.
+
+    Features with the same parameters and index are only computed once, features that
+    share intermediate results are grouped, and the feature names are cached, so that a
+    compiled bank can be reused for many computations, and pickled to send to worker
+    processes, without reloading or re-planning.
+
+    Parameters
+    ----------
+    bank : Bank
+        Feature bank to compile.
+
+    Examples
+    --------
+    >>> bank = Bank("bank.json").compile()
+    >>> bank.names
+    ('Mean()', 'StdDev()')
+    """
+
+    __slots__ = ("_names", "_resolved")
+
+    def __str__(self):
+        return "CompiledBank"
+
+    def __init__(self, bank):
+        self._feats = tuple(bank._feats)
+        self._indices = tuple(bank._indices)
+        self._names = tuple(repr(ft) for ft in self._feats)
+        # plans for the indices from `Bank.add`, and for no index axis
+        self._resolved = {
+            "bank": super()._resolve(self._indices),
+            "all": super()._resolve([...] * len(self._feats)),
+        }
+
+    @property
+    def names(self):
+        """
+        Names of the features, in order.
+        """
+        return self._names
+
+    def add(self, features, index=None):
+        raise TypeError("A compiled Bank cannot be modified.")
+
+    def load(self, file):
+        raise TypeError("A compiled Bank cannot be modified.")
+
+    def compile(self):
+        return self
+
+    def _resolve(self, indices):
+        if indices is self._indices:
+            return self._resolved["bank"]
+        if all(ind is Ellipsis for ind in indices):
+            return self._resolved["all"]
+        return super()._resolve(indices)
+
 
 class Feature(ABC):
     """
@@ -347,6 +790,34 @@ class Feature(ABC):
     def __init__(self, **params):
         self._params = params
 
+    @property
+    def _n_out(self):
+        """
+        Number of values the feature computes for each signal (eg each window). These
+        are stacked along a new first axis of the result of `compute`.
+        """
+        return 1
+
+    def _compute_windows(self, x, w_len, step, fs):
+        """
+        Compute the feature for sliding windows along the last axis of `x` in
+        :meth:`Bank.compute_windows`, updating the result as the window slides instead
+        of computing each window from scratch. Returns the results with a trailing axis
+        for the windows (after a leading axis for the values, if `_n_out > 1`), or None
+        if the feature is computed separately for each window.
+        """
+        return None
+
+    def _shared_key(self):
+        """
+        Key for features that are computed together from a shared intermediate result
+        (eg the power spectrum) in :meth:`Bank.compute`. Either None, or a tuple whose
+        first item is a function `fn(feats, x, fs)` returning the stacked results of
+        `feats` for `x` (computation axis last). Features with equal keys and indices
+        are computed in one call.
+        """
+        return None
+
     @abstractmethod
     def compute(self, signal, fs=1.0, *, axis=-1):
         """
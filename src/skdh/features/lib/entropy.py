@@ -108,6 +108,9 @@ class SampleEntropy(Feature):
     The distance metric used is the Chebyshev distance, which is defined as the maximum
     absolute value of the sample-by-sample difference between two sets of the same length
 
+    Matching pairs of sets are counted using the sorted samples, instead of comparing all
+    pairs of sets, which gives identical results in much less time for long signals.
+
     References
     ----------
     .. [1] https://archive.physionet.org/physiotools/sampen/c/sampen.c
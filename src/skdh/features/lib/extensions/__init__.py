@@ -1,8 +1,17 @@
-from skdh.features.lib.extensions.statistics import autocorrelation, linear_regression
+from skdh.features.lib.extensions.statistics import (
+    autocorrelation,
+    autocorrelation_lags,
+    linear_regression,
+    linear_slope_windows,
+    mean_cross_rate_windows,
+    moment_features,
+    moment_windows,
+)
 from skdh.features.lib.extensions.smoothness import (
     jerk_metric,
     dimensionless_jerk_metric,
     SPARC,
+    SPARC_segments,
 )
 from skdh.features.lib.extensions.misc_features import (
     complexity_invariant_distance,
@@ -15,10 +24,12 @@ from skdh.features.lib.extensions.frequency import (
     power_spectral_sum,
     spectral_entropy,
     spectral_flatness,
+    spectral_features,
 )
 from skdh.features.lib.extensions.entropy import (
     signal_entropy,
     sample_entropy,
+    sample_entropy_pairwise,
     permutation_entropy,
 )
 from skdh.features.lib.extensions._utility import (
@@ -32,10 +43,16 @@ from skdh.features.lib.extensions._utility import (
 
 __all__ = [
     "autocorrelation",
+    "autocorrelation_lags",
     "linear_regression",
+    "linear_slope_windows",
+    "mean_cross_rate_windows",
+    "moment_features",
+    "moment_windows",
     "jerk_metric",
     "dimensionless_jerk_metric",
     "SPARC",
+    "SPARC_segments",
     "complexity_invariant_distance",
     "range_count",
     "ratio_beyond_r_sigma",
@@ -44,7 +61,9 @@ __all__ = [
     "power_spectral_sum",
     "spectral_entropy",
     "spectral_flatness",
+    "spectral_features",
     "signal_entropy",
     "sample_entropy",
+    "sample_entropy_pairwise",
     "permutation_entropy",
 ]
@@ -3,11 +3,17 @@
 #include "Python.h"
 #include "numpy/arrayobject.h"
 
+/* strided lane iteration */
+#include "lanes.h"
+
 #include <stdio.h>
 #include <stdlib.h>
 
 extern void signal_entropy_1d(long *, double *, double *);
 extern void sample_entropy_1d(long *, double *, long *, double *, double *);
+extern void sample_entropy_pairwise_1d(long *, double *, long *, double *, double *);
+
+typedef void (*sample_entropy_kernel)(long *, double *, long *, double *, double *);
 extern void permutation_entropy_1d(long *, double *, long *, long *, int *, double *);
 
 
@@ -19,7 +25,7 @@ PyObject * signal_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -45,16 +51,23 @@ PyObject * signal_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            signal_entropy_1d(&stride, dptr, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                signal_entropy_1d(&stride, lanes_get(&xl), rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -68,17 +81,12 @@ PyObject * signal_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 }
 
 
-PyObject * sample_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
-    long L;
-    double r;
+static PyObject * sample_entropy_lanes(PyObject *x_, long L, double r, sample_entropy_kernel kernel){
     int fail = 0;
 
-    if (!PyArg_ParseTuple(args, "Old:sample_entropy", &x_, &L, &r)) return NULL;
-
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -104,16 +112,23 @@ PyObject * sample_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            sample_entropy_1d(&stride, dptr, &L, &r, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                kernel(&stride, lanes_get(&xl), &L, &r, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -127,6 +142,29 @@ PyObject * sample_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 }
 
 
+PyObject * sample_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_;
+    long L;
+    double r;
+
+    if (!PyArg_ParseTuple(args, "Old:sample_entropy", &x_, &L, &r)) return NULL;
+
+    return sample_entropy_lanes(x_, L, r, sample_entropy_1d);
+}
+
+
+/* comparing all pairs of sets, for validation of `sample_entropy` */
+PyObject * sample_entropy_pairwise(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_;
+    long L;
+    double r;
+
+    if (!PyArg_ParseTuple(args, "Old:sample_entropy_pairwise", &x_, &L, &r)) return NULL;
+
+    return sample_entropy_lanes(x_, L, r, sample_entropy_pairwise_1d);
+}
+
+
 PyObject * permutation_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
     PyObject *x_;
     long order, delay;
@@ -139,7 +177,7 @@ PyObject * permutation_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -165,16 +203,23 @@ PyObject * permutation_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            permutation_entropy_1d(&stride, dptr, &order, &delay, &normalize, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                permutation_entropy_1d(&stride, lanes_get(&xl), &order, &delay, &normalize, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -190,6 +235,7 @@ PyObject * permutation_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
 static struct PyMethodDef methods[] = {
     {"signal_entropy",   signal_entropy,   1, NULL},
     {"sample_entropy",   sample_entropy,   1, NULL},
+    {"sample_entropy_pairwise",   sample_entropy_pairwise,   1, NULL},
     {"permutation_entropy",   permutation_entropy,   1, NULL},  // last is test__doc__
     {NULL, NULL, 0, NULL}          /* sentinel */
 };
@@ -3,389 +3,202 @@
 #include "Python.h"
 #include "numpy/arrayobject.h"
 
+/* strided lane iteration */
+#include "lanes.h"
+
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
 
-extern void dominant_freq_1d(long *, double *, double *, long *, double *, double *, double *);
-extern void dominant_freq_value_1d(long *, double *, double *, long *, double *, double *, double *);
-extern void power_spectral_sum_1d(long *, double *, double *, long *, double *, double *, double *);
-extern void spectral_entropy_1d(long *, double *, double *, long *, double *, double *, double *);
-extern void spectral_flatness_1d(long *, double *, double *, long *, double *, double *, double *);
-extern void destroy_plan(void);
-
-
-PyObject * dominant_frequency(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
-    long padlevel;
-    double fs = 0., low_cut=0., hi_cut=12.;
+extern void power_spectrum_1d(void *, long *, double *, long *, double *);
+extern void spectral_feature_1d(long *, double *, double *, long *, double *, double *, double *);
+extern void *new_plan(void);
+extern void free_plan(void *);
+
+
+/*
+Compute `nk` spectral features from one power spectrum (FFT) per lane of `x_`. `kinds` are
+0: dominant frequency, 1: dominant frequency value, 2: power spectral sum,
+3: spectral entropy, 4: spectral flatness. Results have a leading axis for the features,
+which is dropped if `squeeze`.
+*/
+static PyObject * spectral_lanes(
+    PyObject *x_, double fs, long padlevel, npy_intp nk, long *kinds, double *low_cut,
+    double *hi_cut, int squeeze
+){
     int fail = 0;
 
-    if (!PyArg_ParseTuple(args, "Odldd:dominant_frequency", &x_, &fs, &padlevel, &low_cut, &hi_cut)) return NULL;
-
     if (fs <= 0.){
         PyErr_SetString(PyExc_ValueError, "Sampling frequency cannot be negative");
         return NULL;
     }
-    if (hi_cut < low_cut){
-        PyErr_SetString(PyExc_ValueError, "High frequency cutoff cannot be lower than low cutoff");
-        return NULL;
+    for (npy_intp k = 0; k < nk; ++k){
+        if ((kinds[k] < 0) || (kinds[k] > 4)){
+            PyErr_SetString(PyExc_ValueError, "Spectral feature kind not understood");
+            return NULL;
+        }
+        if (hi_cut[k] < low_cut[k]){
+            PyErr_SetString(PyExc_ValueError, "High frequency cutoff cannot be lower than low cutoff");
+            return NULL;
+        }
     }
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
     if (PyArray_SIZE(data) == 0)
     {
         PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
+        Py_XDECREF(data);
         return NULL;
     }
 
     int ndim = PyArray_NDIM(data);
-
     npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc((ndim - 1) * sizeof(npy_intp));
-    if (!rdims){
-        Py_XDECREF(data); return NULL;
-    }
+    npy_intp rdims[NPY_MAXDIMS];
+
+    // leading axis for the features
+    rdims[0] = nk;
     for (int i = 0; i < (ndim - 1); ++i){
-        rdims[i] = ddims[i];
+        rdims[i + 1] = ddims[i];
     }
 
-    PyArrayObject *res = (PyArrayObject *)PyArray_Empty(ndim-1, rdims, PyArray_DescrFromType(NPY_DOUBLE), 0);
-    free(rdims);
+    PyArrayObject *res = (PyArrayObject *)PyArray_EMPTY(
+        ndim - squeeze, rdims + squeeze, NPY_DOUBLE, 0
+    );
 
     long nfft = (long)pow(2, ceil(log((double)ddims[ndim-1]) / log(2.)) - 1 + padlevel);
+    double *sp = (double *)malloc((nfft + 1) * sizeof(double));
+    // FFT plan for this call only, so that calls can run in parallel
+    void *plan = new_plan();
 
     if (!res) fail = 1;
+    if (!fail && (!sp || !plan)){
+        PyErr_NoMemory();
+        fail = 1;
+    }
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            dominant_freq_1d(&stride, dptr, &fs, &nfft, &low_cut, &hi_cut, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            npy_intp nlanes = xl.size;
+
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < nlanes; ++i){
+                // one FFT for all the features
+                power_spectrum_1d(plan, &stride, lanes_get(&xl), &nfft, sp);
+                for (npy_intp k = 0; k < nk; ++k){
+                    spectral_feature_1d(
+                        &nfft, sp, &fs, &kinds[k], &low_cut[k], &hi_cut[k], &rptr[k * nlanes + i]
+                    );
+                }
+                lanes_next(&xl);
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
-    if (fail){
-        Py_XDECREF(data);
-        Py_XDECREF(res);
-        // destroy the FFT plan created in the fortran module
-        destroy_plan();
-        return NULL;
-    }
+    free(sp);
+    free_plan(plan);
     Py_XDECREF(data);
-    // destroy the FFT plan created in the fortran module
-    destroy_plan();
-
-    return (PyObject *)res;
-}
-
-
-PyObject * dominant_frequency_value(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
-    long padlevel;
-    double fs = 0., low_cut=0., hi_cut=12.;
-    int fail = 0;
-
-    if (!PyArg_ParseTuple(args, "Odldd:dominant_frequency_value", &x_, &fs, &padlevel, &low_cut, &hi_cut)) return NULL;
-
-    if (fs <= 0.){
-        PyErr_SetString(PyExc_ValueError, "Sampling frequency cannot be negative");
-        return NULL;
-    }
-    if (hi_cut < low_cut){
-        PyErr_SetString(PyExc_ValueError, "High frequency cutoff cannot be lower than low cutoff");
-        return NULL;
-    }
-
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
-    );
-    if (!data) return NULL;
-    // catch size 0 inputs
-    if (PyArray_SIZE(data) == 0)
-    {
-        PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
-        return NULL;
-    }
-
-    int ndim = PyArray_NDIM(data);
 
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc((ndim - 1) * sizeof(npy_intp));
-    if (!rdims){
-        Py_XDECREF(data); return NULL;
-    }
-    for (int i = 0; i < (ndim - 1); ++i){
-        rdims[i] = ddims[i];
-    }
-
-    PyArrayObject *res = (PyArrayObject *)PyArray_Empty(ndim-1, rdims, PyArray_DescrFromType(NPY_DOUBLE), 0);
-    free(rdims);
-
-    long nfft = (long)pow(2, ceil(log((double)ddims[ndim-1]) / log(2.)) - 1 + padlevel);
-
-    if (!res) fail = 1;
-    if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
-        double *rptr = (double *)PyArray_DATA(res);
-
-        long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            dominant_freq_value_1d(&stride, dptr, &fs, &nfft, &low_cut, &hi_cut, rptr);
-            dptr += stride;
-            rptr ++;
-        }
-    }
     if (fail){
-        Py_XDECREF(data);
         Py_XDECREF(res);
-        // destroy the FFT plan created in the fortran module
-        destroy_plan();
         return NULL;
     }
-    Py_XDECREF(data);
-
-    // destroy the FFT plan created in the fortran module
-    destroy_plan();
 
     return (PyObject *)res;
 }
 
 
-PyObject * power_spectral_sum(PyObject *NPY_UNUSED(self), PyObject *args){
+/* a single spectral feature */
+static PyObject * spectral_feature(PyObject *args, const char *fmt, long kind){
     PyObject *x_;
     long padlevel;
     double fs = 0., low_cut=0., hi_cut=12.;
-    int fail = 0;
-
-    if (!PyArg_ParseTuple(args, "Odldd:power_spectral_sum", &x_, &fs, &padlevel, &low_cut, &hi_cut)) return NULL;
-
-    if (fs <= 0.){
-        PyErr_SetString(PyExc_ValueError, "Sampling frequency cannot be negative");
-        return NULL;
-    }
-    if (hi_cut < low_cut){
-        PyErr_SetString(PyExc_ValueError, "High frequency cutoff cannot be lower than low cutoff");
-        return NULL;
-    }
-
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
-    );
-    if (!data) return NULL;
-    // catch size 0 inputs
-    if (PyArray_SIZE(data) == 0)
-    {
-        PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
-        return NULL;
-    }
-
-    int ndim = PyArray_NDIM(data);
 
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc((ndim - 1) * sizeof(npy_intp));
-    if (!rdims){
-        Py_XDECREF(data); return NULL;
-    }
-    for (int i = 0; i < (ndim - 1); ++i){
-        rdims[i] = ddims[i];
-    }
+    if (!PyArg_ParseTuple(args, fmt, &x_, &fs, &padlevel, &low_cut, &hi_cut)) return NULL;
 
-    PyArrayObject *res = (PyArrayObject *)PyArray_Empty(ndim-1, rdims, PyArray_DescrFromType(NPY_DOUBLE), 0);
-    free(rdims);
+    return spectral_lanes(x_, fs, padlevel, 1, &kind, &low_cut, &hi_cut, 1);
+}
 
-    long nfft = (long)pow(2, ceil(log((double)ddims[ndim-1]) / log(2.)) - 1 + padlevel);
 
-    if (!res) fail = 1;
-    if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
-        double *rptr = (double *)PyArray_DATA(res);
+PyObject * dominant_frequency(PyObject *NPY_UNUSED(self), PyObject *args){
+    return spectral_feature(args, "Odldd:dominant_frequency", 0);
+}
 
-        long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
 
-        for (int i = 0; i < nrepeats; ++i){
-            power_spectral_sum_1d(&stride, dptr, &fs, &nfft, &low_cut, &hi_cut, rptr);
-            dptr += stride;
-            rptr ++;
-        }
-    }
-    if (fail){
-        Py_XDECREF(data);
-        Py_XDECREF(res);
-        // destroy the FFT plan created in the fortran module
-        destroy_plan();
-        return NULL;
-    }
-    Py_XDECREF(data);
+PyObject * dominant_frequency_value(PyObject *NPY_UNUSED(self), PyObject *args){
+    return spectral_feature(args, "Odldd:dominant_frequency_value", 1);
+}
 
-    // destroy the FFT plan created in the fortran module
-    destroy_plan();
 
-    return (PyObject *)res;
+PyObject * power_spectral_sum(PyObject *NPY_UNUSED(self), PyObject *args){
+    return spectral_feature(args, "Odldd:power_spectral_sum", 2);
 }
 
 
 PyObject * spectral_entropy(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
-    long padlevel;
-    double fs = 0., low_cut=0., hi_cut=12.;
-    int fail = 0;
-
-    if (!PyArg_ParseTuple(args, "Odldd:spectral_entropy", &x_, &fs, &padlevel, &low_cut, &hi_cut)) return NULL;
-
-    if (fs <= 0.){
-        PyErr_SetString(PyExc_ValueError, "Sampling frequency cannot be negative");
-        return NULL;
-    }
-    if (hi_cut < low_cut){
-        PyErr_SetString(PyExc_ValueError, "High frequency cutoff cannot be lower than low cutoff");
-        return NULL;
-    }
-
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
-    );
-    if (!data) return NULL;
-    // catch size 0 inputs
-    if (PyArray_SIZE(data) == 0)
-    {
-        PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
-        return NULL;
-    }
-
-    int ndim = PyArray_NDIM(data);
-
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc((ndim - 1) * sizeof(npy_intp));
-    if (!rdims){
-        Py_XDECREF(data); return NULL;
-    }
-    for (int i = 0; i < (ndim - 1); ++i){
-        rdims[i] = ddims[i];
-    }
-
-    PyArrayObject *res = (PyArrayObject *)PyArray_Empty(ndim-1, rdims, PyArray_DescrFromType(NPY_DOUBLE), 0);
-    free(rdims);
-
-    long nfft = (long)pow(2, ceil(log((double)ddims[ndim-1]) / log(2.)) - 1 + padlevel);
-
-    if (!res) fail = 1;
-    if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
-        double *rptr = (double *)PyArray_DATA(res);
-
-        long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            spectral_entropy_1d(&stride, dptr, &fs, &nfft, &low_cut, &hi_cut, rptr);
-            dptr += stride;
-            rptr ++;
-        }
-    }
-    if (fail){
-        Py_XDECREF(data);
-        Py_XDECREF(res);
-        // destroy the FFT plan created in the fortran module
-        destroy_plan();
-        return NULL;
-    }
-    Py_XDECREF(data);
+    return spectral_feature(args, "Odldd:spectral_entropy", 3);
+}
 
-    // destroy the FFT plan created in the fortran module
-    destroy_plan();
 
-    return (PyObject *)res;
+PyObject * spectral_flatness(PyObject *NPY_UNUSED(self), PyObject *args){
+    return spectral_feature(args, "Odldd:spectral_flatness", 4);
 }
 
 
-PyObject * spectral_flatness(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
+/*
+Compute several spectral features from one power spectrum (FFT) per lane. Results have a
+leading axis for the features.
+*/
+PyObject * spectral_features(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_, *kinds_, *low_, *hi_;
     long padlevel;
-    double fs = 0., low_cut=0., hi_cut=12.;
-    int fail = 0;
+    double fs = 0.;
 
-    if (!PyArg_ParseTuple(args, "Odldd:spectral_flatness", &x_, &fs, &padlevel, &low_cut, &hi_cut)) return NULL;
-
-    if (fs <= 0.){
-        PyErr_SetString(PyExc_ValueError, "Sampling frequency cannot be negative");
-        return NULL;
-    }
-    if (hi_cut < low_cut){
-        PyErr_SetString(PyExc_ValueError, "High frequency cutoff cannot be lower than low cutoff");
-        return NULL;
-    }
+    if (!PyArg_ParseTuple(args, "OdlOOO:spectral_features", &x_, &fs, &padlevel, &kinds_, &low_, &hi_)) return NULL;
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
+    PyArrayObject *kinds = (PyArrayObject *)PyArray_FromAny(
+        kinds_, PyArray_DescrFromType(NPY_LONG), 1, 1,
         NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
     );
-    if (!data) return NULL;
-    // catch size 0 inputs
-    if (PyArray_SIZE(data) == 0)
-    {
-        PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
-        return NULL;
-    }
-
-    int ndim = PyArray_NDIM(data);
-
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc((ndim - 1) * sizeof(npy_intp));
-    if (!rdims){
-        Py_XDECREF(data); return NULL;
-    }
-    for (int i = 0; i < (ndim - 1); ++i){
-        rdims[i] = ddims[i];
-    }
-
-    PyArrayObject *res = (PyArrayObject *)PyArray_Empty(ndim-1, rdims, PyArray_DescrFromType(NPY_DOUBLE), 0);
-    free(rdims);
-
-    long nfft = (long)pow(2, ceil(log((double)ddims[ndim-1]) / log(2.)) - 1 + padlevel);
-
-    if (!res) fail = 1;
-    if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
-        double *rptr = (double *)PyArray_DATA(res);
-
-        long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            spectral_flatness_1d(&stride, dptr, &fs, &nfft, &low_cut, &hi_cut, rptr);
-            dptr += stride;
-            rptr ++;
+    PyArrayObject *low = (PyArrayObject *)PyArray_FromAny(
+        low_, PyArray_DescrFromType(NPY_DOUBLE), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+    );
+    PyArrayObject *hi = (PyArrayObject *)PyArray_FromAny(
+        hi_, PyArray_DescrFromType(NPY_DOUBLE), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+    );
+    PyObject *res = NULL;
+
+    if (kinds && low && hi){
+        npy_intp nk = PyArray_SIZE(kinds);
+
+        if ((PyArray_SIZE(low) != nk) || (PyArray_SIZE(hi) != nk)){
+            PyErr_SetString(PyExc_ValueError, "`kinds`, `low_cut`, and `hi_cut` must be the same size");
+        } else {
+            res = spectral_lanes(
+                x_, fs, padlevel, nk, (long *)PyArray_DATA(kinds),
+                (double *)PyArray_DATA(low), (double *)PyArray_DATA(hi), 0
+            );
         }
     }
-    if (fail){
-        Py_XDECREF(data);
-        Py_XDECREF(res);
-        // destroy the FFT plan created in the fortran module
-        destroy_plan();
-        return NULL;
-    }
-    Py_XDECREF(data);
-
-    // destroy the FFT plan created in the fortran module
-    destroy_plan();
+    Py_XDECREF(kinds);
+    Py_XDECREF(low);
+    Py_XDECREF(hi);
 
-    return (PyObject *)res;
+    return res;
 }
 
 
@@ -395,6 +208,7 @@ static struct PyMethodDef methods[] = {
     {"power_spectral_sum",   power_spectral_sum,   1, NULL},
     {"spectral_entropy",   spectral_entropy,   1, NULL},
     {"spectral_flatness",   spectral_flatness,   1, NULL},
+    {"spectral_features",   spectral_features,   1, NULL},
     {NULL, NULL, 0, NULL}          /* sentinel */
 };
 
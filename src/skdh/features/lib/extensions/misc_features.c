@@ -3,6 +3,9 @@
 #include "Python.h"
 #include "numpy/arrayobject.h"
 
+/* strided lane iteration */
+#include "lanes.h"
+
 #include <stdio.h>
 #include <stdlib.h>
 
@@ -24,7 +27,7 @@ PyObject * complexity_invariant_distance(PyObject *NPY_UNUSED(self), PyObject *a
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -50,16 +53,23 @@ PyObject * complexity_invariant_distance(PyObject *NPY_UNUSED(self), PyObject *a
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
-        long stride = ddims[ndim - 1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            cid_1d(&stride, dptr, &norm, rptr);
-            dptr += stride;  // increment data by a column
-            rptr ++;  // move to next result
+        long stride = ddims[ndim-1];
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                cid_1d(&stride, lanes_get(&xl), &norm, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -82,7 +92,7 @@ PyObject * range_count(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -108,16 +118,23 @@ PyObject * range_count(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            range_count_1d(&stride, dptr, &xmin, &xmax, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                range_count_1d(&stride, lanes_get(&xl), &xmin, &xmax, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -140,7 +157,7 @@ PyObject * ratio_beyond_r_sigma(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -166,16 +183,23 @@ PyObject * ratio_beyond_r_sigma(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            ratio_beyond_r_sigma_1d(&stride, dptr, &r, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                ratio_beyond_r_sigma_1d(&stride, lanes_get(&xl), &r, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -2,6 +2,10 @@
 #define PY_SSIZE_T_CLEAN
 #include "Python.h"
 #include "numpy/arrayobject.h"
+#include "numpy/npy_math.h"
+
+/* strided lane iteration */
+#include "lanes.h"
 
 #include <stdio.h>
 #include <stdlib.h>
@@ -9,8 +13,9 @@
 
 extern void jerk_1d(long *, double *, double *, double *);
 extern void dimensionless_jerk_1d(long *, double *, long *, double *);
-extern void sparc_1d(long *, double *, double *, long *, double *, double *, double *);
-extern void destroy_plan(void);
+extern void sparc_1d(void *, long *, double *, double *, long *, double *, double *, double *);
+extern void *new_plan(void);
+extern void free_plan(void *);
 
 PyObject * jerk_metric(PyObject *NPY_UNUSED(self), PyObject *args){
     PyObject *x_;
@@ -21,7 +26,7 @@ PyObject * jerk_metric(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -47,16 +52,23 @@ PyObject * jerk_metric(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            jerk_1d(&stride, dptr, &fs, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                jerk_1d(&stride, lanes_get(&xl), &fs, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -79,7 +91,7 @@ PyObject * dimensionless_jerk_metric(PyObject *NPY_UNUSED(self), PyObject *args)
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -105,16 +117,23 @@ PyObject * dimensionless_jerk_metric(PyObject *NPY_UNUSED(self), PyObject *args)
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            dimensionless_jerk_1d(&stride, dptr, &stype, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                dimensionless_jerk_1d(&stride, lanes_get(&xl), &stype, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -138,7 +157,7 @@ PyObject * SPARC(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -162,37 +181,192 @@ PyObject * SPARC(PyObject *NPY_UNUSED(self), PyObject *args){
     PyArrayObject *res = (PyArrayObject *)PyArray_Empty(ndim-1, rdims, PyArray_DescrFromType(NPY_DOUBLE), 0);
     free(rdims);
 
+    // FFT plan for this call only, so that calls can run in parallel
+    void *plan = new_plan();
+
     if (!res) fail = 1;
+    if (!fail && !plan){
+        PyErr_NoMemory();
+        fail = 1;
+    }
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            sparc_1d(&stride, dptr, &fs, &padlevel, &fc, &amp_thresh, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                sparc_1d(plan, &stride, lanes_get(&xl), &fs, &padlevel, &fc, &amp_thresh, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
+    free_plan(plan);
     if (fail){
         Py_XDECREF(data);
         Py_XDECREF(res);
-        destroy_plan();  // destroy the FFT plan
         return NULL;
     }
     Py_XDECREF(data);
 
-    destroy_plan();  // destroy the FFT plan
     return (PyObject *)res;
 }
 
 
+/* segment with the FFT length it is padded to */
+typedef struct {
+    long nfft;
+    npy_intp i;
+} segment_t;
+
+
+static int compare_segments(const void *a, const void *b)
+{
+    const segment_t *sa = (const segment_t *)a, *sb = (const segment_t *)b;
+
+    if (sa->nfft != sb->nfft)
+        return (sa->nfft < sb->nfft) ? -1 : 1;
+    return (sa->i > sb->i) - (sa->i < sb->i);
+}
+
+
+PyObject * SPARC_segments(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_, *starts_, *stops_;
+    double fs, fc, amp_thresh;
+    long padlevel;
+
+    if (!PyArg_ParseTuple(
+        args, "OOOdldd:SPARC_segments", &x_, &starts_, &stops_, &fs, &padlevel, &fc, &amp_thresh
+    )) return NULL;
+
+    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
+        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+    );
+    PyArrayObject *starts = (PyArrayObject *)PyArray_FromAny(
+        starts_, PyArray_DescrFromType(NPY_LONG), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO | NPY_ARRAY_FORCECAST, NULL
+    );
+    PyArrayObject *stops = (PyArrayObject *)PyArray_FromAny(
+        stops_, PyArray_DescrFromType(NPY_LONG), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO | NPY_ARRAY_FORCECAST, NULL
+    );
+    if (!data || !starts || !stops){
+        Py_XDECREF(data); Py_XDECREF(starts); Py_XDECREF(stops);
+        return NULL;
+    }
+
+    npy_intp n = PyArray_SIZE(data);
+    npy_intp nseg = PyArray_SIZE(starts);
+    long *sptr = (long *)PyArray_DATA(starts);
+    long *eptr = (long *)PyArray_DATA(stops);
+
+    int fail = 0;
+    if (PyArray_SIZE(stops) != nseg){
+        PyErr_SetString(PyExc_ValueError, "`starts` and `stops` must be the same size.");
+        fail = 1;
+    }
+    for (npy_intp k = 0; (k < nseg) && !fail; ++k){
+        if ((sptr[k] < 0) || (eptr[k] > n)){
+            PyErr_SetString(PyExc_ValueError, "Segments must be within the signal.");
+            fail = 1;
+        }
+    }
+
+    PyArrayObject *res = NULL;
+    segment_t *segs = NULL;
+    void *plan = NULL;
+    if (!fail){
+        res = (PyArrayObject *)PyArray_Empty(1, &nseg, PyArray_DescrFromType(NPY_DOUBLE), 0);
+        segs = (segment_t *)malloc((nseg > 0 ? nseg : 1) * sizeof(segment_t));
+        plan = new_plan();
+        if (!res) fail = 1;
+        else if (!segs || !plan){
+            PyErr_NoMemory();
+            fail = 1;
+        }
+    }
+
+    if (!fail){
+        double *x = (double *)PyArray_DATA(data);
+        double *rptr = (double *)PyArray_DATA(res);
+
+        Py_BEGIN_ALLOW_THREADS
+        // group the segments by padded FFT length, so that the plan (and its twiddle
+        // factors) is only made once for each length, instead of for every segment
+        for (npy_intp k = 0; k < nseg; ++k){
+            long len = eptr[k] - sptr[k], nfft = 1;
+            while (nfft < len) nfft <<= 1;
+            segs[k].nfft = nfft << padlevel;
+            segs[k].i = k;
+        }
+        qsort(segs, nseg, sizeof(segment_t), compare_segments);
+
+        for (npy_intp k = 0; k < nseg; ++k){
+            npy_intp i = segs[k].i;
+            long len = eptr[i] - sptr[i];
+
+            if (len < 1){
+                rptr[i] = NPY_NAN;
+                continue;
+            }
+            sparc_1d(plan, &len, x + sptr[i], &fs, &padlevel, &fc, &amp_thresh, &rptr[i]);
+        }
+        Py_END_ALLOW_THREADS
+    }
+
+    free(segs);
+    free_plan(plan);
+    Py_XDECREF(data);
+    Py_XDECREF(starts);
+    Py_XDECREF(stops);
+    if (fail){
+        Py_XDECREF(res);
+        return NULL;
+    }
+
+    return (PyObject *)res;
+}
+
+
+static const char SPARC_segments_doc[] = "SPARC_segments(x, starts, stops, fs, padlevel, fc, amp_thresh)\n\n"
+"SPARC of many segments of a 1D signal, eg strides or transitions, in one call. "
+"Segments are computed grouped by their zero-padded FFT length, so that each FFT plan is "
+"only made once.\n\n"
+"Parameters\n"
+"----------\n"
+"x : numpy.ndarray\n"
+"    1D signal.\n"
+"starts : numpy.ndarray\n"
+"    Start index of each segment.\n"
+"stops : numpy.ndarray\n"
+"    Stop index (exclusive) of each segment.\n"
+"fs : float\n"
+"    Sampling frequency in Hz.\n"
+"padlevel : int\n"
+"    Level of zero-padding for the FFT.\n"
+"fc : float\n"
+"    Frequency cutoff in Hz.\n"
+"amp_thresh : float\n"
+"    Normalized amplitude threshold for the arc length.\n\n"
+"Returns\n"
+"-------\n"
+"sparc : numpy.ndarray\n"
+"    SPARC of each segment, NaN for empty segments.\n";
+
 static struct PyMethodDef methods[] = {
     {"jerk_metric",   jerk_metric,   1, NULL},  // last is test__doc__
     {"dimensionless_jerk_metric", dimensionless_jerk_metric, 1, NULL},
     {"SPARC", SPARC, 1, NULL},
+    {"SPARC_segments", SPARC_segments, 1, SPARC_segments_doc},
     {NULL, NULL, 0, NULL}          /* sentinel */
 };
 
@@ -3,12 +3,22 @@
 #include "Python.h"
 #include "numpy/arrayobject.h"
 
+/* strided lane iteration */
+#include "lanes.h"
+
 #include <stdio.h>
 #include <stdlib.h>
 
 
 extern void autocorr_1d(long *, double *, long *, int *, double *);
 extern void linear_regression_1d(long *, double *, double *, double *);
+extern void moment_features_1d(long *, double *, long *, long *, long *, double *);
+extern void autocorr_lags_1d(void *, long *, double *, long *, long *, int *, int *, long *, double *);
+extern void linear_slope_windows_1d(long *, double *, long *, long *, double *, double *);
+extern void mean_cross_rate_windows_1d(long *, double *, long *, long *, double *);
+extern void moment_windows_1d(long *, double *, long *, long *, long *, double *);
+extern void *new_plan(void);
+extern void free_plan(void *);
 
 
 PyObject * autocorrelation(PyObject *NPY_UNUSED(self), PyObject *args){
@@ -25,7 +35,7 @@ PyObject * autocorrelation(PyObject *NPY_UNUSED(self), PyObject *args){
     }
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
 
@@ -52,16 +62,23 @@ PyObject * autocorrelation(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
-
-        for (int i = 0; i < nrepeats; ++i){
-            autocorr_1d(&stride, dptr, &lag, &norm, rptr);
-            dptr += stride;
-            rptr ++;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                autocorr_1d(&stride, lanes_get(&xl), &lag, &norm, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
         }
     }
     if (fail){
@@ -84,7 +101,7 @@ PyObject * linear_regression(PyObject *NPY_UNUSED(self), PyObject *args){
 
     PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
         x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
     );
     if (!data) return NULL;
     // catch size 0 inputs
@@ -110,33 +127,356 @@ PyObject * linear_regression(PyObject *NPY_UNUSED(self), PyObject *args){
 
     if (!res) fail = 1;
     if (!fail){
-        double *dptr = (double *)PyArray_DATA(data);
         double *rptr = (double *)PyArray_DATA(res);
 
         long stride = ddims[ndim-1];
-        int nrepeats = PyArray_SIZE(data) / stride;
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                linear_regression_1d(&stride, lanes_get(&xl), &fs, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
+        }
+    }
+    if (fail){
+        Py_XDECREF(data);
+        Py_XDECREF(res);
+        return NULL;
+    }
+    Py_XDECREF(data);
+
+    return (PyObject *)res;
+}
+
 
-        for (int i = 0; i < nrepeats; ++i){
-            linear_regression_1d(&stride, dptr, &fs, rptr);
-            dptr += stride;
-            rptr ++;
+
+/*
+Compute the autocorrelation for several lags together, with one call to the kernel per
+lane of `x`. Results have a leading axis for the lags.
+*/
+PyObject * autocorrelation_lags(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_, *lags_;
+    int norm, use_fft;
+    int fail = 0;
+
+    if (!PyArg_ParseTuple(args, "OOpp:autocorrelation_lags", &x_, &lags_, &norm, &use_fft)) return NULL;
+
+    PyArrayObject *lags = (PyArrayObject *)PyArray_FromAny(
+        lags_, PyArray_DescrFromType(NPY_LONG), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+    );
+    if (!lags) return NULL;
+
+    long nl = (long)PyArray_SIZE(lags);
+    long *lptr = (long *)PyArray_DATA(lags);
+    for (long k = 0; k < nl; ++k){
+        if (lptr[k] < 0){
+            PyErr_SetString(PyExc_ValueError, "Lags cannot be negative");
+            Py_XDECREF(lags);
+            return NULL;
         }
     }
+
+    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
+        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
+    );
+    if (!data){
+        Py_XDECREF(lags);
+        return NULL;
+    }
+    // catch size 0 inputs
+    if (PyArray_SIZE(data) == 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
+        Py_XDECREF(lags);
+        Py_XDECREF(data);
+        return NULL;
+    }
+
+    int ndim = PyArray_NDIM(data);
+    npy_intp *ddims = PyArray_DIMS(data);
+    npy_intp rdims[NPY_MAXDIMS];
+
+    // leading axis for the lags
+    rdims[0] = nl;
+    for (int i = 0; i < (ndim - 1); ++i){
+        rdims[i + 1] = ddims[i];
+    }
+
+    PyArrayObject *res = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+    // FFT plan for this call only, so that calls can run in parallel
+    void *plan = use_fft ? new_plan() : NULL;
+
+    if (!res) fail = 1;
+    if (!fail && use_fft && !plan){
+        PyErr_NoMemory();
+        fail = 1;
+    }
+    if (!fail){
+        double *rptr = (double *)PyArray_DATA(res);
+
+        long stride = ddims[ndim-1];
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            // distance between the lags of a lane in the results
+            long ld = (long)xl.size;
+
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                autocorr_lags_1d(plan, &stride, lanes_get(&xl), &nl, lptr, &norm, &use_fft, &ld, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
+        }
+    }
+    free_plan(plan);
+    Py_XDECREF(lags);
+    Py_XDECREF(data);
+
     if (fail){
+        Py_XDECREF(res);
+        return NULL;
+    }
+
+    return (PyObject *)res;
+}
+
+
+/*
+Compute several moment-type and min/max features together, with one call to the kernel per
+lane of `x`. Results have a leading axis for the features.
+*/
+PyObject * moment_features(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_, *kinds_;
+    int fail = 0;
+
+    if (!PyArg_ParseTuple(args, "OO:moment_features", &x_, &kinds_)) return NULL;
+
+    PyArrayObject *kinds = (PyArrayObject *)PyArray_FromAny(
+        kinds_, PyArray_DescrFromType(NPY_LONG), 1, 1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO, NULL
+    );
+    if (!kinds) return NULL;
+
+    long nk = (long)PyArray_SIZE(kinds);
+    long *kptr = (long *)PyArray_DATA(kinds);
+    for (long k = 0; k < nk; ++k){
+        if ((kptr[k] < 0) || (kptr[k] > 6)){
+            PyErr_SetString(PyExc_ValueError, "Moment feature kind not understood");
+            Py_XDECREF(kinds);
+            return NULL;
+        }
+    }
+
+    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
+        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
+    );
+    if (!data){
+        Py_XDECREF(kinds);
+        return NULL;
+    }
+    // catch size 0 inputs
+    if (PyArray_SIZE(data) == 0)
+    {
+        PyErr_SetString(PyExc_ValueError, "Input data size must be larger than 0.");
+        Py_XDECREF(kinds);
         Py_XDECREF(data);
+        return NULL;
+    }
+
+    int ndim = PyArray_NDIM(data);
+    npy_intp *ddims = PyArray_DIMS(data);
+    npy_intp rdims[NPY_MAXDIMS];
+
+    // leading axis for the features
+    rdims[0] = nk;
+    for (int i = 0; i < (ndim - 1); ++i){
+        rdims[i + 1] = ddims[i];
+    }
+
+    PyArrayObject *res = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+
+    if (!res) fail = 1;
+    if (!fail){
+        double *rptr = (double *)PyArray_DATA(res);
+
+        long stride = ddims[ndim-1];
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            // distance between the features of a lane in the results
+            long ld = (long)xl.size;
+
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                moment_features_1d(&stride, lanes_get(&xl), &nk, kptr, &ld, rptr);
+                lanes_next(&xl);
+                rptr ++;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
+        }
+    }
+    Py_XDECREF(kinds);
+    Py_XDECREF(data);
+
+    if (fail){
         Py_XDECREF(res);
         return NULL;
     }
+
+    return (PyObject *)res;
+}
+
+
+/* sliding windows kernels, with a parameter for the linear slope or the moment kind */
+typedef void (*windows_kernel)(long *, double *, long *, long *, double *, long *, double *);
+
+static void linear_slope_windows_k(long *n, double *x, long *wlen, long *skip, double *fs, long *NPY_UNUSED(kind), double *res){
+    linear_slope_windows_1d(n, x, wlen, skip, fs, res);
+}
+
+static void mean_cross_rate_windows_k(long *n, double *x, long *wlen, long *skip, double *NPY_UNUSED(fs), long *NPY_UNUSED(kind), double *res){
+    mean_cross_rate_windows_1d(n, x, wlen, skip, res);
+}
+
+static void moment_windows_k(long *n, double *x, long *wlen, long *skip, double *NPY_UNUSED(fs), long *kind, double *res){
+    moment_windows_1d(n, x, wlen, skip, kind, res);
+}
+
+/*
+Compute a feature for sliding windows along the last axis of `x`, with one call to the
+kernel per lane. Results have a trailing axis for the windows.
+*/
+static PyObject * windows_lanes(PyObject *x_, long wlen, long skip, double fs, long kind, windows_kernel kernel){
+    int fail = 0;
+
+    if ((wlen < 1) || (skip < 1)){
+        PyErr_SetString(PyExc_ValueError, "Window length and skip must be at least 1.");
+        return NULL;
+    }
+
+    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
+        x_, PyArray_DescrFromType(NPY_DOUBLE), 1, 0,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED, NULL
+    );
+    if (!data) return NULL;
+
+    int ndim = PyArray_NDIM(data);
+    npy_intp *ddims = PyArray_DIMS(data);
+
+    if (wlen > ddims[ndim - 1])
+    {
+        PyErr_SetString(PyExc_ValueError, "Window length is larger than the computation axis.");
+        Py_XDECREF(data);
+        return NULL;
+    }
+
+    npy_intp rdims[NPY_MAXDIMS];
+    for (int i = 0; i < (ndim - 1); ++i){
+        rdims[i] = ddims[i];
+    }
+    // trailing axis for the windows
+    long nw = (ddims[ndim - 1] - wlen) / skip + 1;
+    rdims[ndim - 1] = nw;
+
+    PyArrayObject *res = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+
+    if (!res) fail = 1;
+    if (!fail && (PyArray_SIZE(res) > 0)){
+        double *rptr = (double *)PyArray_DATA(res);
+
+        long stride = ddims[ndim-1];
+        // lanes along the last axis, which can have any strides
+        lanes_t xl;
+        fail = lanes_init(&xl, data);
+
+        if (!fail){
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp i = 0; i < xl.size; ++i){
+                kernel(&stride, lanes_get(&xl), &wlen, &skip, &fs, &kind, rptr);
+                lanes_next(&xl);
+                rptr += nw;
+            }
+            Py_END_ALLOW_THREADS
+
+            lanes_free(&xl);
+        }
+    }
     Py_XDECREF(data);
 
+    if (fail){
+        Py_XDECREF(res);
+        return NULL;
+    }
+
     return (PyObject *)res;
 }
 
 
+PyObject * linear_slope_windows(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_;
+    long wlen, skip;
+    double fs;
+
+    if (!PyArg_ParseTuple(args, "Olld:linear_slope_windows", &x_, &wlen, &skip, &fs)) return NULL;
+
+    return windows_lanes(x_, wlen, skip, fs, 0, linear_slope_windows_k);
+}
+
+
+PyObject * mean_cross_rate_windows(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_;
+    long wlen, skip;
+
+    if (!PyArg_ParseTuple(args, "Oll:mean_cross_rate_windows", &x_, &wlen, &skip)) return NULL;
+
+    return windows_lanes(x_, wlen, skip, 1.0, 0, mean_cross_rate_windows_k);
+}
+
+
+PyObject * moment_windows(PyObject *NPY_UNUSED(self), PyObject *args){
+    PyObject *x_;
+    long wlen, skip, kind;
+
+    if (!PyArg_ParseTuple(args, "Olll:moment_windows", &x_, &wlen, &skip, &kind)) return NULL;
+
+    if ((kind < 0) || (kind > 6) || (kind == 4) || (kind == 5)){
+        PyErr_SetString(PyExc_ValueError, "Moment kind must be one of 0, 1, 2, 3, 6.");
+        return NULL;
+    }
+
+    return windows_lanes(x_, wlen, skip, 1.0, kind, moment_windows_k);
+}
+
 
 static struct PyMethodDef methods[] = {
     {"autocorrelation",   autocorrelation,   1, NULL},  // last is test__doc__
     {"linear_regression",   linear_regression,   1, NULL},
+    {"moment_features",   moment_features,   1, NULL},
+    {"autocorrelation_lags",   autocorrelation_lags,   1, NULL},
+    {"linear_slope_windows",   linear_slope_windows,   1, NULL},
+    {"mean_cross_rate_windows",   mean_cross_rate_windows,   1, NULL},
+    {"moment_windows",   moment_windows,   1, NULL},
     {NULL, NULL, 0, NULL}          /* sentinel */
 };
 
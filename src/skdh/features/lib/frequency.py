@@ -17,7 +17,35 @@ __all__ = [
 ]
 
 
-class DominantFrequency(Feature):
+def _compute_spectral(feats, x, fs):
+    """
+    Compute spectral features with the same padding level together, from one power
+    spectrum per window.
+    """
+    return extensions.spectral_features(
+        x,
+        fs,
+        feats[0].pad,
+        [ft._kind for ft in feats],
+        [ft.low_cut for ft in feats],
+        [ft.high_cut for ft in feats],
+    )
+
+
+class _SpectralFeature(Feature):
+    """
+    Base for features computed from the power spectrum. Features with the same padding
+    level share the spectrum when computed in a :class:`skdh.features.Bank`.
+    """
+
+    __slots__ = ()
+    _kind = None  # feature kind in the extension functions
+
+    def _shared_key(self):
+        return _compute_spectral, self.pad
+
+
+class DominantFrequency(_SpectralFeature):
     r"""
     The primary frequency in the signal. Computed using the FFT and finding the maximum value of
     the power spectral density in the specified range of frequencies.
@@ -43,6 +71,7 @@ class DominantFrequency(Feature):
     """
 
     __slots__ = ("pad", "low_cut", "high_cut")
+    _kind = 0
 
     def __init__(self, padlevel=2, low_cutoff=0.0, high_cutoff=5.0):
         super(DominantFrequency, self).__init__(
@@ -78,7 +107,7 @@ class DominantFrequency(Feature):
         )
 
 
-class DominantFrequencyValue(Feature):
+class DominantFrequencyValue(_SpectralFeature):
     r"""
     The power spectral density maximum value. Taken inside the range of frequencies specified.
 
@@ -103,6 +132,7 @@ class DominantFrequencyValue(Feature):
     """
 
     __slots__ = ("pad", "low_cut", "high_cut")
+    _kind = 1
 
     def __init__(self, padlevel=2, low_cutoff=0.0, high_cutoff=5.0):
         super(DominantFrequencyValue, self).__init__(
@@ -138,7 +168,7 @@ class DominantFrequencyValue(Feature):
         )
 
 
-class PowerSpectralSum(Feature):
+class PowerSpectralSum(_SpectralFeature):
     r"""
     Sum of power spectral density values. The sum of power spectral density values in a
     1.0Hz wide band around the primary (dominant) frequency (:math:`f_{dom}\pm 0.5`)
@@ -164,6 +194,7 @@ class PowerSpectralSum(Feature):
     """
 
     __slots__ = ("pad", "low_cut", "high_cut")
+    _kind = 2
 
     def __init__(self, padlevel=2, low_cutoff=0.0, high_cutoff=5.0):
         super(PowerSpectralSum, self).__init__(
@@ -199,7 +230,7 @@ class PowerSpectralSum(Feature):
         )
 
 
-class SpectralFlatness(Feature):
+class SpectralFlatness(_SpectralFeature):
     r"""
     A measure of the "tonality" or resonant structure of a signal. Provides a quantification of
     how tone-like a signal is, as opposed to being noise-like. For this case, tonality is defined
@@ -227,6 +258,7 @@ class SpectralFlatness(Feature):
     """
 
     __slots__ = ("pad", "low_cut", "high_cut")
+    _kind = 4
 
     def __init__(self, padlevel=2, low_cutoff=0.0, high_cutoff=5.0):
         super(SpectralFlatness, self).__init__(
@@ -262,7 +294,7 @@ class SpectralFlatness(Feature):
         )
 
 
-class SpectralEntropy(Feature):
+class SpectralEntropy(_SpectralFeature):
     r"""
     A measure of the information contained in the power spectral density estimate. Similar
     to :py:class:`SignalEntropy` but for the power spectral density.
@@ -288,6 +320,7 @@ class SpectralEntropy(Feature):
     """
 
     __slots__ = ("pad", "low_cut", "high_cut")
+    _kind = 3
 
     def __init__(self, padlevel=2, low_cutoff=0.0, high_cutoff=5.0):
         super(SpectralEntropy, self).__init__(
@@ -5,16 +5,42 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
-from numpy import mean, std, sum, diff, sign
+from numpy import mean, std
 from scipy.stats import skew, kurtosis
 
 from skdh.features.core import Feature
+from skdh.features.lib import extensions
 
 
 __all__ = ["Mean", "MeanCrossRate", "StdDev", "Skewness", "Kurtosis"]
 
 
-class Mean(Feature):
+def _compute_moments(feats, x, fs):
+    """
+    Compute moment-type and min/max features together, with one call to the extension
+    per window.
+    """
+    return extensions.moment_features(x, [ft._kind for ft in feats])
+
+
+class _MomentFeature(Feature):
+    """
+    Base for moment-type and min/max features. These are computed together in a
+    :class:`skdh.features.Bank`, and updated as the window slides in
+    :meth:`skdh.features.Bank.compute_windows`.
+    """
+
+    __slots__ = ()
+    _kind = None  # feature kind in the extension function
+
+    def _shared_key(self):
+        return (_compute_moments,)
+
+    def _compute_windows(self, x, w_len, step, fs):
+        return extensions.moment_windows(x, w_len, step, self._kind)
+
+
+class Mean(_MomentFeature):
     """
     The signal mean.
 
@@ -28,6 +54,7 @@ class Mean(Feature):
     """
 
     __slots__ = ()
+    _kind = 0
 
     def __init__(self):
         super().__init__()
@@ -55,16 +82,20 @@ class Mean(Feature):
         return mean(x, axis=-1)
 
 
-class MeanCrossRate(Feature):
+class MeanCrossRate(_MomentFeature):
     """
     Number of signal mean value crossings. Expressed as a percentage of signal length.
     """
 
     __slots__ = ()
+    _kind = 4
 
     def __init__(self):
         super(MeanCrossRate, self).__init__()
 
+    def _compute_windows(self, x, w_len, step, fs):
+        return extensions.mean_cross_rate_windows(x, w_len, step)
+
     def compute(self, signal, *, axis=-1, **kwargs):
         """
         compute(signal, *, axis=-1)
@@ -86,13 +117,12 @@ class MeanCrossRate(Feature):
         """
         x = super().compute(signal, axis=axis)
 
-        x_nomean = x - mean(x, axis=-1, keepdims=True)
-        mcr = sum(diff(sign(x_nomean), axis=-1) != 0, axis=-1)
-
-        return mcr / x.shape[-1]  # shape of the 1 axis
+        # same kernel (and rounding of the mean) as in a Bank, so that samples equal
+        # to the mean are always on the same side
+        return extensions.moment_features(x, [self._kind])[0]
 
 
-class StdDev(Feature):
+class StdDev(_MomentFeature):
     """
     The signal standard deviation
 
@@ -105,6 +135,7 @@ class StdDev(Feature):
     """
 
     __slots__ = ()
+    _kind = 1
 
     def __init__(self):
         super().__init__()
@@ -132,12 +163,13 @@ class StdDev(Feature):
         return std(x, axis=-1, ddof=1)
 
 
-class Skewness(Feature):
+class Skewness(_MomentFeature):
     """
     The skewness of a signal. NaN inputs will be propagated through to the result.
     """
 
     __slots__ = ()
+    _kind = 2
 
     def __init__(self):
         super().__init__()
@@ -165,12 +197,13 @@ class Skewness(Feature):
         return skew(x, axis=-1, bias=False)
 
 
-class Kurtosis(Feature):
+class Kurtosis(_MomentFeature):
     """
     The kurtosis of a signal. NaN inputs will be propagated through to the result.
     """
 
     __slots__ = ()
+    _kind = 3
 
     def __init__(self):
         super().__init__()
@@ -5,24 +5,40 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
-from numpy import max, min, quantile, mean, std
+from numpy import max, min, quantile, mean, std, ndim, isnan, cumsum, arange, nan
 
 from skdh.features.core import Feature
 from skdh.features.lib import extensions
+from skdh.features.lib.moments import _MomentFeature
+from skdh.utility import moving_max, moving_min
 
 __all__ = ["Range", "IQR", "RMS", "Autocorrelation", "LinearSlope"]
 
 
-class Range(Feature):
+class Range(_MomentFeature):
     """
     The difference between the maximum and minimum value.
     """
 
     __slots__ = ()
+    _kind = 5
 
     def __init__(self):
         super().__init__()
 
+    def _compute_windows(self, x, w_len, step, fs):
+        res = moving_max(x, w_len, step, axis=-1) - moving_min(x, w_len, step, axis=-1)
+
+        # the moving extrema do not always propagate NaN, use the number of NaN
+        # samples in each window instead
+        x_nan = isnan(x)
+        if x_nan.any():
+            n_nan = cumsum(x_nan, axis=-1)
+            starts = arange(res.shape[-1]) * step
+            ends = n_nan[..., starts + w_len - 1]
+            res[(ends - n_nan[..., starts] + x_nan[..., starts]) > 0] = nan
+        return res
+
     def compute(self, signal, *, axis=-1, **kwargs):
         """
         compute(signal, *, axis=-1)
@@ -79,12 +95,13 @@ class IQR(Feature):
         return quantile(x, 0.75, axis=-1) - quantile(x, 0.25, axis=-1)
 
 
-class RMS(Feature):
+class RMS(_MomentFeature):
     """
     The root mean square value of the signal
     """
 
     __slots__ = ()
+    _kind = 6
 
     def __init__(self):
         super(RMS, self).__init__()
@@ -112,25 +129,85 @@ class RMS(Feature):
         return std(x - mean(x, axis=-1, keepdims=True), axis=-1, ddof=1)
 
 
+def _compute_autocorrelation(feats, x, fs):
+    """
+    Compute autocorrelation features with the same normalization and method together,
+    with one call to the extension for all their lags.
+    """
+    lags = []
+    for ft in feats:
+        lags.extend(ft.lag if isinstance(ft.lag, list) else [ft.lag])
+
+    res = extensions.autocorrelation_lags(
+        x, lags, feats[0].normalize, feats[0].method == "fft"
+    )
+
+    # split the lags back into the features
+    out, i = [], 0
+    for ft in feats:
+        if isinstance(ft.lag, list):
+            out.append(res[i : i + len(ft.lag)])
+            i += len(ft.lag)
+        else:
+            out.append(res[i])
+            i += 1
+    return out
+
+
 class Autocorrelation(Feature):
     """
     The similarity in profile between the signal and a time shifted version of the signal.
 
     Parameters
     ----------
-    lag : int, optional
-        Amount of lag (in samples) to use for the autocorrelation. Default is 1 sample.
+    lag : {int, list-like}, optional
+        Amount of lag (in samples) to use for the autocorrelation. Either a single lag, or
+        several lags, whose autocorrelations are stacked along a new first axis. Default
+        is 1 sample.
     normalize : bool, optional
         Normalize the result using the mean/std. deviation. Default is True
+    method : {"direct", "fft"}, optional
+        Method for computing the lagged products. "direct" computes them separately for
+        each lag, and "fft" computes them for all lags up to the largest at once from the
+        FFT of the signal, which is faster when there are many lags (eg the full
+        autocorrelation function up to a maximum lag). Default is "direct".
+
+    Notes
+    -----
+    Autocorrelation features with the same `normalize` and `method` values are computed
+    together in a :class:`skdh.features.Bank`.
+
+    Examples
+    --------
+    Full autocorrelation function up to 1 second (50 samples):
+
+    >>> ac = Autocorrelation(lag=range(1, 51), method="fft")
     """
 
-    __slots__ = ("lag", "normalize")
+    __slots__ = ("lag", "normalize", "method")
+
+    def __init__(self, lag=1, normalize=True, method="direct"):
+        if method not in ["direct", "fft"]:
+            raise ValueError("`method` must be one of 'direct' or 'fft'.")
+        if ndim(lag) > 0:
+            lag = [int(i) for i in lag]
 
-    def __init__(self, lag=1, normalize=True):
-        super(Autocorrelation, self).__init__(lag=lag, normalize=normalize)
+        params = dict(lag=lag, normalize=normalize)
+        # only in the parameters if not the default, so that names are unchanged
+        if method != "direct":
+            params["method"] = method
+        super(Autocorrelation, self).__init__(**params)
 
         self.lag = lag
         self.normalize = normalize
+        self.method = method
+
+    @property
+    def _n_out(self):
+        return len(self.lag) if isinstance(self.lag, list) else 1
+
+    def _shared_key(self):
+        return _compute_autocorrelation, self.normalize, self.method
 
     def compute(self, signal, *, axis=-1, **kwargs):
         """
@@ -149,9 +226,12 @@ class Autocorrelation(Feature):
         Returns
         -------
         ac : numpy.ndarray
-            Signal autocorrelation.
+            Signal autocorrelation. Has a new first axis for the lags if `lag` is
+            list-like.
         """
         x = super().compute(signal, axis=axis)
+        if isinstance(self.lag, list) or self.method == "fft":
+            return _compute_autocorrelation([self], x, 1.0)[0]
         return extensions.autocorrelation(x, self.lag, self.normalize)
 
 
@@ -165,6 +245,9 @@ class LinearSlope(Feature):
     def __init__(self):
         super(LinearSlope, self).__init__()
 
+    def _compute_windows(self, x, w_len, step, fs):
+        return extensions.linear_slope_windows(x, w_len, step, fs)
+
     def compute(self, signal, fs=1.0, *, axis=-1):
         """
         Compute the linear regression slope
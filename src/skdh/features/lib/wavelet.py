@@ -5,7 +5,22 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
-from numpy import zeros, ceil, log2, sort, sum, diff, sign, maximum
+from abc import abstractmethod
+from warnings import warn
+
+from numpy import (
+    zeros,
+    ceil,
+    log2,
+    sort,
+    sum,
+    diff,
+    sign,
+    maximum,
+    arange,
+    unravel_index,
+    prod,
+)
 import pywt
 
 from skdh.features.core import Feature
@@ -13,8 +28,108 @@ from skdh.features.core import Feature
 
 __all__ = ["DetailPower", "DetailPowerRatio"]
 
+# maximum number of samples decomposed at once, to bound the memory of the coefficients
+_BLOCK_SAMPLES = 2**20
 
-class DetailPower(Feature):
+
+def _decompose(x, wave, level):
+    """
+    Discrete wavelet decomposition of `x` (2D, computation axis last), keeping the
+    approximation coefficients of every level.
+
+    Returns
+    -------
+    cA : list
+        Approximation coefficients, `cA[j]` for level `j` (`cA[0]` is `x`).
+    cD : list
+        Detail coefficients, `cD[j]` for level `j` (`cD[0]` is None).
+    """
+    cA, cD = [x], [None]
+    for _ in range(level):
+        a, d = pywt.dwt(cA[-1], wave, mode="symmetric", axis=-1)
+        cA.append(a)
+        cD.append(d)
+    return cA, cD
+
+
+def _compute_wavelet(feats, x, fs):
+    """
+    Compute wavelet features with the same wavelet together, from one decomposition
+    of each block of windows.
+    """
+    wave = pywt.Wavelet(feats[0].wave)
+    lvls = [ft._levels(fs) for ft in feats]
+
+    level = max(lv[0] for lv in lvls)
+    if level < 0:
+        raise ValueError(f"Level value of {level} is too low . Minimum level is 0.")
+    if level > pywt.dwt_max_level(x.shape[-1], wave.dec_len):
+        warn(
+            f"Level value of {level} is too high: all coefficients will experience "
+            "boundary effects."
+        )
+
+    rshape = x.shape[:-1]
+    x = x.reshape((-1,) + x.shape[-1:]) if x.ndim == 1 else x
+    n_lanes = prod(x.shape[:-1], dtype=int)
+    block = max(_BLOCK_SAMPLES // x.shape[-1], 1)
+
+    res = zeros((len(feats), n_lanes))
+    for start in range(0, n_lanes, block):
+        stop = min(start + block, n_lanes)
+        # copy of the block of lanes, for any strides of x
+        xb = x[unravel_index(arange(start, stop), x.shape[:-1])]
+
+        cA, cD = _decompose(xb, wave, level)
+        for i, ft in enumerate(feats):
+            res[i, start:stop] = ft._from_coefs(cA, cD, wave, *lvls[i])
+
+    return res.reshape((len(feats),) + rshape)
+
+
+class _WaveletFeature(Feature):
+    """
+    Base for features computed from the discrete wavelet decomposition. Features with
+    the same wavelet share the decomposition when computed in a
+    :class:`skdh.features.Bank`.
+    """
+
+    __slots__ = ()
+
+    def _shared_key(self):
+        return _compute_wavelet, self.wave
+
+    def _levels(self, fs):
+        """
+        Decomposition levels spanning the frequency band.
+        """
+        return [
+            int(ceil(log2(fs / self.f_band[0]))),  # maximum level needed
+            int(ceil(log2(fs / self.f_band[1]))),  # minimum level to include in sum
+        ]
+
+    @staticmethod
+    def _band_power(cD, lmax, lmin):
+        """
+        Summed power of the detail coefficients of levels `lmin` to `lmax`.
+        """
+        result = zeros(cD[lmax].shape[:-1])
+        for j in range(lmax, max(lmin, 1) - 1, -1):
+            result += sum(cD[j] ** 2, axis=-1)
+        return result
+
+    @abstractmethod
+    def _from_coefs(self, cA, cD, wave, lmax, lmin):
+        """
+        Compute the feature from the decomposition of the signal.
+        """
+
+    def compute(self, signal, fs=1.0, *, axis=-1):
+        x = super().compute(signal, fs, axis=axis)
+        return _compute_wavelet([self], x, fs)[0]
+
+
+class DetailPower(_WaveletFeature):
     """
     The summed power in the detail levels that span the chosen frequency band.
 
@@ -66,37 +181,29 @@ class DetailPower(Feature):
         power : numpy.ndarray
             Computed detail power.
         """
-        x = super().compute(signal, fs, axis=axis)
-
-        # computation
-        lvls = [
-            int(ceil(log2(fs / self.f_band[0]))),  # maximum level needed
-            int(ceil(log2(fs / self.f_band[1]))),  # minimum level to include in sum
-        ]
-
-        # TODO test effect of mode on result
-        cA, *cD = pywt.wavedec(x, self.wave, mode="symmetric", level=lvls[0], axis=-1)
-
-        # set non necessary levels to 0
-        for i in range(lvls[0] - lvls[1] + 1, lvls[0]):
-            cD[i][:] = 0.0
-
-        # reconstruct and get negative->positive zero crossings
-        xr = pywt.waverec((cA,) + tuple(cD), self.wave, mode="symmetric", axis=-1)
-
+        return super().compute(signal, fs, axis=axis)
+
+    def _from_coefs(self, cA, cD, wave, lmax, lmin):
+        # Only the approximation at level `lmax` and the details of levels `lmin`
+        # to `lmax` are kept, which reconstruct the approximation at level
+        # `lmin - 1` (up to rounding). The remaining (zero) details are skipped when
+        # reconstructing, and no reconstruction is needed if `lmin` is 1.
+        lmin = max(lmin, 1)
+        xr = cA[lmin - 1]
+        for j in range(lmin - 1, 0, -1):
+            if xr.shape[-1] == cD[j].shape[-1] + 1:
+                xr = xr[..., :-1]
+            xr = pywt.idwt(xr, None, wave, mode="symmetric", axis=-1)
+
+        # negative->positive zero crossings
         N = sum(diff(sign(xr), axis=-1) > 0, axis=-1).astype(float)
         # ensure no 0 values to prevent divide by 0
         N = maximum(N, 1e-10)
 
-        rshape = x.shape[:-1]
-
-        result = zeros(rshape)
-        for i in range(lvls[0] - lvls[1] + 1):
-            result += sum(cD[i] ** 2, axis=-1)
-        return result / N
+        return self._band_power(cD, lmax, lmin) / N
 
 
-class DetailPowerRatio(Feature):
+class DetailPowerRatio(_WaveletFeature):
     """
     The ratio of the power in the detail signals that span the specified
     frequency band. Uses the discrete wavelet transform to break down the
@@ -159,19 +266,7 @@ class DetailPowerRatio(Feature):
         power_ratio : numpy.ndarray
             Computed detail power ratio.
         """
-        x = super().compute(signal, fs, axis=axis)
-
-        # compute the required levels
-        lvls = [
-            int(ceil(log2(fs / self.f_band[0]))),  # maximum level needed
-            int(ceil(log2(fs / self.f_band[1]))),  # minimum level to include in sum
-        ]
-
-        # TODO test effect of mode on result
-        cA, *cD = pywt.wavedec(x, self.wave, mode="symmetric", level=lvls[0], axis=-1)
-
-        result = zeros(x.shape[:-1])
-        for i in range(lvls[0] - lvls[1] + 1):
-            result += sum(cD[i] ** 2, axis=-1)
+        return super().compute(signal, fs, axis=axis)
 
-        return result / sum(x**2, axis=-1)
+    def _from_coefs(self, cA, cD, wave, lmax, lmin):
+        return self._band_power(cD, lmax, lmin) / sum(cA[0] ** 2, axis=-1)
@@ -54,6 +54,10 @@ class GaitLumbar(BaseProcess):
         Two (2) element array-like of the base and period of the window to use for determining
         days. Default is (0, 24), which will look for days starting at midnight and lasting 24
         hours. None removes any day-based windowing.
+    downsample_polyphase : bool, optional
+        Downsample with a polyphase filter, which is faster for rational, non-integer
+        downsampling factors (eg 75 -> 50Hz), but gives slightly different results.
+        Only used with `downsample`. Default is False.
 
     Other Parameters
     ----------------
@@ -212,6 +216,10 @@ class GaitLumbar(BaseProcess):
         gait_metrics.RegularityIndexV,
     ]
 
+    # scales with the amount of gait, assumes ~10% of the recording
+    _plan_work = 20.0
+    _plan_memory = 170.0
+
     def __init__(
         self,
         downsample=False,
@@ -235,6 +243,7 @@ class GaitLumbar(BaseProcess):
         loading_factor="default",
         bout_processing_pipeline=None,
         day_window=(0, 24),
+        downsample_polyphase=False,
     ):
         super().__init__(
             downsample=downsample,
@@ -258,9 +267,11 @@ class GaitLumbar(BaseProcess):
             loading_factor=loading_factor,
             bout_processing_pipeline=bout_processing_pipeline,
             day_window=day_window,
+            downsample_polyphase=downsample_polyphase,
         )
 
         self.downsample = downsample
+        self.polyphase = downsample_polyphase
 
         if provide_leg_length:
             self.height_factor = 1.0
@@ -551,6 +562,7 @@ class GaitLumbar(BaseProcess):
                     indices=(gait_starts, gait_stops, *self.day_idx),
                     aa_filter=True,  # always want the AA filter for downsampling
                     fs=fs,
+                    polyphase=self.polyphase,
                 )
 
         # setup the storage for the gait parameters
@@ -64,7 +64,7 @@ from skdh.gait.gait_metrics.base import (
     basic_asymmetry,
 )
 from skdh.features.lib.extensions.statistics import autocorrelation
-from skdh.features.lib.extensions.smoothness import SPARC
+from skdh.features.lib.extensions.smoothness import SPARC_segments
 
 
 __all__ = [
@@ -728,22 +728,25 @@ class StrideSPARC(GaitEventEndpoint):
     def _predict(self, *, fs, leg_length, gait, gait_aux):
         mask, mask_ofst = self._predict_init(gait, True, offset=2)
 
+        idx = nonzero(mask)[0]
         i1 = gait["IC"][mask]
         i2 = gait["IC"][mask_ofst]
-
-        for i, idx in enumerate(nonzero(mask)[0]):
-            bout_i = gait_aux["inertial data i"][idx]
-
-            if i2[i] - i1[i] > 0:
-                gait[self.k_][idx] = SPARC(
-                    norm(gait_aux["accel"][bout_i][i1[i] : i2[i], :], axis=1) - 1,
-                    fs,  # fsample
-                    4,  # padlevel
-                    10.0,  # fcut
-                    0.05,  # amplitude threshold
-                )
-            else:
-                gait[self.k_][idx] = nan
+        bouts = gait_aux["inertial data i"][idx]
+
+        # all the strides of a bout at once, empty strides are NaN
+        for bout_i in unique(bouts):
+            bmask = bouts == bout_i
+            accel_mag = norm(gait_aux["accel"][bout_i], axis=1) - 1
+
+            gait[self.k_][idx[bmask]] = SPARC_segments(
+                accel_mag,
+                i1[bmask],
+                i2[bmask],
+                fs,  # fsample
+                4,  # padlevel
+                10.0,  # fcut
+                0.05,  # amplitude threshold
+            )
 
 
 # ===========================================================
@@ -11,11 +11,8 @@ from warnings import warn
 from pathlib import Path
 from datetime import date as dt_date
 
-import h5py
 from numpy import mean, diff, asarray, sum, ndarray
 from numpy.linalg import norm
-import matplotlib
-import matplotlib.pyplot as plt
 
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.utility.internal import apply_resample, rle
@@ -177,6 +174,10 @@ class Gait(BaseProcess):
         gait_endpoints.RegularityIndexV,
     ]
 
+    # scales with the amount of gait, assumes ~10% of the recording
+    _plan_work = 20.0
+    _plan_memory = 170.0
+
     def __init__(
         self,
         correct_accel_orient=True,
@@ -249,6 +250,8 @@ class Gait(BaseProcess):
 
     def _save_classifier_predictions(self, fname):  # pragma: no cover
         def fn(time, starts, stops):
+            import h5py
+
             with h5py.File(fname, "w") as f:
                 f["time"] = time
                 f["bout starts"] = starts
@@ -392,6 +395,9 @@ class Gait(BaseProcess):
         if save_file is None:
             return
 
+        import matplotlib
+        import matplotlib.pyplot as plt
+
         if gettrace() is None and not debug:  # only set if not debugging
             matplotlib.use("PDF")
             # non-interactive, don't want to be displaying plots constantly
@@ -670,6 +676,8 @@ class Gait(BaseProcess):
         Setup the plot
         """
         if self.valid_plot and self.plot_fname is not None:
+            import matplotlib.pyplot as plt
+
             fname = Path(file).name if file is not None else "file-None"
 
             self.f, self.ax = plt.subplots(figsize=(12, 5))
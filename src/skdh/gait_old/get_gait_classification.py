@@ -8,12 +8,10 @@ Copyright (c) 2021. Pfizer Inc. All rights reserved.
 from sys import version_info
 
 from numpy import isclose, where, diff, insert, append, ascontiguousarray, int_
-from numpy.linalg import norm
 from scipy.signal import butter, sosfiltfilt
-import lightgbm as lgb
 
 from skdh.utility import get_windowed_view
-from skdh.utility.internal import rle
+from skdh.utility.internal import rle, get_derived_signal
 from skdh.features import Bank
 
 if version_info >= (3, 7):
@@ -66,7 +64,9 @@ def get_gait_classification_lgbm(gait_starts, gait_stops, accel, fs):
 
         # band-pass filter
         sos = butter(1, [2 * 0.25 / fs, 2 * 5 / fs], btype="band", output="sos")
-        accel_filt = ascontiguousarray(sosfiltfilt(sos, norm(accel, axis=1)))
+        accel_filt = ascontiguousarray(
+            sosfiltfilt(sos, get_derived_signal("magnitude", accel))
+        )
 
         # window, data will already be in c-contiguous layout
         accel_w = get_windowed_view(accel_filt, wlen, wstep, ensure_c_contiguity=False)
@@ -80,6 +80,8 @@ def get_gait_classification_lgbm(gait_starts, gait_stops, accel, fs):
         # output shape is (18, 99), need to transpose when passing to classifier
 
         # load the classification model
+        import lightgbm as lgb
+
         lgb_file = str(
             _resolve_path(
                 "skdh.gait_old.model", f"lgbm_gait_classifier_no-stairs_{suffix}.lgbm"
@@ -40,6 +40,23 @@ Support for reading multiple files in at once
     :toctree: generated/
 
     MultiReader
+
+Result Writers
+--------------
+
+Writers for saving the results of processing steps. Typed columnar formats
+(Parquet, Feather) store the process parameters and version in the file metadata,
+and require the optional `pyarrow` dependency.
+
+.. autosummary::
+    :toctree: generated/
+
+    writers.ResultWriter
+    writers.CSVWriter
+    writers.ParquetWriter
+    writers.FeatherWriter
+    writers.CohortParquetWriter
+    writers.read_result_metadata
 """
 
 from skdh.io.axivity import ReadCwa
@@ -57,6 +74,7 @@ from skdh.io import empatica
 from skdh.io import multireader
 from skdh.io.multireader import MultiReader
 from skdh.io.utility import FileSizeError
+from skdh.io import writers
 
 __all__ = (
     "ReadCwa",
@@ -73,4 +91,5 @@ __all__ = (
     "numpy_compressed",
     "csv",
     "multireader",
+    "writers",
 )
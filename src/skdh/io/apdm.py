@@ -5,8 +5,6 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
-import h5py
-
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.io.base import check_input_file
 
@@ -106,6 +104,8 @@ class ReadApdmH5(BaseProcess):
         super().predict(expect_days=False, expect_wear=False, file=file, **kwargs)
 
         res = {}
+        import h5py
+
         # read the file
         with h5py.File(file, "r") as f:
             sid = None  # sensor id
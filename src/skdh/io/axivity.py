@@ -5,6 +5,9 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
+from pathlib import Path
+from struct import unpack
+
 from numpy import ascontiguousarray
 
 from skdh.base import BaseProcess, handle_process_returns
@@ -53,6 +56,37 @@ class ReadCwa(BaseProcess):
         else:
             raise ValueError("`ext_error` must be one of 'raise', 'warn', 'skip'.")
 
+    # raw data is packed into 4 or 6 bytes per sample, returned as float64
+    _plan_work = 0.3
+    _plan_memory = 0.0
+    _plan_upcast = True
+
+    def _plan_inspect(self, file):
+        """
+        Get the number of samples and sampling frequency from the file header,
+        without reading the data.
+        """
+        with open(file, "rb") as f:
+            hdr = f.read(1024 + 30)
+
+        if len(hdr) < 1054 or hdr[:2] != b"MD":
+            raise ValueError(f"{file} is not a valid CWA file.")
+
+        # number of axes from the first data block, and samples per block
+        n_axes = hdr[1024 + 25] >> 4
+        count = unpack("<h", hdr[1024 + 28 : 1024 + 30])[0]
+        # first and last blocks are not read
+        n_blocks = Path(file).stat().st_size // 512 - 2
+        fs = 3200 / (1 << (15 - (hdr[36] & 0x0F)))
+
+        n = n_blocks * count
+        info = {"n_samples": n, "fs": fs, "nbytes": n * 8 * (2 + n_axes)}
+        # 6 and 9 axis data is copied into separate arrays per sensor
+        if n_axes > 3:
+            info["memory"] = n * 8 * n_axes
+
+        return info
+
     @handle_process_returns(results_to_kwargs=True)
     @check_input_file(".cwa")
     def predict(self, *, file, **kwargs):
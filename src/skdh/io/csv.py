@@ -6,6 +6,8 @@ Copyright (c) 2023. Pfizer Inc. All rights reserved
 """
 
 from warnings import warn
+from pathlib import Path
+from itertools import islice
 
 from numpy import (
     nan,
@@ -191,6 +193,37 @@ class ReadCSV(BaseProcess):
         else:
             raise ValueError("`ext_error` must be one of 'raise', 'warn', 'skip'.")
 
+    # text parsing, and conversion of the time column to datetimes
+    _plan_work = 5.0
+
+    def _plan_inspect(self, file):
+        """
+        Estimate the number of samples from the file size and the length of
+        the first lines, without reading all the data.
+        """
+        with open(file, "rb") as f:
+            head = list(islice(f, 1001))
+
+        if len(head) < 2:
+            raise ValueError(f"{file} does not contain any data rows.")
+
+        # first line is the column names
+        line_len = sum(len(i) for i in head[1:]) / (len(head) - 1)
+        n = int(Path(file).stat().st_size / line_len)
+
+        n_cols = 1  # time
+        for cols in self.column_names.values():
+            n_cols += 1 if isinstance(cols, str) else len(cols)
+        n_all = len(head[0].split(b","))
+
+        # pandas reads all columns before the requested ones are extracted
+        return {
+            "n_samples": n,
+            "fs": None,
+            "nbytes": n * 8 * n_cols,
+            "memory": n * 8 * n_all * 2,
+        }
+
     def handle_gaps_error(self, msg):
         if self.gaps_error == "raise":
             raise ValueError(msg)
@@ -1,7 +1,5 @@
 from warnings import warn
 
-from avro.datafile import DataFileReader
-from avro.io import DatumReader
 from numpy import (
     round,
     arange,
@@ -337,6 +335,9 @@ class ReadEmpaticaAvro(BaseProcess):
 
         `systolic_peaks` will always be a dictionary of the form `{'systolic_peaks': array}`.
         """
+        from avro.datafile import DataFileReader
+        from avro.io import DatumReader
+
         reader = DataFileReader(open(file, "rb"), DatumReader())
         records = []
         for record in reader:
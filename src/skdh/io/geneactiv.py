@@ -5,6 +5,8 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
+from itertools import islice
+
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.io.base import check_input_file
 from skdh.io._extensions import read_geneactiv
@@ -43,6 +45,33 @@ class ReadBin(BaseProcess):
         else:
             raise ValueError("`ext_error` must be one of 'raise', 'warn', 'skip'.")
 
+    # raw data is stored as hexadecimal text, returned as float64
+    _plan_work = 0.8
+    _plan_memory = 0.0
+    _plan_upcast = True
+
+    def _plan_inspect(self, file):
+        """
+        Get the number of samples and sampling frequency from the file header,
+        without reading the data.
+        """
+        fs = n_pages = None
+        with open(file, "r", errors="ignore") as f:
+            for line in islice(f, 100):
+                if line.startswith("Measurement Frequency:"):
+                    fs = float(line.split(":")[1].split()[0])
+                elif line.startswith("Number of Pages:"):
+                    n_pages = int(line.split(":")[1])
+                    break
+
+        if n_pages is None:
+            raise ValueError(f"Could not find the number of pages in {file} header.")
+
+        # 300 samples per page
+        n = n_pages * 300
+        # time, accel, light, and temperature
+        return {"n_samples": n, "fs": fs, "nbytes": n * 8 * 6}
+
     @handle_process_returns(results_to_kwargs=True)
     @check_input_file(".bin")
     def predict(self, *, file, **kwargs):
@@ -5,7 +5,10 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
-from numpy import load as np_load
+from zipfile import ZipFile
+
+from numpy import load as np_load, prod, dtype
+from numpy.lib import format as np_format
 
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.io.base import check_input_file
@@ -42,6 +45,32 @@ class ReadNumpyFile(BaseProcess):
         else:
             raise ValueError("`ext_error` must be one of 'raise', 'warn', 'skip'.")
 
+    _plan_work = 0.3
+    _plan_memory = 0.0
+
+    def _plan_inspect(self, file):
+        """
+        Get the number of samples, and size of the arrays from their headers,
+        without reading the data.
+        """
+        n = fs = None
+        nbytes = 0
+        with ZipFile(file) as zf:
+            for name in zf.namelist():
+                with zf.open(name) as f:
+                    if np_format.read_magic(f) == (1, 0):
+                        shape, _, dt = np_format.read_array_header_1_0(f)
+                    else:
+                        shape, _, dt = np_format.read_array_header_2_0(f)
+                nbytes += int(prod(shape)) * dtype(dt).itemsize
+
+                if name == f"{self._time}.npy":
+                    n = shape[0]
+                elif name == "fs.npy":
+                    fs = float(np_load(file)["fs"])
+
+        return {"n_samples": n, "fs": fs, "nbytes": nbytes}
+
     @handle_process_returns(results_to_kwargs=True)
     @check_input_file(".npz", check_size=True)
     def predict(self, *, file, **kwargs):
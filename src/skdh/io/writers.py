@@ -0,0 +1,299 @@
+"""
+Result writers for saving the output of processing steps
+
+Lukas Adamowicz
+Copyright (c) 2024. Pfizer Inc. All rights reserved.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+import json
+
+from pandas import DataFrame
+
+
+__all__ = [
+    "ResultWriter",
+    "CSVWriter",
+    "ParquetWriter",
+    "FeatherWriter",
+    "CohortParquetWriter",
+    "get_writer",
+    "read_result_metadata",
+]
+
+# key used to store skdh metadata in the schema of columnar files
+_METADATA_KEY = b"skdh"
+
+
+def _import_pyarrow():
+    """
+    Import the optional pyarrow dependency, with a helpful error if it is missing.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError(
+            "Optional dependency `pyarrow` not found. Install using `pip install pyarrow`."
+        )
+    return pyarrow
+
+
+class ResultWriter(ABC):
+    """
+    Base class for writing the results of a processing step to a file.
+
+    Parameters
+    ----------
+    kwargs
+        Key-word arguments for the writer. Stored so that the writer can be
+        saved and re-created as part of a :class:`skdh.Pipeline`.
+    """
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __repr__(self):
+        ret = f"{self.__class__.__name__}("
+        ret += ", ".join(f"{k}={v!r}" for k, v in self._kw.items())
+        return ret + ")"
+
+    def __eq__(self, other):
+        if isinstance(other, type(self)):
+            return self._kw == other._kw
+        return False
+
+    def __init__(self, **kwargs):
+        self._kw = kwargs
+
+    @abstractmethod
+    def write(self, results, file_name, metadata):
+        """
+        Write results to a file.
+
+        Parameters
+        ----------
+        results : dict
+            Dictionary of results, which must be convertible to a
+            :class:`pandas.DataFrame`.
+        file_name : str, path-like
+            File name to save the results to. Already formatted.
+        metadata : dict
+            Metadata describing the results, eg version, date, and the
+            parameters of the process that generated the results.
+        """
+        pass
+
+
+class CSVWriter(ResultWriter):
+    """
+    Write results to a CSV file, with a text header containing the version,
+    date, and parameters of the process that generated the results.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    def write(self, results, file_name, metadata):
+        kw_line = [
+            f"{k}: {v}".replace(",", "  ") for k, v in metadata["parameters"].items()
+        ]
+
+        lines = [
+            "Scikit-Digital-Health\n",
+            f"Version,{metadata['version']}\n",
+            f"Date,{metadata['date']}\n",
+            ",".join(kw_line),
+            "\n",
+            "\n",
+        ]
+
+        with open(file_name, "w") as f:
+            f.writelines(lines)
+
+        DataFrame(results).to_csv(file_name, index=False, mode="a")
+
+
+class _ArrowWriter(ResultWriter):
+    """
+    Base class for writers using Arrow tables. Metadata is stored as JSON in
+    the schema metadata under the `skdh` key.
+    """
+
+    @staticmethod
+    def _to_table(results, metadata):
+        pa = _import_pyarrow()
+
+        table = pa.Table.from_pandas(DataFrame(results), preserve_index=False)
+        schema_meta = dict(table.schema.metadata or {})
+        # parameters are not necessarily JSON serializable, fall back on strings
+        schema_meta[_METADATA_KEY] = json.dumps(metadata, default=str).encode()
+
+        return table.replace_schema_metadata(schema_meta)
+
+
+class ParquetWriter(_ArrowWriter):
+    """
+    Write results to a typed, columnar, Parquet file. Process parameters and
+    version information are stored in the file metadata, and can be retrieved
+    with :func:`read_result_metadata`. Requires `pyarrow`.
+
+    Parameters
+    ----------
+    compression : str, optional
+        Compression codec to use. Default is "snappy".
+    """
+
+    def __init__(self, compression="snappy"):
+        super().__init__(compression=compression)
+
+        self.compression = compression
+
+    def write(self, results, file_name, metadata):
+        pa = _import_pyarrow()
+
+        table = self._to_table(results, metadata)
+        pa.parquet.write_table(table, file_name, compression=self.compression)
+
+
+class FeatherWriter(_ArrowWriter):
+    """
+    Write results to an Arrow IPC (Feather v2) file. Process parameters and
+    version information are stored in the file metadata, and can be retrieved
+    with :func:`read_result_metadata`. Requires `pyarrow`.
+
+    Parameters
+    ----------
+    compression : {None, str}, optional
+        Compression codec to use. Default is "lz4".
+    """
+
+    def __init__(self, compression="lz4"):
+        super().__init__(compression=compression)
+
+        self.compression = compression
+
+    def write(self, results, file_name, metadata):
+        pa = _import_pyarrow()
+
+        table = self._to_table(results, metadata)
+        pa.feather.write_feather(table, file_name, compression=self.compression)
+
+
+class CohortParquetWriter(_ArrowWriter):
+    """
+    Append the results of each processed file to a partitioned Parquet dataset.
+    The save file name is used as the root directory of the dataset, and the
+    input file name is added as a column (by default also the partition column)
+    so that results from all the files in a cohort can be read back in one
+    call, eg with :func:`pandas.read_parquet`. Requires `pyarrow`.
+
+    Parameters
+    ----------
+    partition_cols : {None, list}, optional
+        Columns to partition the dataset by. Default is None, which partitions
+        by the input file name.
+    file_column : str, optional
+        Name of the column the input file name is stored in. Default is "file".
+    compression : str, optional
+        Compression codec to use. Default is "snappy".
+
+    Examples
+    --------
+    >>> p = Pipeline()
+    >>> p.add(
+    >>>     GaitLumbar(),
+    >>>     save_file="gait_results",
+    >>>     writer=CohortParquetWriter(),
+    >>> )
+    >>> for file in files:
+    >>>     p.run(file=file)
+    >>> df = pandas.read_parquet("gait_results")
+    """
+
+    def __init__(self, partition_cols=None, file_column="file", compression="snappy"):
+        super().__init__(
+            partition_cols=partition_cols,
+            file_column=file_column,
+            compression=compression,
+        )
+
+        self.partition_cols = (
+            [file_column] if partition_cols is None else list(partition_cols)
+        )
+        self.file_col = file_column
+        self.compression = compression
+
+    def write(self, results, file_name, metadata):
+        pa = _import_pyarrow()
+
+        df = DataFrame(results)
+        df[self.file_col] = metadata["file"]
+
+        table = self._to_table(df, metadata)
+
+        stem = metadata["file"] if metadata["file"] != "" else "results"
+        pa.parquet.write_to_dataset(
+            table,
+            root_path=file_name,
+            partition_cols=self.partition_cols,
+            basename_template=f"{stem}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            compression=self.compression,
+        )
+
+
+_SUFFIX_WRITERS = {
+    ".csv": CSVWriter,
+    ".parquet": ParquetWriter,
+    ".pq": ParquetWriter,
+    ".feather": FeatherWriter,
+    ".arrow": FeatherWriter,
+}
+
+
+def get_writer(file_name):
+    """
+    Get the default result writer for a file, based on its suffix. Files with
+    unrecognized suffixes are written as CSV.
+
+    Parameters
+    ----------
+    file_name : str, path-like
+        File name results will be written to.
+
+    Returns
+    -------
+    writer : ResultWriter
+        Result writer instance.
+    """
+    suffix = Path(file_name).suffix.lower()
+
+    return _SUFFIX_WRITERS.get(suffix, CSVWriter)()
+
+
+def read_result_metadata(file_name):
+    """
+    Read the skdh metadata (version, date, process parameters) stored in a
+    Parquet or Feather results file.
+
+    Parameters
+    ----------
+    file_name : str, path-like
+        Results file written by :class:`ParquetWriter` or :class:`FeatherWriter`.
+
+    Returns
+    -------
+    metadata : dict
+        Metadata stored when the results were written.
+    """
+    pa = _import_pyarrow()
+
+    if Path(file_name).suffix.lower() in [".feather", ".arrow"]:
+        schema = pa.ipc.open_file(file_name).schema
+    else:
+        schema = pa.parquet.read_schema(file_name)
+
+    return json.loads(schema.metadata[_METADATA_KEY])
@@ -12,6 +12,8 @@ import logging
 from packaging import version
 from copy import copy
 from pathlib import Path
+from time import perf_counter
+import functools
 
 import yaml
 from skdh.base import BaseProcess as Process
@@ -65,6 +67,14 @@ class Pipeline:
         default (False), results of a step will be stored under a key of the step's
         class name. If True, all results will be on the same level, and an exception
         will be raised if keys would be overwritten.
+    cache_signals : bool, optional
+        Cache re-sampled and derived signals (eg acceleration magnitude, moving
+        standard deviations) for the duration of each run, so that steps using
+        the same intermediate signals only compute them once. Default is True.
+        Set to False to reduce peak memory usage, at the cost of repeated computation.
+    cache_max_bytes : {None, int}, optional
+        Maximum size of the signal cache, in bytes. Least recently used signals
+        are evicted when the cache is full. Default is 1 GiB. None for no limit.
 
     Examples
     --------
@@ -85,7 +95,13 @@ class Pipeline:
         ret += "]"
         return ret
 
-    def __init__(self, load_kwargs=None, flatten_results=False):
+    def __init__(
+        self,
+        load_kwargs=None,
+        flatten_results=False,
+        cache_signals=True,
+        cache_max_bytes=2**30,
+    ):
         self._steps = []
         self._save = []
         self._current = -1  # iteration tracking
@@ -101,6 +117,8 @@ class Pipeline:
             self.load(**load_kwargs)
 
         self.flatten_results = flatten_results
+        self.cache_signals = cache_signals
+        self.cache_max_bytes = cache_max_bytes
 
     def save(self, file):
         """
@@ -128,6 +146,12 @@ class Pipeline:
                     "plot_file": step.pipe_plot_file,
                 }
             )
+            # only store the writer if one was explicitly set
+            if step.pipe_writer is not None:
+                pipe["Steps"][-1]["writer"] = {
+                    "name": step.pipe_writer.__class__.__name__,
+                    "parameters": step.pipe_writer._kw,
+                }
 
         if Path(file).suffix != ".skdh":
             file += ".skdh"
@@ -200,6 +224,7 @@ class Pipeline:
             which issues a warning instead.
         """
         import skdh
+        from skdh.io import writers
 
         min_vers = (
             skdh.__minimum_version__ if self._min_vers is None else self._min_vers
@@ -240,6 +265,7 @@ class Pipeline:
                 params = proc["parameters"]
                 save_file = proc["save_file"]
                 plot_file = proc["plot_file"]
+                writer = proc.get("writer", None)
             else:
                 warn(
                     "Save formats with class names as top-level keys in a list of "
@@ -254,6 +280,7 @@ class Pipeline:
                 params = proc[process_name]["parameters"]
                 save_file = proc[process_name]["save_file"]
                 plot_file = proc[process_name]["plot_file"]
+                writer = None
 
             if pkg == "skdh":
                 package = skdh
@@ -272,9 +299,26 @@ class Pipeline:
 
             proc = process(**params)
 
-            self.add(proc, name=name, save_file=save_file, plot_file=plot_file)
+            if writer is not None:
+                writer = getattr(writers, writer["name"])(**writer["parameters"])
+
+            self.add(
+                proc,
+                name=name,
+                save_file=save_file,
+                plot_file=plot_file,
+                writer=writer,
+            )
 
-    def add(self, process, name=None, save_file=None, plot_file=None, make_copy=True):
+    def add(
+        self,
+        process,
+        name=None,
+        save_file=None,
+        plot_file=None,
+        make_copy=True,
+        writer=None,
+    ):
         """
         Add a processing step to the pipeline
 
@@ -297,6 +341,14 @@ class Pipeline:
             Create a shallow copy of `process` to add to the pipeline. This allows
             a single instance to be used in multiple pipelines while retaining custom
             save file names and other pipeline-specific attributes. Default is True.
+        writer : {None, skdh.io.writers.ResultWriter}, optional
+            Writer used to save the results to `save_file`. Default is None,
+            which infers the format from the suffix of `save_file`: ".parquet"
+            and ".feather" files are written in a typed columnar format with
+            the process parameters and version stored in the file metadata,
+            and any other suffix is written as CSV. Use
+            :class:`skdh.io.writers.CohortParquetWriter` to append the results
+            of every file run through the pipeline to one partitioned dataset.
 
         Notes
         -----
@@ -355,6 +407,7 @@ class Pipeline:
         proc._in_pipeline = True
         proc.pipe_save_file = save_file
         proc.pipe_plot_file = plot_file
+        proc.pipe_writer = writer
 
         # setup plotting
         proc._setup_plotting(plot_file)
@@ -408,6 +461,17 @@ class Pipeline:
         """
         # set self._current to restart processing
         self._current = -1
+
+        if self.cache_signals:
+            # imported here to keep `import skdh` lightweight
+            from skdh.utility.internal import SignalCache
+
+            with SignalCache(max_bytes=self.cache_max_bytes):
+                return self._run(**kwargs)
+        else:
+            return self._run(**kwargs)
+
+    def _run(self, **kwargs):
         results = {}
 
         for proc in self:
@@ -429,3 +493,206 @@ class Pipeline:
                     results[proc._name] = step_result
 
         return results
+
+    def plan(self, inputs, reference_time=None):
+        """
+        Estimate the peak memory usage and run time of the pipeline for a set of
+        inputs, without processing any data. File sizes are determined by
+        inspecting file headers with the first (reading) step of the pipeline,
+        and step costs are estimated with per-sample cost models, scaled by a
+        short reference benchmark on the current machine.
+
+        Parameters
+        ----------
+        inputs : iterable
+            Inputs that would be passed to :meth:`Pipeline.run`. Either file names,
+            which are inspected by the first step of the pipeline, or dictionaries
+            of key-word arguments, eg `{"time": time, "accel": accel}`.
+        reference_time : {None, float}, optional
+            Time per sample of the reference benchmark (an 8th order zero-phase
+            filter of 3-axis data), in seconds. Default (None) measures it.
+
+        Returns
+        -------
+        plan : dict
+            Dictionary with the estimated peak memory in bytes (`peak_memory`),
+            and total runtime in seconds (`runtime`) for all the inputs, a list
+            of warnings about steps that upcast or copy large arrays (`warnings`),
+            and the per input estimates (`inputs`). Per input estimates include
+            the number of samples, peak memory, runtime, and a list of per
+            step estimates.
+
+        Notes
+        -----
+        Estimates are approximate, and are intended for sizing jobs (eg memory
+        per worker). Peak memory includes the data read into memory, the largest
+        working memory of any step, and the signal cache (see `cache_signals`).
+
+        Examples
+        --------
+        >>> p = Pipeline()
+        >>> p.add(ReadCwa())
+        >>> p.add(CalibrateAccelerometer())
+        >>> p.add(Sleep())
+        >>> plan = p.plan(files)
+        >>> plan["peak_memory"] / 2**30  # GiB
+        1.4
+        """
+        if reference_time is None:
+            reference_time = _reference_time_per_sample()
+
+        plan = {"peak_memory": 0, "runtime": 0.0, "warnings": [], "inputs": []}
+        # largest input, for warnings
+        largest = None
+
+        for inp in inputs:
+            kw = inp if isinstance(inp, dict) else {"file": inp}
+            try:
+                info = self._plan_input_info(kw)
+            except (OSError, ValueError) as e:
+                info = e
+
+            if info is None or isinstance(info, Exception):
+                msg = f"Cannot determine the size of input {kw.get('file', '')!s}, skipping."
+                if info is not None:
+                    msg += f" {info!s}"
+                plan["warnings"].append(msg)
+                warn(msg, UserWarning)
+                continue
+
+            inp_plan = self._plan_input(info, reference_time)
+            plan["inputs"].append(inp_plan)
+            plan["peak_memory"] = max(plan["peak_memory"], inp_plan["peak_memory"])
+            plan["runtime"] += inp_plan["runtime"]
+
+            if largest is None or info["n_samples"] > largest[0]["n_samples"]:
+                largest = (info, inp_plan)
+
+        if largest is not None:
+            for msg in self._plan_warnings(*largest):
+                plan["warnings"].append(msg)
+                warn(msg, UserWarning)
+
+        return plan
+
+    def _plan_input_info(self, kwargs):
+        """
+        Get the number of samples and data size of a pipeline input.
+        """
+        arrays = {k: v for k, v in kwargs.items() if hasattr(v, "nbytes")}
+
+        if "time" in arrays or "accel" in arrays:
+            n = arrays.get("time", arrays.get("accel")).shape[0]
+            return {
+                "file": kwargs.get("file", None),
+                "n_samples": n,
+                "fs": kwargs.get("fs", None),
+                "nbytes": sum(v.nbytes for v in arrays.values()),
+                "read": False,
+            }
+        elif "file" in kwargs and len(self._steps) > 0:
+            info = self._steps[0]._plan_inspect(kwargs["file"])
+            if info is None:
+                return None
+            info.update(file=kwargs["file"], read=True)
+            return info
+        return None
+
+    def _plan_input(self, info, reference_time):
+        """
+        Estimate memory and runtime of each step for a single input.
+        """
+        n = info["n_samples"]
+        # data read into memory, or provided as input
+        data = 0 if info["read"] else info["nbytes"]
+        peak = max_mem = 0
+        runtime = 0.0
+
+        steps = []
+        for i, proc in enumerate(self._steps):
+            if i == 0 and info["read"]:
+                mem = int(info.get("memory", proc._plan_memory * n))
+                out = info["nbytes"]
+            else:
+                mem = int(proc._plan_memory * n)
+                out = int(proc._plan_output * n)
+                # the largest working memory of the processing steps is an upper
+                # bound on what the signal cache will retain
+                max_mem = max(max_mem, mem)
+            t = proc._plan_work * n * reference_time
+
+            steps.append(
+                {"name": proc._name, "input": data, "memory": mem, "runtime": t}
+            )
+
+            peak = max(peak, data + mem)
+            runtime += t
+            data += out
+
+        # intermediate signals can be retained by the cache for the whole run
+        cache = 0
+        if self.cache_signals:
+            cache = max_mem
+            if self.cache_max_bytes is not None:
+                cache = min(cache, self.cache_max_bytes)
+
+        return {
+            "file": info["file"],
+            "n_samples": n,
+            "fs": info["fs"],
+            "peak_memory": int(peak + cache),
+            "cache_memory": int(cache),
+            "runtime": runtime,
+            "steps": steps,
+        }
+
+    def _plan_warnings(self, info, inp_plan):
+        """
+        Warnings for steps that upcast or copy large arrays.
+        """
+        msgs = []
+        for proc, step in zip(self._steps, inp_plan["steps"]):
+            if proc._plan_upcast and info["read"]:
+                fsize = Path(info["file"]).stat().st_size
+                msgs.append(
+                    f"[{step['name']}] converts raw data to float64, using "
+                    f"{_format_bytes(info['nbytes'])} ({info['nbytes'] / fsize:.1f}x the "
+                    f"file size) for {Path(info['file']).name}."
+                )
+            if step["input"] > 0 and step["memory"] > 2 * step["input"]:
+                msgs.append(
+                    f"[{step['name']}] uses ~{_format_bytes(step['memory'])} of working "
+                    f"memory ({step['memory'] / step['input']:.1f}x its input data) for "
+                    f"{info['n_samples']} samples."
+                )
+
+        return msgs
+
+
+def _format_bytes(nbytes):
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if nbytes < 1024:
+            return f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f} TiB"
+
+
+@functools.lru_cache(maxsize=None)
+def _reference_time_per_sample(n=200000):
+    """
+    Time per sample, in seconds, of the reference benchmark used to scale the
+    step cost models in `Pipeline.plan`. Measured once per session.
+    """
+    from numpy.random import default_rng
+    from scipy.signal import cheby1, sosfiltfilt
+
+    x = default_rng(0).standard_normal((n, 3))
+    sos = cheby1(8, 0.05, 0.8 / 2.5, output="sos")
+
+    times = []
+    for _ in range(3):
+        t0 = perf_counter()
+        sosfiltfilt(sos, x, axis=0)
+        times.append(perf_counter() - t0)
+
+    return min(times) / n
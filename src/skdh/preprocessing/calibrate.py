@@ -22,10 +22,10 @@ from numpy import (
     concatenate,
 )
 from numpy.linalg import norm
-from sklearn.linear_model import LinearRegression
 
 from skdh.base import BaseProcess, handle_process_returns
 from skdh.utility import moving_mean, moving_sd
+from skdh.utility.internal import get_derived_signal
 
 
 __all__ = ["CalibrateAccelerometer"]
@@ -77,6 +77,9 @@ class CalibrateAccelerometer(BaseProcess):
         doi: 10.1152/japplphysiol.00421.2014.
     """
 
+    _plan_work = 0.95
+    _plan_memory = 30.0
+
     def __init__(
         self, sphere_crit=0.3, min_hours=72, sd_criteria=0.013, max_iter=1000, tol=1e-10
     ):
@@ -275,6 +278,8 @@ class CalibrateAccelerometer(BaseProcess):
 
         weights = ones(acc_rm.shape[0]) * 100
         res = [Inf]
+        from sklearn.linear_model import LinearRegression
+
         LR = LinearRegression()
 
         for niter in range(self.max_iter):
@@ -347,8 +352,8 @@ class Store:
     @acc_rsd.setter
     def acc_rsd(self, value):
         if self._acc_rsd is None:
-            self._acc_rsd, self._acc_rm = moving_sd(
-                value, self.wlen, self.wlen, axis=0, return_previous=True
+            self._acc_rsd, self._acc_rm = get_derived_signal(
+                "moving_sd", value, w_len=self.wlen, skip=self.wlen, axis=0
             )
             self._n = int((value.shape[0] // self.wlen) * self.wlen)
         else:
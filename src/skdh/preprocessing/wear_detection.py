@@ -31,8 +31,13 @@ from numpy.linalg import norm
 from scipy.signal import butter, sosfiltfilt
 
 from skdh.base import BaseProcess, handle_process_returns
-from skdh.utility import moving_mean, moving_sd, moving_max, moving_min
-from skdh.utility.internal import rle, invert_indices
+from skdh.utility import moving_mean, moving_stats
+from skdh.utility.internal import (
+    rle,
+    replace_runs,
+    invert_indices,
+    get_derived_signal,
+)
 from skdh.utility.activity_counts import get_activity_counts
 
 
@@ -84,6 +89,9 @@ class DETACH(BaseProcess):
     `GitHub <https://github.com/nimbal/vertdetach>`.
     """
 
+    _plan_work = 3.1
+    _plan_memory = 72.0
+
     def __init__(
         self,
         sd_thresh=0.008,
@@ -208,7 +216,15 @@ class DETACH(BaseProcess):
         # compute a minute-long rolling standard deviation
         # this can be both forward and backwards looking with the correct indexing
         # current implementation matches the "forwards" looking from pandas
-        rsd_acc = moving_sd(accel, wlen, 1, axis=0, trim=False, return_previous=False)
+        rsd_acc = get_derived_signal(
+            "moving_sd",
+            accel,
+            w_len=wlen,
+            skip=1,
+            axis=0,
+            trim=False,
+            return_previous=False,
+        )
         # to get "backwards" looking, roll by `wlen - 1`
 
         # In the original algorithm they keep one temperature sample per GENEActiv
@@ -261,8 +277,9 @@ class DETACH(BaseProcess):
         perc_under_sd_range_5min_bwd = perc_under_sd_range_5min_bwd[: temp_ds.size]
 
         # Get the maximum & minimum temperature in 5 minute windows
-        max_temp_5min = moving_max(temp_f, wlen_ds_5min, 1, trim=False)
-        min_temp_5min = moving_min(temp_f, wlen_ds_5min, 1, trim=False)
+        max_temp_5min, min_temp_5min = moving_stats(
+            temp_f, wlen_ds_5min, 1, stats=("max", "min"), trim=False
+        )
 
         # get the average temperature change in the next 5 minutes
         avg_temp_delta_5min = moving_mean(delta_temp_f, wlen_ds_5min, 1, trim=False)
@@ -372,6 +389,10 @@ class CountWearDetection(BaseProcess):
         Use the internal calculation of activity counts
         (:meth:`skdh.utility.get_activity_counts`), or the Python package published
         by ActiGraph.
+    downsample_polyphase : bool, optional
+        Downsample to 30Hz with a polyphase filter for the internal activity counts,
+        which is faster for rational, non-integer downsampling factors (eg 100 ->
+        30Hz), but gives slightly different results. Default is False.
 
     See Also
     --------
@@ -394,8 +415,15 @@ class CountWearDetection(BaseProcess):
         Feb. 2011, doi: 10.1249/MSS.0b013e3181ed61a3.
     """
 
+    _plan_work = 2.3
+    _plan_memory = 77.0
+
     def __init__(
-        self, nonwear_window_min=90, epoch_seconds=60, use_actigraph_package=False
+        self,
+        nonwear_window_min=90,
+        epoch_seconds=60,
+        use_actigraph_package=False,
+        downsample_polyphase=False,
     ):
         nonwear_window_min = int(nonwear_window_min)
         epoch_seconds = int(epoch_seconds)
@@ -404,11 +432,13 @@ class CountWearDetection(BaseProcess):
             nonwear_window_min=nonwear_window_min,
             epoch_seconds=epoch_seconds,
             use_actigraph_package=use_actigraph_package,
+            downsample_polyphase=downsample_polyphase,
         )
 
         self.nonwear_window_min = nonwear_window_min
         self.epoch_seconds = epoch_seconds
         self.use_ag_package = use_actigraph_package
+        self.polyphase = downsample_polyphase
 
     @handle_process_returns(results_to_kwargs=True)
     def predict(self, time=None, accel=None, *, fs=None, **kwargs):
@@ -456,7 +486,11 @@ class CountWearDetection(BaseProcess):
         else:
             # compute the activity counts
             axis_counts = get_activity_counts(
-                fs, time, accel, epoch_seconds=self.epoch_seconds
+                fs,
+                time,
+                accel,
+                epoch_seconds=self.epoch_seconds,
+                polyphase=self.polyphase,
             )
 
         # compute single counts vector
@@ -472,16 +506,16 @@ class CountWearDetection(BaseProcess):
         # 0  : counts == 0
         # -1 : valid nonwear interrupt
         nonwear_counts = (counts > 0).astype(int)
-        lengths, starts, values = rle(nonwear_counts)
 
-        # get all instances of less than 2 min windows of interrupts
-        idx_lt2 = nonzero((lengths[1:-1] <= wlen_2) & (values[1:-1] == 1))[0] + 1
-        # get interrupts with +-30min counts == 0
-        mask = (lengths[idx_lt2 - 1] >= wlen_30) & (lengths[idx_lt2 + 1] >= wlen_30)
-        idx_lt2 = idx_lt2[mask]
-
-        for s, l in zip(starts[idx_lt2], lengths[idx_lt2]):
-            nonwear_counts[s : s + l] = -1
+        # set interrupts of less than 2 min with +-30min counts == 0 to -1
+        replace_runs(
+            nonwear_counts,
+            1,
+            -1,
+            max_length=wlen_2,
+            skip_bounds=True,
+            neighbor_min_length=wlen_30,
+        )
 
         # get run length encoding again, with modified values for interrupts
         lengths, starts, values = rle(nonwear_counts > 0)
@@ -555,6 +589,9 @@ class CtaWearDetection(BaseProcess):
     into wear times.
     """
 
+    _plan_work = 0.6
+    _plan_memory = 24.0
+
     def __init__(
         self, temp_threshold=26.0, sd_crit=0.003, window_length=1, window_skip=1
     ):
@@ -617,7 +654,9 @@ class CtaWearDetection(BaseProcess):
         # that much of a difference to have that level of resolution
 
         # compute accel SD for 1 minute non-overlapping windows
-        accel_sd = moving_sd(accel, n_wlen, n_wlen, axis=0, return_previous=False)
+        accel_sd = get_derived_signal(
+            "moving_sd", accel, w_len=n_wlen, skip=n_wlen, axis=0, return_previous=False
+        )
         # compute moving mean of temperature
         temp_mean = moving_mean(temperature, n_wlen, n_wlen)
 
@@ -742,6 +781,9 @@ class AccelThresholdWearDetection(BaseProcess):
     are re-classified as non-wear.
     """
 
+    _plan_work = 0.8
+    _plan_memory = 24.0
+
     def __init__(
         self,
         sd_crit=0.013,
@@ -821,12 +863,16 @@ class AccelThresholdWearDetection(BaseProcess):
         # note that while this block starts at 0, the method uses centered blocks, which
         # means that the first block actually corresponds to a block starting
         # 22.5 minutes into the recording
-        acc_rsd = moving_sd(accel, n_wlen, n_wskip, axis=0, return_previous=False)
-
-        # get the accelerometer range in each 60min window
-        acc_w_range = moving_max(accel, n_wlen, n_wskip, axis=0) - moving_min(
-            accel, n_wlen, n_wskip, axis=0
+        # SD and range (max - min) in each 60min window, in one pass
+        acc_rsd, acc_wmax, acc_wmin = get_derived_signal(
+            "moving_stats",
+            accel,
+            w_len=n_wlen,
+            skip=n_wskip,
+            stats=("sd", "max", "min"),
+            axis=0,
         )
+        acc_w_range = acc_wmax - acc_wmin
 
         nonwear = (
             sum((acc_rsd < self.sd_crit) & (acc_w_range < self.range_crit), axis=1) >= 2
@@ -31,6 +31,9 @@ class GetDayWindowIndices(BaseProcess):
         match the number of `bases`.
     """
 
+    _plan_work = 0.2
+    _plan_memory = 8.0
+
     def __init__(self, bases=None, periods=None):
         super().__init__(bases=bases, periods=periods)
 
@@ -259,6 +259,7 @@ class Detector:
         prev_int_end = -1
 
         n_prev = len(sts["STS Start"])  # previous number of transitions
+        sparc_bounds = []  # SPARC of all the transitions is computed at once
 
         for ppk in power_peaks:
             try:  # look for the preceding end of stillness
@@ -316,13 +317,6 @@ class Detector:
             mx_ = filt_acc[sts_start:sts_end].max()
             mn_ = filt_acc[sts_start:sts_end].min()
             vdisp_ = v_pos[t_end_i] - v_pos[t_start_i]
-            sal_ = extensions.SPARC(
-                norm(raw_acc[sts_start:sts_end], axis=1),
-                1 / dt,
-                4,
-                10.0,
-                0.05,
-            )
 
             dtime = datetime.datetime.utcfromtimestamp(time[sts_start])
             sts["Date"].append(dtime.strftime("%Y-%m-%d"))
@@ -334,9 +328,24 @@ class Detector:
             sts["Duration"].append(dur_)
             sts["Max. Accel."].append(mx_)
             sts["Min. Accel."].append(mn_)
-            sts["SPARC"].append(sal_)
+            sparc_bounds.append((sts_start, sts_end))
             sts["Vertical Displacement"].append(vdisp_)
 
+        if sparc_bounds:
+            # only the magnitude of the span of the transitions
+            bounds = array(sparc_bounds)
+            i0 = bounds[:, 0].min()
+            sal = extensions.SPARC_segments(
+                norm(raw_acc[i0 : bounds[:, 1].max()], axis=1),
+                bounds[:, 0] - i0,
+                bounds[:, 1] - i0,
+                1 / dt,
+                4,
+                10.0,
+                0.05,
+            )
+            sts["SPARC"].extend(sal)
+
         # check to ensure no partial transitions
         vdisp_ndarr = array(sts["Vertical Displacement"][n_prev:])
         sts["Partial"].extend(
@@ -16,11 +16,11 @@ from numpy import (
     diff,
     ascontiguousarray,
 )
-from numpy.linalg import norm
 from scipy.signal import butter, sosfiltfilt, find_peaks
 from pywt import cwt, scale2frequency
 
 from skdh.base import BaseProcess, handle_process_returns
+from skdh.utility.internal import get_derived_signal
 from skdh.sit2stand.detector import Detector, pad_moving_sd
 
 
@@ -113,6 +113,10 @@ class Sit2Stand(BaseProcess):
         Art. no. 22, Jan. 2020, doi: 10.3390/s20226618.
     """
 
+    # wavelet transforms of the full signal
+    _plan_work = 49.0
+    _plan_memory = 297.0
+
     def __init__(
         self,
         *,
@@ -243,7 +247,7 @@ class Sit2Stand(BaseProcess):
             start, stop = day_idx
 
             # compute the magnitude of the acceleration
-            m_acc = norm(accel[start:stop, :], axis=1)
+            m_acc = get_derived_signal("magnitude", accel[start:stop, :])
             # filtered acceleration
             f_acc = ascontiguousarray(
                 sosfiltfilt(sos, m_acc, padtype="odd", padlen=None)
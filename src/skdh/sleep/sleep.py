@@ -15,13 +15,13 @@ from datetime import date as dt_date
 from numpy import mean, diff, array, nan, sum, arange, full, int_
 from numpy.ma import masked_where
 from pandas import DataFrame, date_range
-import matplotlib
-from matplotlib.backends.backend_pdf import PdfPages
-import matplotlib.lines as mlines
-import matplotlib.pyplot as plt
 
 from skdh.base import BaseProcess, handle_process_returns
-from skdh.utility.internal import get_day_index_intersection, apply_resample, rle
+from skdh.utility.internal import (
+    get_days_index_intersection,
+    apply_resample,
+    rle,
+)
 from skdh.sleep.tso import get_total_sleep_opportunity
 from skdh.sleep.utility import compute_activity_index
 from skdh.sleep.sleep_classification import compute_sleep_predictions
@@ -126,6 +126,10 @@ class Sleep(BaseProcess):
         hours [5]. Default is 0.0 for no added data.
     save_per_minute_results : bool, optional
         Save minute-by-minute predictions of rest for each day. Default is False.
+    downsample_polyphase : bool, optional
+        Downsample with a polyphase filter, which is faster for rational, non-integer
+        downsampling factors (eg 50 -> 20Hz), but gives slightly different results.
+        Only used with `downsample_aa_filter`. Default is False.
 
     Notes
     -----
@@ -179,6 +183,9 @@ class Sleep(BaseProcess):
         endpoints.WakePowerLawDistribution,
     ]
 
+    _plan_work = 5.6
+    _plan_memory = 75.0
+
     def __init__(
         self,
         start_buffer=0,
@@ -200,6 +207,7 @@ class Sleep(BaseProcess):
         day_window=(12, 24),
         save_per_minute_results=False,
         add_active_time=0.0,
+        downsample_polyphase=False,
     ):
         super().__init__(
             start_buffer=start_buffer,
@@ -221,6 +229,7 @@ class Sleep(BaseProcess):
             day_window=day_window,
             save_per_minute_results=save_per_minute_results,
             add_active_time=add_active_time,
+            downsample_polyphase=downsample_polyphase,
         )
 
         self.window_size = 60
@@ -241,6 +250,7 @@ class Sleep(BaseProcess):
         self.min_day_hrs = min_day_hours
         self.downsample = downsample
         self.aa_filter = downsample_aa_filter
+        self.polyphase = downsample_polyphase
         self.save_pm = save_per_minute_results
         self.add_time = add_active_time
 
@@ -277,6 +287,9 @@ class Sleep(BaseProcess):
         if save_file is None:
             return
         # move this inside here so that it doesnt effect everything on load
+        import matplotlib
+        import matplotlib.pyplot as plt
+
         if gettrace() is None:  # only set if not debugging
             matplotlib.use(
                 "PDF"
@@ -432,6 +445,7 @@ class Sleep(BaseProcess):
                 indices=(*self.day_idx, *self.wear_idx),
                 aa_filter=self.aa_filter,
                 fs=fs,
+                polyphase=self.polyphase,
             )
 
         else:
@@ -474,6 +488,11 @@ class Sleep(BaseProcess):
         # setup storage for sleep indices
         sleep_idx = full((day_starts_ds.size, 2), -1, dtype=int_)
 
+        # get the starts and stops of wear during all the days at once
+        days_wear = get_days_index_intersection(
+            wear_starts_ds, wear_stops_ds, True, day_starts_ds, day_stops_ds
+        )
+
         # iterate over the days
         for iday, (start, stop) in enumerate(zip(day_starts_ds, day_stops_ds)):
             if ((stop - start) / (3600 * goal_fs)) < self.min_day_hrs:
@@ -506,9 +525,7 @@ class Sleep(BaseProcess):
             self._plot_accel(goal_fs, accel_ds[start:stop])
 
             # get the starts and stops of wear during the day
-            dw_starts, dw_stops = get_day_index_intersection(
-                wear_starts_ds, wear_stops_ds, True, start, stop
-            )
+            dw_starts, dw_stops = days_wear[iday]
 
             if (sum(dw_stops - dw_starts) / (3600 * goal_fs)) < self.min_wear_time:
                 self.logger.info(
@@ -605,6 +622,8 @@ class Sleep(BaseProcess):
 
     def _setup_day_plot(self, iday, source_file, date_str, start_dt):
         if self.f is not None:
+            import matplotlib.pyplot as plt
+
             f, ax = plt.subplots(
                 nrows=4,
                 figsize=(12, 6),
@@ -654,6 +673,8 @@ class Sleep(BaseProcess):
         accel : numpy.ndarray
         """
         if self.f is not None:
+            import matplotlib.lines as mlines
+
             acc = accel[:: int(fs * 60)]
 
             self.ax[-1][0].plot(self.t60[: acc.shape[0]], acc, lw=0.5)
@@ -719,6 +740,8 @@ class Sleep(BaseProcess):
             Indices for wear ends. Indexed to `fs`.
         """
         if self.f is not None:
+            import matplotlib.lines as mlines
+
             # wear
             h1 = mlines.Line2D(
                 [],
@@ -809,6 +832,8 @@ class Sleep(BaseProcess):
         Finalize and save the plots for sleep
         """
         if self.f is not None:
+            from matplotlib.backends.backend_pdf import PdfPages
+
             date = dt_date.today().strftime("%Y%m%d")
             form_fname = self.plot_fname.format(date=date, file=self._file_name)
             pp = PdfPages(Path(form_fname).with_suffix(".pdf"))
@@ -9,6 +9,7 @@ from numpy import min, max, percentile, zeros, bool_, pad, sin, arange, pi, conc
 from numpy.random import default_rng
 
 from skdh.utility import moving_mean, moving_median, moving_sd
+from skdh.utility.internal import get_derived_signal
 from skdh.sleep.utility import (
     compute_z_angle,
     compute_absolute_difference,
@@ -104,7 +105,7 @@ def get_total_sleep_opportunity(
     # of the library (zoo) they are using for rollmedian
     n5 = int(5 * fs)
     # compute the rolling median for 5s windows
-    acc_rmd = moving_median(accel, n5, skip=1, axis=0)
+    acc_rmd = get_derived_signal("moving_median", accel, w_len=n5, skip=1, axis=0)
 
     # compute the z-angle
     z = compute_z_angle(acc_rmd)
@@ -22,12 +22,13 @@ from numpy import (
     mean,
     var,
     ascontiguousarray,
+    ceil,
 )
 from scipy.signal import butter, sosfiltfilt
 
 from skdh.utility import get_windowed_view
 from skdh.utility import moving_mean, moving_sd, moving_median
-from skdh.utility.internal import rle
+from skdh.utility.internal import rle, replace_runs
 
 __all__ = [
     "compute_z_angle",
@@ -153,6 +154,19 @@ def drop_min_blocks(arr, min_block_size, drop_value, replace_value, skip_bounds=
     -------
     arr : array
     """
+    if min_block_size <= 0:
+        # no block is shorter than the minimum
+        return arr
+    if arr.dtype.kind in "biu" and arr.ndim == 1 and arr.flags.carray:
+        replace_runs(
+            arr,
+            drop_value,
+            replace_value,
+            max_length=int(ceil(min_block_size)) - 1,
+            skip_bounds=skip_bounds,
+        )
+        return arr
+
     lengths, starts, vals = rle(arr)
     ctr = 0
     n = len(lengths)
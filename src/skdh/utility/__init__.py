@@ -27,6 +27,22 @@ Misc. Math Functions
     math.moving_skewness
     math.moving_kurtosis
     math.moving_median
+    math.moving_quantile
+    math.moving_stats
+
+Streaming Moving Statistics
+---------------------------
+
+.. autosummary::
+    :toctree: generated/
+
+    streaming.MovingMean
+    streaming.MovingSD
+    streaming.MovingSkewness
+    streaming.MovingKurtosis
+    streaming.MovingMedian
+    streaming.MovingMax
+    streaming.MovingMin
 
 Orientation Functions
 ---------------------
@@ -51,6 +67,8 @@ from skdh.utility.fragmentation_endpoints import *
 from skdh.utility import fragmentation_endpoints
 from skdh.utility.math import *
 from skdh.utility import math
+from skdh.utility.streaming import *
+from skdh.utility import streaming
 from skdh.utility.orientation import correct_accelerometer_orientation
 from skdh.utility import orientation
 from skdh.utility.windowing import compute_window_samples, get_windowed_view
@@ -60,9 +78,10 @@ from skdh.utility.activity_counts import *
 
 
 __all__ = (
-    ["math", "windowing", "orientation", "fragmentation_endpoints"]
+    ["math", "streaming", "windowing", "orientation", "fragmentation_endpoints"]
     + fragmentation_endpoints.__all__
     + math.__all__
+    + streaming.__all__
     + windowing.__all__
     + orientation.__all__
     + activity_counts.__all__
@@ -4,9 +4,14 @@ from .moving_statistics import (
     moving_skewness,
     moving_kurtosis,
     moving_median,
+    moving_quantile,
     moving_max,
     moving_min,
+    moving_stats,
+    moving_stream_new,
+    moving_stream_update,
 )
+from .run_length import rle, replace_runs
 
 __all__ = [
     "moving_mean",
@@ -14,6 +19,12 @@ __all__ = [
     "moving_skewness",
     "moving_kurtosis",
     "moving_median",
+    "moving_quantile",
     "moving_max",
     "moving_min",
+    "moving_stats",
+    "moving_stream_new",
+    "moving_stream_update",
+    "rle",
+    "replace_runs",
 ]
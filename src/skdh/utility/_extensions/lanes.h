@@ -0,0 +1,111 @@
+// Copyright (c) 2024. Pfizer Inc. All rights reserved.
+/*
+Iteration over the 1D lanes along the last axis of double arrays with arbitrary strides.
+
+Kernels always get contiguous lanes. Lanes that are contiguous are used in place, and
+other lanes are gathered into (or scattered from) a buffer the size of one lane, so that
+strided inputs (eg the transposed view of a `(N, 3)` array) are never copied as a whole.
+
+`lanes_init` and `lanes_free` need the GIL, the other functions only touch raw memory.
+*/
+#ifndef LANES_H_
+#define LANES_H_
+
+#include "Python.h"
+#include "numpy/arrayobject.h"
+
+#include <string.h>
+
+typedef struct {
+    PyArrayIterObject *it;  // iterator over all but the last axis
+    npy_intp size;          // number of lanes
+    npy_intp n;             // lane length
+    npy_intp stride;        // stride along the lane, in bytes
+    double *buf;            // lane buffer, NULL if the lanes are contiguous
+} lanes_t;
+
+
+/* returns 0 on success, -1 (with an exception set) on failure */
+static inline int lanes_init(lanes_t *l, PyArrayObject *arr)
+{
+    int axis = PyArray_NDIM(arr) - 1;
+
+    l->buf = NULL;
+    l->n = PyArray_DIM(arr, axis);
+    l->stride = PyArray_STRIDE(arr, axis);
+    l->it = (PyArrayIterObject *)PyArray_IterAllButAxis((PyObject *)arr, &axis);
+    if (!l->it)
+        return -1;
+    l->size = l->it->size;
+
+    if ((l->n > 1) && (l->stride != (npy_intp)sizeof(double)))
+    {
+        l->buf = (double *)malloc(l->n * sizeof(double));
+        if (!l->buf)
+        {
+            Py_CLEAR(l->it);
+            PyErr_NoMemory();
+            return -1;
+        }
+    }
+    return 0;
+}
+
+
+static inline void lanes_free(lanes_t *l)
+{
+    Py_CLEAR(l->it);
+    free(l->buf);
+    l->buf = NULL;
+}
+
+
+/* contiguous data of the current lane, gathered into the buffer if necessary */
+static inline double * lanes_get(lanes_t *l)
+{
+    if (!l->buf)
+        return (double *)l->it->dataptr;
+
+    const char *p = l->it->dataptr;
+    for (npy_intp i = 0; i < l->n; ++i, p += l->stride)
+        l->buf[i] = *(const double *)p;
+    return l->buf;
+}
+
+
+/* where to write the current lane, call `lanes_put` after writing */
+static inline double * lanes_out(lanes_t *l)
+{
+    return l->buf ? l->buf : (double *)l->it->dataptr;
+}
+
+
+/* copy `src` (contiguous) into the current lane */
+static inline void lanes_write(lanes_t *l, const double *src)
+{
+    if ((l->stride == (npy_intp)sizeof(double)) || (l->n <= 1))
+    {
+        if ((double *)l->it->dataptr != src)
+            memcpy(l->it->dataptr, src, l->n * sizeof(double));
+        return;
+    }
+    char *p = l->it->dataptr;
+    for (npy_intp i = 0; i < l->n; ++i, p += l->stride)
+        *(double *)p = src[i];
+}
+
+
+/* write the buffer (if any) back to the current lane */
+static inline void lanes_put(lanes_t *l)
+{
+    if (l->buf)
+        lanes_write(l, l->buf);
+}
+
+
+static inline void lanes_next(lanes_t *l)
+{
+    PyArray_ITER_NEXT(l->it);
+}
+
+#endif  // LANES_H_
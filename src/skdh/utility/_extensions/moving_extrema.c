@@ -28,13 +28,7 @@ long limax(long a, long b)
 // Data structure for the Queue
 // ======================================================================
 
-typedef struct
-{
-    stack *dqStack;  // dequeue stack
-    stack *dqStack_ext;  // dequeue stack extrema storage
-    stack *eqStack;  // enqueue stack
-    stack *eqStack_ext;  // enqueue stack current extrema storage
-} Queue;
+// the Queue struct is defined in the header, for streaming use
 
 /**
  * Initialize a new queue
@@ -61,10 +55,10 @@ Queue *newQueue(int n_items)
  */
 void freeQueue(Queue *q)
 {
-    free(q->dqStack);
-    free(q->dqStack_ext);
-    free(q->eqStack);
-    free(q->eqStack_ext);
+    freeStack(q->dqStack);
+    freeStack(q->dqStack_ext);
+    freeStack(q->eqStack);
+    freeStack(q->eqStack_ext);
     free(q);
 }
 
@@ -241,7 +235,9 @@ double get_max(Queue *q)
 {
     double *dq_max, *eq_max;
     peek(q->dqStack_ext, &dq_max);
-    peek(q->eqStack_ext, &eq_max);
+    // the enqueue stack is empty right after the dequeue stack is refilled
+    if (!peek(q->eqStack_ext, &eq_max))
+        return *dq_max;
     return *dq_max > *eq_max ? *dq_max : *eq_max;
 }
 
@@ -254,7 +250,9 @@ double get_min(Queue *q)
 {
     double *dq_min, *eq_min;
     peek(q->dqStack_ext, &dq_min);
-    peek(q->eqStack_ext, &eq_min);
+    // the enqueue stack is empty right after the dequeue stack is refilled
+    if (!peek(q->eqStack_ext, &eq_min))
+        return *dq_min;
     return *dq_min < *eq_min ? *dq_min : *eq_min;
 }
 
@@ -428,3 +426,104 @@ int main()
 
 }
 */
+
+
+// extrema of `a` and `b` that propagate NaN, once either is NaN the result is NaN
+#define MIN_NAN(a, b) (((a) < (b)) || ((a) != (a)) ? (a) : (b))
+#define MAX_NAN(a, b) (((a) > (b)) || ((a) != (a)) ? (a) : (b))
+
+/**
+ * Compute a rolling/moving minimum and maximum at the same time, using the
+ * van Herk/Gil-Werman algorithm. The data is split into blocks of `wlen`
+ * samples, and every window is covered by the suffix of one block and the prefix
+ * of the next. This takes ~3 comparisons per sample regardless of window length,
+ * and only works on contiguous runs of memory. Windows with a NaN value have
+ * NaN extrema.
+ *
+ * @param n    Number of elements in `x`
+ * @param x    Array of values for which to compute rolling extrema
+ * @param wlen Window length, in samples
+ * @param skip Window skip, in samples
+ * @param rmin Array of minimum results, or NULL to skip
+ * @param rmax Array of maximum results, or NULL to skip
+ *
+ * @result 0 on success, -1 if the workspace could not be allocated
+ */
+int moving_minmax_c(long *n, double x[], long *wlen, long *skip, double rmin[], double rmax[])
+{
+    long w = *wlen;
+    long n_windows = (*n - w) / *skip + 1;
+    // suffix (within a block) and prefix (within the next block) extrema
+    double *work = (double *)malloc(4 * w * sizeof(double));
+    if (!work)
+        return -1;
+    double *smin = work, *pmin = work + w, *smax = work + 2 * w, *pmax = work + 3 * w;
+
+    long k = 0;  // current window
+    while (k < n_windows)
+    {
+        long start = k * *skip;
+        long bs = (start / w) * w;  // start of the block the window starts in
+        long be = bs + w;  // start of the next block
+        // last window starting in this block
+        long k_last = k + (be - 1 - start) / *skip;
+        if (k_last >= n_windows)
+            k_last = n_windows - 1;
+        long last_end = k_last * *skip + w;  // end (exclusive) of the last window
+
+        // suffix extrema from the end of the block back to the first window start
+        if (start < be)
+        {
+            double mn = x[be - 1], mx = x[be - 1];
+            for (long i = be - 1; i >= start; --i)
+            {
+                mn = MIN_NAN(x[i], mn);
+                mx = MAX_NAN(x[i], mx);
+                smin[i - bs] = mn;
+                smax[i - bs] = mx;
+            }
+        }
+        // prefix extrema of the next block, up to the end of the last window
+        if (be < last_end)
+        {
+            double mn = x[be], mx = x[be];
+            for (long i = be; i < last_end; ++i)
+            {
+                mn = MIN_NAN(x[i], mn);
+                mx = MAX_NAN(x[i], mx);
+                pmin[i - be] = mn;
+                pmax[i - be] = mx;
+            }
+        }
+
+        for (; k <= k_last; ++k)
+        {
+            long i = k * *skip - bs;  // window start in the block
+            if (i == 0)
+            {
+                // window is exactly the block
+                if (rmin) rmin[k] = smin[0];
+                if (rmax) rmax[k] = smax[0];
+            }
+            else
+            {
+                double a, b;
+                if (rmin)
+                {
+                    a = smin[i];
+                    b = pmin[i - 1];  // prefix up to window end - 1, relative to `be`
+                    rmin[k] = MIN_NAN(a, b);
+                }
+                if (rmax)
+                {
+                    a = smax[i];
+                    b = pmax[i - 1];
+                    rmax[k] = MAX_NAN(a, b);
+                }
+            }
+        }
+    }
+
+    free(work);
+    return 0;
+}
@@ -5,9 +5,32 @@
 #include <stdio.h>
 #include <math.h>
 
+#include "stack.h"
+
+
+// queue of the window values, with its extrema available in constant time
+typedef struct
+{
+    stack *dqStack;  // dequeue stack
+    stack *dqStack_ext;  // dequeue stack extrema storage
+    stack *eqStack;  // enqueue stack
+    stack *eqStack_ext;  // enqueue stack current extrema storage
+} Queue;
+
+Queue *newQueue(int n_items);
+void freeQueue(Queue *q);
+void enqueue_max(Queue *q, double data);
+void enqueue_min(Queue *q, double data);
+double dequeue_max(Queue *q);
+double dequeue_min(Queue *q);
+double get_max(Queue *q);
+double get_min(Queue *q);
+
 
 // moving extrema functions for 1d arrays
 void moving_max_c(long *n, double x[], long *wlen, long *skip, double res[]);
 void moving_min_c(long *n, double x[], long *wlen, long *skip, double res[]);
+// moving min and max together, for contiguous 1d arrays
+int moving_minmax_c(long *n, double x[], long *wlen, long *skip, double rmin[], double rmax[]);
 
 #endif  // MOVING_EXTREMA_H_
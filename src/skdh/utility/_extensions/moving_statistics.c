@@ -7,6 +7,7 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
+#include <string.h>
 
 /* moving max/min */
 #include "moving_extrema.h"
@@ -20,654 +21,840 @@ extern void moving_moments_3(long *, double *, long *, long *, double *, double
 extern void moving_moments_4(long *, double *, long *, long *, double *, double *, double *, double *);
 /* moving median */
 extern void fmoving_median(long *, double *, long *, long *, double *);
+/* moving quantile */
+extern void fmoving_quantile(long *, double *, long *, long *, long *, double *, long *, double *);
+/* median heaps kept between calls */
+extern void *median_heap_new(long *);
+extern void median_heap_free(void *);
+extern void median_heap_init(void *, double *);
+extern void median_heap_insert(void *, double *);
+extern double median_heap_get(void *);
 
 
-PyObject * moving_mean(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
-    long wlen, skip;
-    int trim;
+/* strided lane iteration */
+#include "lanes.h"
 
-    if (!PyArg_ParseTuple(args, "Ollp:moving_mean", &x_, &wlen, &skip, &trim))
-        return NULL;
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_,
-        PyArray_DescrFromType(NPY_DOUBLE),
-        1,
-        0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
-        NULL
-    );
-    if (!data)
+/*
+Kernel computing every result of one contiguous lane. `res` holds a (contiguous) row
+for each result. Returns 0 on success, and -1 on a memory error.
+*/
+typedef int (*lane_kernel)(long *npts, double *x, long *wlen, long *skip, double **res, void *extra);
+
+
+/* get item `k` of `out`, checking that it can hold a result of shape `rdims` */
+static PyArrayObject * get_out_array(PyObject *out, Py_ssize_t k, int ndim, npy_intp *rdims)
+{
+    PyObject *o = PySequence_GetItem(out, k);
+    if (!o)
         return NULL;
 
-    // get the number of dimensions, and the shape
-    int ndim = PyArray_NDIM(data);
-    const npy_intp *ddims = PyArray_DIMS(data);
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(npy_intp));
-    if (!rdims)
+    int valid = PyArray_Check(o);
+    if (valid)
     {
-        Py_XDECREF(data);
-        return NULL;
+        PyArrayObject *arr = (PyArrayObject *)o;
+        valid = (PyArray_TYPE(arr) == NPY_DOUBLE) && PyArray_ISWRITEABLE(arr)
+            && PyArray_ISALIGNED(arr) && (PyArray_NDIM(arr) == ndim)
+            && PyArray_CompareLists(PyArray_DIMS(arr), rdims, ndim);
     }
-    // create return shape
-    for (int i = 0; i < (ndim - 1); ++i)
+    if (!valid)
     {
-        rdims[i] = ddims[i];
+        Py_DECREF(o);
+        PyErr_SetString(
+            PyExc_ValueError,
+            "`out` arrays must be writeable float64 arrays with the shape of the result."
+        );
+        return NULL;
     }
-    // dimension of the roll
-    if (trim)
+    return (PyArrayObject *)o;
+}
+
+
+/*
+Compute a moving statistic over every lane (the last axis) of `data`, which may have any
+strides, without copying it. `n_out` results are computed for each lane, of which the
+first `n_ret` are returned, and the rest are discarded. `out` is NULL/None, or a sequence
+of `n_ret` arrays (any strides) to write the results into. If `block`, the kernel always
+gets the result rows from one contiguous block, `nres` apart.
+
+Returns a new tuple of the `n_ret` result arrays.
+*/
+static PyObject * run_lanes(
+    PyArrayObject *data, long wlen, long skip, int trim, int n_out, int n_ret, int block,
+    lane_kernel fn, void *extra, PyObject *out
+)
+{
+    int ndim = PyArray_NDIM(data);
+    long npts = PyArray_DIM(data, ndim - 1);
+    long trim_pts = (npts - wlen) / skip + 1;
+    long nres = trim ? trim_pts : (npts - 1) / skip + 1;
+
+    npy_intp rdims[NPY_MAXDIMS];
+    for (int i = 0; i < (ndim - 1); ++i)
+        rdims[i] = PyArray_DIM(data, i);
+    rdims[ndim - 1] = nres;
+
+    if ((out != NULL) && (out != Py_None))
     {
-        rdims[ndim - 1] = trim_pts;
+        if (!PySequence_Check(out) || (PySequence_Size(out) != n_ret))
+        {
+            PyErr_SetString(PyExc_ValueError, "`out` must be a sequence with an array for each result.");
+            return NULL;
+        }
     } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
+        out = NULL;
     }
 
-    PyArrayObject *rmean = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    free(rdims);
+    PyObject *ret = PyTuple_New(n_ret);
+    if (!ret)
+        return NULL;
 
-    if (!rmean)
+    for (int k = 0; k < n_ret; ++k)
     {
-        Py_XDECREF(data);
-        Py_XDECREF(rmean);
-        return NULL;
+        PyArrayObject *r;
+        if (out)
+            r = get_out_array(out, k, ndim, rdims);
+        else
+            r = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+        if (!r)
+        {
+            Py_DECREF(ret);
+            return NULL;
+        }
+        PyTuple_SET_ITEM(ret, k, (PyObject *)r);  /* steals the reference */
     }
 
-    // data pointers
-    double *dptr = (double *)PyArray_DATA(data);
-    double *rmean_ptr = (double *)PyArray_DATA(rmean);
-    // for iterating over the data
-    long res_stride = PyArray_DIM(rmean, ndim - 1);  // stride to get to the next results "column"
-    int nrepeats = PyArray_SIZE(data) / npts;  // number of repetitions to cover all the data
+    lanes_t xl;
+    lanes_t *rl = (lanes_t *)calloc(n_ret > 0 ? n_ret : 1, sizeof(lanes_t));
+    double **res = (double **)malloc((n_out > 0 ? n_out : 1) * sizeof(double *));
+    // rows for discarded results, or for every result if `block`
+    long n_scratch = block ? n_out : n_out - n_ret;
+    double *scratch = n_scratch > 0 ? (double *)malloc(n_scratch * nres * sizeof(double)) : NULL;
+    int n_init = 0, failed = 0;
 
-    for (int i = 0; i < nrepeats; ++i)
+    if (!rl || !res || ((n_scratch > 0) && !scratch))
+    {
+        PyErr_NoMemory();
+        failed = 1;
+    }
+    if (!failed)
+        failed = lanes_init(&xl, data);
+    for (n_init = 0; !failed && (n_init < n_ret); ++n_init)
     {
-        for (int j = trim_pts; j < res_stride; ++j)
+        if (lanes_init(&rl[n_init], (PyArrayObject *)PyTuple_GET_ITEM(ret, n_init)))
         {
-            rmean_ptr[j] = NPY_NAN;
+            failed = 1;
+            lanes_free(&xl);
+            break;
         }
-        mov_moments_1(&npts, dptr, &wlen, &skip, rmean_ptr);
-        dptr += npts;  // increment by number of points in last dimension
-        rmean_ptr += res_stride;
     }
 
-    Py_XDECREF(data);
-
-    return (PyObject *)rmean;
-}
+    if (!failed)
+    {
+        // only touches raw data buffers, release the GIL so that other threads can run
+        Py_BEGIN_ALLOW_THREADS
+        for (npy_intp i = 0; i < xl.size; ++i)
+        {
+            double *x = lanes_get(&xl);
+
+            for (int k = 0; k < n_out; ++k)
+            {
+                if (block || (k >= n_ret))
+                    res[k] = scratch + (block ? k : k - n_ret) * nres;
+                else
+                    res[k] = lanes_out(&rl[k]);
+
+                for (long j = trim_pts > 0 ? trim_pts : 0; j < nres; ++j)
+                    res[k][j] = NPY_NAN;
+            }
+
+            failed |= fn(&npts, x, &wlen, &skip, res, extra);
+
+            for (int k = 0; k < n_ret; ++k)
+            {
+                if (block)
+                    lanes_write(&rl[k], res[k]);
+                else
+                    lanes_put(&rl[k]);
+                lanes_next(&rl[k]);
+            }
+            lanes_next(&xl);
+        }
+        Py_END_ALLOW_THREADS
 
+        lanes_free(&xl);
+        if (failed)
+            PyErr_NoMemory();
+    }
 
-PyObject * moving_sd(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
-    long wlen, skip;
-    int trim, return_others;
+    for (int k = 0; k < n_init; ++k)
+        lanes_free(&rl[k]);
+    free(rl);
+    free(res);
+    free(scratch);
 
-    if (!PyArg_ParseTuple(args, "Ollpp:moving_sd", &x_, &wlen, &skip, &trim, &return_others))
+    if (failed)
+    {
+        Py_DECREF(ret);
         return NULL;
+    }
+    return ret;
+}
+
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
+/* convert the input to double, without copying if it already is */
+static PyArrayObject * get_data(PyObject *x_)
+{
+    return (PyArrayObject *)PyArray_FromAny(
         x_,
         PyArray_DescrFromType(NPY_DOUBLE),
         1,
         0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_ALIGNED,
         NULL
     );
-    if (!data)
+}
+
+
+/* compute a single result, with `out` NULL/None or one array */
+static PyObject * run_lanes_single(
+    PyArrayObject *data, long wlen, long skip, int trim, lane_kernel fn, PyObject *out
+)
+{
+    if ((out == NULL) || (out == Py_None))
+        return run_lanes(data, wlen, skip, trim, 1, 1, 0, fn, NULL, NULL);
+
+    PyObject *outs = PyTuple_Pack(1, out);
+    if (!outs)
         return NULL;
+    PyObject *ret = run_lanes(data, wlen, skip, trim, 1, 1, 0, fn, NULL, outs);
+    Py_DECREF(outs);
+    return ret;
+}
 
-    // get the number of dimensions, and the shape
-    int ndim = PyArray_NDIM(data);
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(ddims));
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
-    if (!rdims)
-    {
-        Py_XDECREF(data);
+
+/* return the only item of a results tuple, or the whole tuple */
+static PyObject * unpack_results(PyObject *ret, int as_tuple)
+{
+    if (!ret || as_tuple)
+        return ret;
+
+    PyObject *r = PyTuple_GET_ITEM(ret, 0);
+    Py_INCREF(r);
+    Py_DECREF(ret);
+    return r;
+}
+
+
+static int mean_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    mov_moments_1(n, x, w, s, res[0]);
+    return 0;
+}
+
+/* results are returned in the order sd, mean */
+static int sd_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    mov_moments_2(n, x, w, s, res[1], res[0]);
+    return 0;
+}
+
+/* results are returned in the order skew, sd, mean */
+static int skew_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    moving_moments_3(n, x, w, s, res[2], res[1], res[0]);
+    return 0;
+}
+
+/* results are returned in the order kurt, skew, sd, mean */
+static int kurt_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    moving_moments_4(n, x, w, s, res[3], res[2], res[1], res[0]);
+    return 0;
+}
+
+static int median_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    fmoving_median(n, x, w, s, res[0]);
+    return 0;
+}
+
+static int max_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    moving_max_c(n, x, w, s, res[0]);
+    return 0;
+}
+
+static int min_kernel(long *n, double *x, long *w, long *s, double **res, void *NPY_UNUSED(extra))
+{
+    moving_min_c(n, x, w, s, res[0]);
+    return 0;
+}
+
+
+PyObject * moving_mean(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *x_, *out = NULL;
+    long wlen, skip;
+    int trim;
+
+    if (!PyArg_ParseTuple(args, "Ollp|O:moving_mean", &x_, &wlen, &skip, &trim, &out))
         return NULL;
-    }
-    // create return shape
-    for (int i = 0; i < (ndim - 1); ++i)
-    {
-        rdims[i] = ddims[i];
-    }
-    // dimension of the roll
-    if (trim)
-    {
-        rdims[ndim - 1] = trim_pts;
-    } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
-    }
 
-    PyArrayObject *rsd   = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    PyArrayObject *rmean = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+    PyArrayObject *data = get_data(x_);
+    if (!data)
+        return NULL;
 
-    if ((!rmean) || (!rsd))
-    {
-        free(rdims);  /* make sure it gets freed */
-        Py_XDECREF(data);
-        Py_XDECREF(rmean);
-        Py_XDECREF(rsd);
+    PyObject *ret = run_lanes_single(data, wlen, skip, trim, mean_kernel, out);
+    Py_DECREF(data);
+
+    return unpack_results(ret, 0);
+}
+
+
+/* moving moments, where the previous moments are computed along the way */
+static PyObject * moving_moment(PyObject *args, const char *fmt, int n_out, lane_kernel fn)
+{
+    PyObject *x_, *out = NULL;
+    long wlen, skip;
+    int trim, return_others;
+
+    if (!PyArg_ParseTuple(args, fmt, &x_, &wlen, &skip, &trim, &return_others, &out))
         return NULL;
-    }
 
-    // data pointers
-    double *dptr      = (double *)PyArray_DATA(data);
-    double *rmean_ptr = (double *)PyArray_DATA(rmean);
-    double *rsd_ptr   = (double *)PyArray_DATA(rsd);
-    // for iterating over the data
-    long stride = ddims[ndim-1];  // stride to get to the next computation "column"
-    long res_stride = rdims[ndim-1];  // stride to get to the next results "column"
-    int nrepeats = PyArray_SIZE(data) / stride;  // number of repetitions to cover all the data
-    // has to be freed down here since its used by res_stride
-    free(rdims);
-
-    for (int i = 0; i < nrepeats; ++i)
-    {
-        for (int j = trim_pts; j < res_stride; ++j)
-        {
-            rmean_ptr[j] = NPY_NAN;
-        }
-        for (int j = trim_pts; j < res_stride; ++j)
-        {
-            rsd_ptr[j] = NPY_NAN;
-        }
-        mov_moments_2(&stride, dptr, &wlen, &skip, rmean_ptr, rsd_ptr);
-        dptr += stride;
-        rmean_ptr += res_stride;
-        rsd_ptr += res_stride;
-    }
-    
-    Py_XDECREF(data);
+    PyArrayObject *data = get_data(x_);
+    if (!data)
+        return NULL;
 
+    int n_ret = return_others ? n_out : 1;
+    PyObject *ret;
     if (return_others)
-    {
-        return Py_BuildValue(
-            "NN",  /* dont want to increase ref count */
-            (PyObject *)rsd,
-            (PyObject *)rmean
-        );
-    }
+        ret = run_lanes(data, wlen, skip, trim, n_out, n_ret, 0, fn, NULL, out);
+    else if ((out == NULL) || (out == Py_None))
+        ret = run_lanes(data, wlen, skip, trim, n_out, n_ret, 0, fn, NULL, NULL);
     else
     {
-        Py_XDECREF(rmean);
-        return (PyObject *)rsd;
+        // only one result, `out` is an array
+        PyObject *outs = PyTuple_Pack(1, out);
+        ret = outs ? run_lanes(data, wlen, skip, trim, n_out, n_ret, 0, fn, NULL, outs) : NULL;
+        Py_XDECREF(outs);
     }
+    Py_DECREF(data);
+
+    return unpack_results(ret, return_others);
+}
+
+
+PyObject * moving_sd(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    return moving_moment(args, "Ollpp|O:moving_sd", 2, sd_kernel);
 }
 
 
-PyObject * moving_skewness(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
+PyObject * moving_skewness(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    return moving_moment(args, "Ollpp|O:moving_skewness", 3, skew_kernel);
+}
+
+
+PyObject * moving_kurtosis(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    return moving_moment(args, "Ollpp|O:moving_kurtosis", 4, kurt_kernel);
+}
+
+
+/* moving statistics with a single result */
+static PyObject * moving_single(PyObject *args, const char *fmt, lane_kernel fn)
+{
+    PyObject *x_, *out = NULL;
     long wlen, skip;
-    int trim, return_others;
+    int trim;
 
-    if (!PyArg_ParseTuple(args, "Ollpp:moving_skewness", &x_, &wlen, &skip, &trim, &return_others))
+    if (!PyArg_ParseTuple(args, fmt, &x_, &wlen, &skip, &trim, &out))
         return NULL;
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_,
-        PyArray_DescrFromType(NPY_DOUBLE),
-        1,
-        0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
-        NULL
-    );
+    PyArrayObject *data = get_data(x_);
     if (!data)
         return NULL;
 
-    // get the number of dimensions, and the shape
-    int ndim = PyArray_NDIM(data);
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(ddims));
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
-    if (!rdims)
-    {
-        Py_XDECREF(data);
-        return NULL;
-    }
-    // create return shape
-    for (int i = 0; i < (ndim - 1); ++i)
-    {
-        rdims[i] = ddims[i];
-    }
-    // dimension of the roll
-    if (trim)
-    {
-        rdims[ndim - 1] = trim_pts;
-    } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
-    }
+    PyObject *ret = run_lanes_single(data, wlen, skip, trim, fn, out);
+    Py_DECREF(data);
 
-    PyArrayObject *rsd   = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    PyArrayObject *rmean = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    PyArrayObject *rskew = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+    return unpack_results(ret, 0);
+}
 
-    if ((!rmean) || (!rsd) || (!rskew))
-    {
-        free(rdims);  /* make sure it gets freed */
-        Py_XDECREF(data);
-        Py_XDECREF(rskew);
-        Py_XDECREF(rsd);
-        Py_XDECREF(rmean);
-        return NULL;
-    }
 
-    // data pointers
-    double *dptr      = (double *)PyArray_DATA(data);
-    double *rmean_ptr = (double *)PyArray_DATA(rmean);
-    double *rsd_ptr   = (double *)PyArray_DATA(rsd);
-    double *rskew_ptr = (double *)PyArray_DATA(rskew);
-    // for iterating over the data
-    long stride = ddims[ndim-1];  // stride to get to the next computation "column"
-    long res_stride = rdims[ndim-1];  // stride to get to the next results "column"
-    int nrepeats = PyArray_SIZE(data) / stride;  // number of repetitions to cover all the data
-    // has to be freed down here since its used by res_stride
-    free(rdims);
-
-    for (int i = 0; i < nrepeats; ++i)
-    {
-        // splitting up so we are accessing contiguous memory each time
-        for (int j = trim_pts; j < res_stride; ++j)
-        {
-            rmean_ptr[j] = NPY_NAN;
-            rsd_ptr[j] = NPY_NAN;
-            rskew_ptr[j] = NPY_NAN;
-        }
-        moving_moments_3(&stride, dptr, &wlen, &skip, rmean_ptr, rsd_ptr, rskew_ptr);
-        dptr += stride;
-        rmean_ptr += res_stride;
-        rsd_ptr += res_stride;
-        rskew_ptr += res_stride;
-    }
-    
-    Py_XDECREF(data);
+PyObject * moving_median(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    return moving_single(args, "Ollp|O:moving_median", median_kernel);
+}
 
-    if (return_others)
-    {
-        return Py_BuildValue(
-            "NNN",  /* dont want to increase ref count */
-            (PyObject *)rskew,
-            (PyObject *)rsd,
-            (PyObject *)rmean
-        );
-    }
-    else
-    {
-        Py_XDECREF(rmean);
-        Py_XDECREF(rsd);
-        return (PyObject *)rskew;
-    }
+
+PyObject * moving_max(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    return moving_single(args, "Ollp|O:moving_max", max_kernel);
 }
 
 
-PyObject * moving_kurtosis(PyObject *NPY_UNUSED(self), PyObject *args){
-    PyObject *x_;
+PyObject * moving_min(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    return moving_single(args, "Ollp|O:moving_min", min_kernel);
+}
+
+
+typedef struct {
+    long nq;
+    double *q;
+    long ld;  // stride between the result rows
+} quantile_extra;
+
+/* result rows are one contiguous block, `ld` apart */
+static int quantile_kernel(long *n, double *x, long *w, long *s, double **res, void *extra)
+{
+    quantile_extra *qe = (quantile_extra *)extra;
+
+    fmoving_quantile(n, x, w, s, &qe->nq, qe->q, &qe->ld, res[0]);
+    return 0;
+}
+
+
+PyObject * moving_quantile(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *x_, *q_, *out = NULL;
     long wlen, skip;
-    int trim, return_others;
+    int trim;
 
-    if (!PyArg_ParseTuple(args, "Ollpp:moving_kurtosis", &x_, &wlen, &skip, &trim, &return_others))
+    if (!PyArg_ParseTuple(args, "OllpO|O:moving_quantile", &x_, &wlen, &skip, &trim, &q_, &out))
         return NULL;
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_,
+    PyArrayObject *data = get_data(x_);
+    if (!data)
+        return NULL;
+    PyArrayObject *quantiles = (PyArrayObject *)PyArray_FromAny(
+        q_,
         PyArray_DescrFromType(NPY_DOUBLE),
         1,
-        0,
+        1,
         NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
         NULL
     );
-    if (!data) return NULL;
-
-    // get the number of dimensions, and the shape
-    int ndim = PyArray_NDIM(data);
-    npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(ddims));
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
-    if (!rdims)
+    if (!quantiles)
     {
-        Py_XDECREF(data);
+        Py_DECREF(data);
         return NULL;
     }
-    // create return shape
+
+    // results have an extra leading dimension for the quantiles
+    int ndim = PyArray_NDIM(data);
+    long npts = PyArray_DIM(data, ndim - 1);
+    long nq = PyArray_SIZE(quantiles);
+    npy_intp rdims[NPY_MAXDIMS];
+
+    rdims[0] = nq;
     for (int i = 0; i < (ndim - 1); ++i)
+        rdims[i + 1] = PyArray_DIM(data, i);
+    rdims[ndim] = trim ? (npts - wlen) / skip + 1 : (npts - 1) / skip + 1;
+
+    PyArrayObject *rquant;
+    if ((out != NULL) && (out != Py_None))
     {
-        rdims[i] = ddims[i];
+        PyObject *tmp = PyTuple_Pack(1, out);
+        rquant = tmp ? get_out_array(tmp, 0, ndim + 1, rdims) : NULL;
+        Py_XDECREF(tmp);
+    } else {
+        rquant = (PyArrayObject *)PyArray_EMPTY(ndim + 1, rdims, NPY_DOUBLE, 0);
     }
-    // dimension of the roll
-    if (trim)
+    // each quantile is a separate result
+    PyObject *views = rquant ? PySequence_Tuple((PyObject *)rquant) : NULL;
+
+    PyObject *ret = NULL;
+    if (views && (nq > 0))
     {
-        rdims[ndim - 1] = trim_pts;
-    } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
+        quantile_extra qe = {nq, (double *)PyArray_DATA(quantiles), rdims[ndim]};
+        ret = run_lanes(data, wlen, skip, trim, nq, nq, 1, quantile_kernel, &qe, views);
     }
 
-    PyArrayObject *rsd   = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    PyArrayObject *rmean = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    PyArrayObject *rskew = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    PyArrayObject *rkurt = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+    Py_DECREF(data);
+    Py_DECREF(quantiles);
+    Py_XDECREF(views);
 
-    if (!rmean || !rsd || !rskew || !rkurt)
+    if ((nq > 0) && !ret)
     {
-        free(rdims);  /* make sure it gets freed */
-        Py_XDECREF(data);
-        Py_XDECREF(rkurt);
-        Py_XDECREF(rskew);
-        Py_XDECREF(rsd);
-        Py_XDECREF(rmean);
+        Py_XDECREF(rquant);
         return NULL;
     }
+    Py_XDECREF(ret);
+
+    return (PyObject *)rquant;
+}
+
+
+typedef struct {
+    int idx[5];  // index of each statistic in the results, -1 if not requested
+    int n_ret;   // number of requested statistics
+} stats_extra;
+
+/* statistics are in the order mean, sd, min, max, median */
+static int stats_kernel(long *n, double *x, long *w, long *s, double **res, void *extra)
+{
+    stats_extra *se = (stats_extra *)extra;
+    const int *idx = se->idx;
+    int failed = 0;
 
-    // data pointers
-    double *dptr      = (double *)PyArray_DATA(data);
-    double *rmean_ptr = (double *)PyArray_DATA(rmean);
-    double *rsd_ptr   = (double *)PyArray_DATA(rsd);
-    double *rskew_ptr = (double *)PyArray_DATA(rskew);
-    double *rkurt_ptr = (double *)PyArray_DATA(rkurt);
-    // for iterating over the data
-    long stride = ddims[ndim-1];  // stride to get to the next computation "column"
-    long res_stride = rdims[ndim-1];  // stride to get to the next results "column"
-    int nrepeats = PyArray_SIZE(data) / stride;  // number of repetitions to cover all the data
-    // has to be freed down here since its used by res_stride
-    free(rdims);
-
-    for (int i = 0; i < nrepeats; ++i)
+    if (idx[1] >= 0)
     {
-        for (int j = trim_pts; j < res_stride; ++j)
-        {
-            rmean_ptr[j] = NPY_NAN;
-            rsd_ptr[j] = NPY_NAN;
-            rskew_ptr[j] = NPY_NAN;
-            rkurt_ptr[j] = NPY_NAN;
-        }
-        moving_moments_4(&stride, dptr, &wlen, &skip, rmean_ptr, rsd_ptr, rskew_ptr, rkurt_ptr);
-        dptr += stride;
-        rmean_ptr += res_stride;
-        rsd_ptr += res_stride;
-        rskew_ptr += res_stride;
-        rkurt_ptr += res_stride;
+        // the sd kernel always computes the mean, use the discarded row if not requested
+        double *rmean = idx[0] >= 0 ? res[idx[0]] : res[se->n_ret];
+        mov_moments_2(n, x, w, s, rmean, res[idx[1]]);
     }
-    
-    Py_XDECREF(data);
-
-    if (return_others)
+    else if (idx[0] >= 0)
     {
-        return Py_BuildValue(
-            "NNNN",  /* dont want to increase ref count */
-            (PyObject *)rkurt,
-            (PyObject *)rskew,
-            (PyObject *)rsd,
-            (PyObject *)rmean
-        );
+        mov_moments_1(n, x, w, s, res[idx[0]]);
     }
-    else
+    if ((idx[2] >= 0) || (idx[3] >= 0))
     {
-        Py_XDECREF(rmean);
-        Py_XDECREF(rsd);
-        Py_XDECREF(rskew);
-        return (PyObject *)rkurt;
+        // compute both in one pass when requested together
+        failed |= moving_minmax_c(
+            n, x, w, s, idx[2] >= 0 ? res[idx[2]] : NULL, idx[3] >= 0 ? res[idx[3]] : NULL
+        );
     }
+    if (idx[4] >= 0)
+        fmoving_median(n, x, w, s, res[idx[4]]);
+
+    return failed ? -1 : 0;
 }
 
 
-PyObject * moving_median(PyObject *NPY_UNUSED(self), PyObject *args)
+PyObject * moving_stats(PyObject *NPY_UNUSED(self), PyObject *args)
 {
-    PyObject *x_;
+    PyObject *x_, *out = NULL;
     long wlen, skip;
-    int trim;
+    int trim, flags[5];
 
-    if (!PyArg_ParseTuple(args, "Ollp:moving_median", &x_, &wlen, &skip, &trim)) return NULL;
+    if (!PyArg_ParseTuple(
+        args, "Ollpppppp|O:moving_stats", &x_, &wlen, &skip, &trim,
+        &flags[0], &flags[1], &flags[2], &flags[3], &flags[4], &out
+    ))
+        return NULL;
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-      x_,
-      PyArray_DescrFromType(NPY_DOUBLE),
-      1,
-      0,
-      NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
-      NULL
-    );
-    if (!data) return NULL;
+    stats_extra se;
+    se.n_ret = 0;
+    for (int k = 0; k < 5; ++k)
+        se.idx[k] = flags[k] ? se.n_ret++ : -1;
+    int n_out = se.n_ret + (flags[1] && !flags[0]);
 
-    // get the number of dimensions and the shape
-    int ndim = PyArray_NDIM(data);
-    const npy_intp *ddims = PyArray_DIMS(data);
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(npy_intp));
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
+    PyArrayObject *data = get_data(x_);
+    if (!data)
+        return NULL;
 
-    // create the return shape
-    for (int i = 0; i < (ndim - 1); ++i)
-    {
-        rdims[i] = ddims[i];
-    }
-    // dimension of the roll
-    if (trim)
-    {
-        rdims[ndim - 1] = trim_pts;
-    } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
-    }
+    // compute every requested statistic on a lane while it is still in cache, then
+    // move to the next lane
+    PyObject *ret = run_lanes(data, wlen, skip, trim, n_out, se.n_ret, 0, stats_kernel, &se, out);
+    Py_DECREF(data);
 
-    // allocate the return
-    PyArrayObject *rmed = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    free(rdims);  // free the return dimensions array
-    if (!rmed)
-    {
-        Py_XDECREF(data);
-        Py_XDECREF(rmed);
-        return NULL;
-    }
+    return ret;
+}
+
+
+/*
+Streaming moving statistics, which keep the window of each lane (the median heaps, or
+the extrema queue) between calls, so that every sample is only processed once. Uses the
+same data structures, in the same order, as the batch kernels.
+*/
+enum {STREAM_MEDIAN, STREAM_MAX, STREAM_MIN};
 
-    // data pointers
-    double *dptr = (double *)PyArray_DATA(data);
-    double *rptr = (double *)PyArray_DATA(rmed);
-    // for iterating over the data
-    long res_stride = PyArray_DIM(rmed, ndim - 1);  // stride to get to the next results column
-    int nrepeats = PyArray_SIZE(data) / npts;  // number of "columns"
+/* position in the stream, which is the same for every lane */
+typedef struct {
+    long nbuf;    // samples of the first window collected
+    long n_drop;  // samples to drop before the next window, if `skip > wlen`
+    long n_new;   // samples inserted since the last window
+    int init;     // if the first window is complete
+} stream_pos;
 
-    // iterate
-    for (int i = 0; i < nrepeats; ++i)
+typedef struct {
+    int kind;
+    long wlen, skip;
+    npy_intp n_lanes;
+    void **state;  // median heap or extrema queue of each lane
+    double *buf;   // first window of each lane
+    stream_pos pos;
+} stream_t;
+
+
+static void stream_free(stream_t *s)
+{
+    if (!s)
+        return;
+    if (s->state)
     {
-        for (int j = trim_pts; j < res_stride; ++j)
+        for (npy_intp i = 0; i < s->n_lanes; ++i)
         {
-            rptr[j] = NPY_NAN;
+            if (!s->state[i])
+                continue;
+            if (s->kind == STREAM_MEDIAN)
+                median_heap_free(s->state[i]);
+            else
+                freeQueue((Queue *)s->state[i]);
         }
-        fmoving_median(&npts, dptr, &wlen, &skip, rptr);
-        dptr += npts;  // increment by number of points in the last dimension
-        rptr += res_stride;
     }
+    free(s->state);
+    free(s->buf);
+    free(s);
+}
 
-    Py_XDECREF(data);
 
-    return (PyObject *)rmed;
+static void stream_capsule_free(PyObject *capsule)
+{
+    stream_free((stream_t *)PyCapsule_GetPointer(capsule, "skdh.moving_stream"));
 }
 
 
-PyObject * moving_max(PyObject *NPY_UNUSED(self), PyObject *args)
+/* advance lane `lane` by the `n` samples of `x`, writing completed windows to `res`.
+Without `x` only counts the completed windows */
+static npy_intp stream_run(stream_t *s, stream_pos *p, npy_intp lane, double *x, npy_intp n, double *res)
 {
-    PyObject *x_;
-    long wlen, skip;
-    int trim;
+    long w = s->wlen;
+    long step = s->skip < w ? s->skip : w;  // new samples in each window
+    void *st = x ? s->state[lane] : NULL;
+    npy_intp k = 0;
 
-    if (!PyArg_ParseTuple(args, "Ollp:moving_max", &x_, &wlen, &skip, &trim))
-        return NULL;
+    for (npy_intp i = 0; i < n; ++i)
+    {
+        if (p->n_drop > 0)
+        {
+            --p->n_drop;
+            continue;
+        }
+        if (!p->init)
+        {
+            if (x)
+                s->buf[lane * w + p->nbuf] = x[i];
+            if (++p->nbuf < w)
+                continue;
+            if (x)
+            {
+                double *b = s->buf + lane * w;
+                if (s->kind == STREAM_MEDIAN)
+                    median_heap_init(st, b);
+                else
+                {
+                    for (long j = 0; j < w; ++j)
+                    {
+                        if (s->kind == STREAM_MAX)
+                            enqueue_max((Queue *)st, b[j]);
+                        else
+                            enqueue_min((Queue *)st, b[j]);
+                    }
+                }
+            }
+            p->init = 1;
+        }
+        else
+        {
+            if (x)
+            {
+                // replace the oldest sample in the window
+                if (s->kind == STREAM_MEDIAN)
+                    median_heap_insert(st, &x[i]);
+                else if (s->kind == STREAM_MAX)
+                {
+                    dequeue_max((Queue *)st);
+                    enqueue_max((Queue *)st, x[i]);
+                }
+                else
+                {
+                    dequeue_min((Queue *)st);
+                    enqueue_min((Queue *)st, x[i]);
+                }
+            }
+            if (++p->n_new < step)
+                continue;
+        }
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_,
-        PyArray_DescrFromType(NPY_DOUBLE),
-        1,
-        0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
-        NULL
-    );
-    if (!data)
+        // a window is complete
+        if (x)
+        {
+            if (s->kind == STREAM_MEDIAN)
+                res[k] = median_heap_get(st);
+            else if (s->kind == STREAM_MAX)
+                res[k] = get_max((Queue *)st);
+            else
+                res[k] = get_min((Queue *)st);
+        }
+        ++k;
+        p->n_new = 0;
+        p->n_drop = s->skip > w ? s->skip - w : 0;
+        // like the batch kernel, windows with all new samples are sorted again instead of
+        // sifting every sample through the heaps
+        if ((s->kind == STREAM_MEDIAN) && (s->skip >= w))
+        {
+            p->init = 0;
+            p->nbuf = 0;
+        }
+    }
+    return k;
+}
+
+
+PyObject * moving_stream_new(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    const char *kind;
+    Py_ssize_t n_lanes;
+    long wlen, skip;
+
+    if (!PyArg_ParseTuple(args, "snll:moving_stream_new", &kind, &n_lanes, &wlen, &skip))
         return NULL;
 
-    // get the number of dimensions, and the shape
-    int ndim = PyArray_NDIM(data);
-    const npy_intp *ddims = PyArray_DIMS(data);
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(npy_intp));
-    if (!rdims)
+    if ((wlen <= 0) || (skip <= 0) || (n_lanes < 0))
     {
-        Py_XDECREF(data);
+        PyErr_SetString(PyExc_ValueError, "`wlen` and `skip` cannot be less than or equal to 0.");
         return NULL;
     }
-    // create return shape
-    for (int i = 0; i < (ndim - 1); ++i)
-    {
-        rdims[i] = ddims[i];
-    }
-    // dimension of the roll
-    if (trim)
-    {
-        rdims[ndim - 1] = trim_pts;
-    } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
-    }
 
-    PyArrayObject *rmax = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    free(rdims);
+    stream_t *s = (stream_t *)calloc(1, sizeof(stream_t));
+    if (!s)
+        return PyErr_NoMemory();
 
-    if (!rmax)
+    if (!strcmp(kind, "median"))
+        s->kind = STREAM_MEDIAN;
+    else if (!strcmp(kind, "max"))
+        s->kind = STREAM_MAX;
+    else if (!strcmp(kind, "min"))
+        s->kind = STREAM_MIN;
+    else
     {
-        Py_XDECREF(data);
-        Py_XDECREF(rmax);
+        free(s);
+        PyErr_SetString(PyExc_ValueError, "`kind` must be one of 'median', 'max', or 'min'.");
         return NULL;
     }
-
-    // data pointers
-    double *dptr = (double *)PyArray_DATA(data);
-    double *rmax_ptr = (double *)PyArray_DATA(rmax);
-    // for iterating over the data
-    long res_stride = PyArray_DIM(rmax, ndim - 1);  // stride to get to the next results column
-    int nrepeats = PyArray_SIZE(data) / npts;  // # of repetitions to cover all the data
-
-    for (int i = 0; i < nrepeats; ++i)
+    s->wlen = wlen;
+    s->skip = skip;
+    s->n_lanes = n_lanes;
+
+    s->state = (void **)calloc(n_lanes > 0 ? n_lanes : 1, sizeof(void *));
+    s->buf = (double *)malloc((n_lanes > 0 ? n_lanes : 1) * wlen * sizeof(double));
+    int failed = !s->state || !s->buf;
+    for (npy_intp i = 0; !failed && (i < n_lanes); ++i)
     {
-        for (int j = trim_pts; j < res_stride; ++j)
-        {
-            rmax_ptr[j] = NPY_NAN;
-        }
-        moving_max_c(&npts, dptr, &wlen, &skip, rmax_ptr);
-        dptr += npts; // increment by number of points in last dimension
-        rmax_ptr += res_stride;
+        if (s->kind == STREAM_MEDIAN)
+            s->state[i] = median_heap_new(&wlen);
+        else
+            s->state[i] = newQueue(wlen);
+        failed = !s->state[i];
+    }
+    if (failed)
+    {
+        stream_free(s);
+        return PyErr_NoMemory();
     }
 
-    Py_XDECREF(data);
-
-    return (PyObject *)rmax;
+    PyObject *capsule = PyCapsule_New(s, "skdh.moving_stream", stream_capsule_free);
+    if (!capsule)
+        stream_free(s);
+    return capsule;
 }
 
 
-PyObject * moving_min(PyObject *NPY_UNUSED(self), PyObject *args)
+PyObject * moving_stream_update(PyObject *NPY_UNUSED(self), PyObject *args)
 {
-    PyObject *x_;
-    long wlen, skip;
-    int trim;
+    PyObject *capsule, *x_;
 
-    if (!PyArg_ParseTuple(args, "Ollp:moving_min", &x_, &wlen, &skip, &trim))
+    if (!PyArg_ParseTuple(args, "OO:moving_stream_update", &capsule, &x_))
         return NULL;
 
-    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
-        x_,
-        PyArray_DescrFromType(NPY_DOUBLE),
-        1,
-        0,
-        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
-        NULL
-    );
+    stream_t *s = (stream_t *)PyCapsule_GetPointer(capsule, "skdh.moving_stream");
+    if (!s)
+        return NULL;
+
+    PyArrayObject *data = get_data(x_);
     if (!data)
         return NULL;
 
-    // get the number of dimensions, and the shape
     int ndim = PyArray_NDIM(data);
-    const npy_intp *ddims = PyArray_DIMS(data);
-    long npts = ddims[ndim - 1];
-    long trim_pts = (npts - wlen) / skip + 1;
-    npy_intp *rdims = (npy_intp *)malloc(ndim * sizeof(npy_intp));
-    if (!rdims)
-    {
-        Py_XDECREF(data);
-        return NULL;
-    }
-    // create return shape
+    npy_intp n = PyArray_DIM(data, ndim - 1);
+    npy_intp n_lanes = 1;
     for (int i = 0; i < (ndim - 1); ++i)
+        n_lanes *= PyArray_DIM(data, i);
+
+    if (n_lanes != s->n_lanes)
     {
-        rdims[i] = ddims[i];
-    }
-    // dimension of the roll
-    if (trim)
-    {
-        rdims[ndim - 1] = trim_pts;
-    } else {
-        rdims[ndim - 1] = (npts - 1) / skip + 1;
+        Py_DECREF(data);
+        PyErr_SetString(PyExc_ValueError, "Chunk shape does not match previous chunks.");
+        return NULL;
     }
 
-    PyArrayObject *rmin = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
-    free(rdims);
+    // windows completed by this chunk
+    stream_pos end = s->pos;
+    npy_intp nw = stream_run(s, &end, 0, NULL, n, NULL);
+
+    npy_intp rdims[NPY_MAXDIMS];
+    for (int i = 0; i < (ndim - 1); ++i)
+        rdims[i] = PyArray_DIM(data, i);
+    rdims[ndim - 1] = nw;
 
-    if (!rmin)
+    PyArrayObject *res = (PyArrayObject *)PyArray_EMPTY(ndim, rdims, NPY_DOUBLE, 0);
+    if (!res)
     {
-        Py_XDECREF(data);
-        Py_XDECREF(rmin);
+        Py_DECREF(data);
         return NULL;
     }
 
-    // data pointers
-    double *dptr = (double *)PyArray_DATA(data);
-    double *rmin_ptr = (double *)PyArray_DATA(rmin);
-    // for iterating over the data
-    long res_stride = PyArray_DIM(rmin, ndim - 1);  // stride to get to the next results column
-    int nrepeats = PyArray_SIZE(data) / npts;  // # of repetitions to cover all the data
-
-    for (int i = 0; i < nrepeats; ++i)
+    if ((n > 0) && (n_lanes > 0))
     {
-        for (int j = trim_pts; j < res_stride; ++j)
+        lanes_t xl;
+        if (lanes_init(&xl, data))
         {
-            rmin_ptr[j] = NPY_NAN;
+            Py_DECREF(data);
+            Py_DECREF(res);
+            return NULL;
         }
-        moving_min_c(&npts, dptr, &wlen, &skip, rmin_ptr);
-        dptr += npts; // increment by number of points in last dimension
-        rmin_ptr += res_stride;
-    }
+        double *rptr = (double *)PyArray_DATA(res);
 
-    Py_XDECREF(data);
+        Py_BEGIN_ALLOW_THREADS
+        for (npy_intp i = 0; i < xl.size; ++i)
+        {
+            stream_pos p = s->pos;
+            stream_run(s, &p, i, lanes_get(&xl), n, rptr + i * nw);
+            lanes_next(&xl);
+        }
+        Py_END_ALLOW_THREADS
+
+        lanes_free(&xl);
+    }
+    s->pos = end;
+    Py_DECREF(data);
 
-    return (PyObject *)rmin;
+    return (PyObject *)res;
 }
 
 
-static const char rmean_doc[] = "moving_mean(a, wlen, skip)\n\n"
+static const char rmean_doc[] = "moving_mean(a, wlen, skip, trim, out=None)\n\n"
 "Compute the rolling mean over windows of length `wlen` with `skip` samples between window starts.\n\n"
 "Paramters\n"
 "---------\n"
 "a : array-like\n"
-"    Array of data to compute the rolling mean for. Computation axis is the last axis.\n"
+"    Array of data to compute the rolling mean for. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
 "    Samples between window starts. `skip=wlen` would result in non-overlapping sequential windows.\n"
 "trim : bool\n"
 "    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN. Default is True.\n\n"
+"out : {None, numpy.ndarray}\n"
+"    Array with the shape of the result to write it into. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rmean : numpy.ndarray\n"
 "    Rolling mean.";
 
-static const char rsd_doc[] = "moving_sd(a, wlen, skip, return_previous)\n\n"
+static const char rsd_doc[] = "moving_sd(a, wlen, skip, trim, return_previous, out=None)\n\n"
 "Compute the rolling standard deviation over windows of length `wlen` with `skip` samples "
 "between window starts.  Because previous rolling moments have to be computed as part of "
 "the process, they are availble to return as well.\n\n"
 "Paramters\n"
 "---------\n"
 "a : array-like\n"
-"    Array of data to compute the rolling standar deviation for. Computation axis is the last axis.\n"
+"    Array of data to compute the rolling standar deviation for. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
@@ -675,7 +862,9 @@ static const char rsd_doc[] = "moving_sd(a, wlen, skip, return_previous)\n\n"
 "trim : bool\n"
 "    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN. Default is True.\n\n"
 "return_previous : bool\n"
-"    Return the previous rolling moments."
+"    Return the previous rolling moments.\n"
+"out : {None, tuple, numpy.ndarray}\n"
+"    Arrays with the shape of the result to write each returned result into, or one array if `return_previous` is False. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rsd : numpy.ndarray\n"
@@ -683,14 +872,14 @@ static const char rsd_doc[] = "moving_sd(a, wlen, skip, return_previous)\n\n"
 "rmean : numpy.ndarray, optional\n"
 "    Rolling mean. Only returned if `return_previous` is `True`.";
 
-static const char rskew_doc[] = "moving_skewness(a, wlen, skip, return_previous)\n\n"
+static const char rskew_doc[] = "moving_skewness(a, wlen, skip, trim, return_previous, out=None)\n\n"
 "Compute the rolling skewness over windows of length `wlen` with `skip` samples "
 "between window starts.  Because previous rolling moments have to be computed as part of "
 "the process, they are availble to return as well.\n\n"
 "Paramters\n"
 "---------\n"
 "a : array-like\n"
-"    Array of data to compute the rolling skewness for. Computation axis is the last axis.\n"
+"    Array of data to compute the rolling skewness for. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
@@ -698,7 +887,9 @@ static const char rskew_doc[] = "moving_skewness(a, wlen, skip, return_previous)
 "trim : bool\n"
 "    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN. Default is True.\n\n"
 "return_previous : bool\n"
-"    Return the previous rolling moments."
+"    Return the previous rolling moments.\n"
+"out : {None, tuple, numpy.ndarray}\n"
+"    Arrays with the shape of the result to write each returned result into, or one array if `return_previous` is False. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rskew : numpy.ndarray\n"
@@ -708,14 +899,14 @@ static const char rskew_doc[] = "moving_skewness(a, wlen, skip, return_previous)
 "rmean : numpy.ndarray, optional\n"
 "    Rolling mean. Only returned if `return_previous` is `True`.";
 
-static const char rkurt_doc[] = "moving_kurtosis(a, wlen, skip, return_previous)\n\n"
+static const char rkurt_doc[] = "moving_kurtosis(a, wlen, skip, trim, return_previous, out=None)\n\n"
 "Compute the rolling kurtosis over windows of length `wlen` with `skip` samples "
 "between window starts.  Because previous rolling moments have to be computed as part of "
 "the process, they are availble to return as well.\n\n"
 "Parameters\n"
 "---------\n"
 "a : array-like\n"
-"    Array of data to compute the rolling kurtosis for. Computation axis is the last axis.\n"
+"    Array of data to compute the rolling kurtosis for. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
@@ -723,7 +914,9 @@ static const char rkurt_doc[] = "moving_kurtosis(a, wlen, skip, return_previous)
 "trim : bool\n"
 "    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN. Default is True.\n\n"
 "return_previous : bool\n"
-"    Return the previous rolling moments."
+"    Return the previous rolling moments.\n"
+"out : {None, tuple, numpy.ndarray}\n"
+"    Arrays with the shape of the result to write each returned result into, or one array if `return_previous` is False. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rkurt : numpy.ndarray\n"
@@ -735,64 +928,150 @@ static const char rkurt_doc[] = "moving_kurtosis(a, wlen, skip, return_previous)
 "rmean : numpy.ndarray, optional\n"
 "    Rolling mean. Only returned if `return_previous` is `True`.";
 
-static const char rmed_doc[] = "moving_median(a, wlen, skip)\n\n"
+static const char rmed_doc[] = "moving_median(a, wlen, skip, trim, out=None)\n\n"
 "Compute the rolling median over windows of length `wlen` with `skip` samples "
 "between window starts.\n\n"
 "Parameters\n"
 "----------\n"
 "a : array-like\n"
-"    Array of data to compute rolling median on. Computation axis is the last axis.\n"
+"    Array of data to compute rolling median on. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
 "    Samples between window starts. `skip=wlen` would result in non-overlapping sequential windows.\n"
 "trim : bool\n"
 "    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN. Default is True.\n\n"
+"out : {None, numpy.ndarray}\n"
+"    Array with the shape of the result to write it into. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rmed : numpy.ndarray\n"
 "    Rolling median.";
 
-static const char rmax_doc[] = "moving_max(a, wlen, skip)\n\n"
+static const char rquant_doc[] = "moving_quantile(a, wlen, skip, trim, q, out=None)\n\n"
+"Compute rolling quantiles over windows of length `wlen` with `skip` samples "
+"between window starts. Quantiles are linearly interpolated between the closest "
+"order statistics.\n\n"
+"Parameters\n"
+"----------\n"
+"a : array-like\n"
+"    Array of data to compute rolling quantiles on. Computation axis is the last axis, which can have any strides.\n"
+"wlen : int\n"
+"    Window size in samples.\n"
+"skip : int\n"
+"    Samples between window starts. `skip=wlen` would result in non-overlapping sequential windows.\n"
+"trim : bool\n"
+"    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN.\n"
+"q : array-like\n"
+"    1D array of quantiles to compute, each between 0 and 1.\n\n"
+"out : {None, numpy.ndarray}\n"
+"    Array with the shape of the result to write it into. Any strides are accepted.\n\n"
+"Returns\n"
+"-------\n"
+"rquant : numpy.ndarray\n"
+"    Rolling quantiles, with the quantiles on the first axis.";
+
+static const char rmax_doc[] = "moving_max(a, wlen, skip, trim, out=None)\n\n"
 "Compute the rolling maximum over windows of length `wlen` with `skip` samples "
 "between window starts.\n\n"
 "Parameters\n"
 "----------\n"
 "a : array-like\n"
-"    Array of data to compute rolling max on. Computation axis is the last axis.\n"
+"    Array of data to compute rolling max on. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
 "    Samples between window starts. `skip=wlen` would result in non-overlapping sequential windows.\n"
+"out : {None, numpy.ndarray}\n"
+"    Array with the shape of the result to write it into. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rmax : numpy.ndarray\n"
 "    Rolling max.";
 
-static const char rmin_doc[] = "moving_min(a, wlen, skip)\n\n"
+static const char rmin_doc[] = "moving_min(a, wlen, skip, trim, out=None)\n\n"
 "Compute the rolling minimum over windows of length `wlen` with `skip` samples "
 "between window starts.\n\n"
 "Parameters\n"
 "----------\n"
 "a : array-like\n"
-"    Array of data to compute rolling min on. Computation axis is the last axis.\n"
+"    Array of data to compute rolling min on. Computation axis is the last axis, which can have any strides.\n"
 "wlen : int\n"
 "    Window size in samples.\n"
 "skip : int\n"
 "    Samples between window starts. `skip=wlen` would result in non-overlapping sequential windows.\n"
+"out : {None, numpy.ndarray}\n"
+"    Array with the shape of the result to write it into. Any strides are accepted.\n\n"
 "Returns\n"
 "-------\n"
 "rmin : numpy.ndarray\n"
 "    Rolling min.";
 
+static const char rstats_doc[] = "moving_stats(a, wlen, skip, trim, mean, sd, min, max, median, out=None)\n\n"
+"Compute several rolling statistics over windows of length `wlen` with `skip` samples "
+"between window starts, in one pass over the data.\n\n"
+"Parameters\n"
+"----------\n"
+"a : array-like\n"
+"    Array of data to compute the rolling statistics on. Computation axis is the last axis, which can have any strides.\n"
+"wlen : int\n"
+"    Window size in samples.\n"
+"skip : int\n"
+"    Samples between window starts. `skip=wlen` would result in non-overlapping sequential windows.\n"
+"trim : bool\n"
+"    Trim the ends of the result, where a value cannot be calculated. If False, these values will be set to NaN.\n"
+"mean, sd, min, max, median : bool\n"
+"    Statistics to compute.\n\n"
+"out : {None, tuple}\n"
+"    Arrays with the shape of the result to write each returned result into. Any strides are accepted.\n\n"
+"Returns\n"
+"-------\n"
+"res : tuple\n"
+"    Requested rolling statistics, in the order mean, sd, min, max, median.";
+
+static const char rstream_new_doc[] = "moving_stream_new(kind, n_lanes, wlen, skip)\n\n"
+"Create the state of a streaming moving statistic, for `n_lanes` independent signals.\n\n"
+"Parameters\n"
+"----------\n"
+"kind : {'median', 'max', 'min'}\n"
+"    Moving statistic to compute.\n"
+"n_lanes : int\n"
+"    Number of signals, ie the size of all but the last axis of the chunks.\n"
+"wlen : int\n"
+"    Window size in samples.\n"
+"skip : int\n"
+"    Samples between window starts.\n\n"
+"Returns\n"
+"-------\n"
+"state : capsule\n"
+"    State to pass to `moving_stream_update`.";
+
+static const char rstream_update_doc[] = "moving_stream_update(state, x)\n\n"
+"Add the next samples to a streaming moving statistic. Each sample is only inserted "
+"into the window once, and the windows are kept between calls.\n\n"
+"Parameters\n"
+"----------\n"
+"state : capsule\n"
+"    State from `moving_stream_new`.\n"
+"x : array-like\n"
+"    Next samples, along the last axis.\n\n"
+"Returns\n"
+"-------\n"
+"res : numpy.ndarray\n"
+"    Statistic of the windows completed by `x`, along the last axis.";
+
 static struct PyMethodDef methods[] = {
     {"moving_mean",   moving_mean,   1, rmean_doc},  // last is the docstring
     {"moving_sd",   moving_sd,   1, rsd_doc},  // last is the docstring
     {"moving_skewness",   moving_skewness,   1, rskew_doc},  // last is the docstring
     {"moving_kurtosis",   moving_kurtosis,   1, rkurt_doc},  // last is the docstring
     {"moving_median", moving_median, 1, rmed_doc},
+    {"moving_quantile", moving_quantile, 1, rquant_doc},
     {"moving_max", moving_max, 1, rmax_doc},
     {"moving_min", moving_min, 1, rmin_doc},
+    {"moving_stats", moving_stats, 1, rstats_doc},
+    {"moving_stream_new", moving_stream_new, 1, rstream_new_doc},
+    {"moving_stream_update", moving_stream_update, 1, rstream_update_doc},
     {NULL, NULL, 0, NULL}          /* sentinel */
 };
 
@@ -0,0 +1,301 @@
+// Copyright (c) 2024. Pfizer Inc. All rights reserved.
+#define PY_SSIZE_T_CLEAN
+#include "Python.h"
+#include "numpy/arrayobject.h"
+
+#include <string.h>
+
+
+/* index of the end (exclusive) of the run starting at `start`. Elements are compared bytewise */
+static npy_intp run_end(const char *x, npy_intp n, npy_intp k, npy_intp start)
+{
+    npy_intp i = start + 1;
+    const char *v = x + start * k;
+
+    if (k == 1)
+    {
+        while ((i < n) && (x[i] == *v))
+            ++i;
+    } else {
+        while ((i < n) && (memcmp(x + i * k, v, k) == 0))
+            ++i;
+    }
+    return i;
+}
+
+
+/* elements checked at once for changes, which skips quickly over long runs */
+#define RUN_BLOCK 16
+
+/* number of runs, comparing adjacent elements as unsigned integers of the element size */
+#define COUNT_RUNS(T)                                                               \
+    {                                                                               \
+        const T *xt = (const T *)dptr;                                              \
+        n_runs = (n > 0);                                                           \
+        for (npy_intp b = 1; b < n; b += RUN_BLOCK)                                 \
+        {                                                                           \
+            npy_intp be = (b + RUN_BLOCK < n) ? b + RUN_BLOCK : n;                  \
+            if ((be - b == RUN_BLOCK) && !memcmp(xt + b - 1, xt + b, RUN_BLOCK * sizeof(T))) \
+                continue;                                                           \
+            for (npy_intp i = b; i < be; ++i)                                       \
+                n_runs += (xt[i] != xt[i - 1]);                                     \
+        }                                                                           \
+    }
+
+/* start index of each run */
+#define FILL_STARTS(T)                                                              \
+    {                                                                               \
+        const T *xt = (const T *)dptr;                                              \
+        npy_intp j = 1;                                                             \
+        sptr[0] = 0;                                                                \
+        /* stop once all runs are found, so the writes stay in bounds */           \
+        for (npy_intp b = 1; (b < n) && (j < n_runs); b += RUN_BLOCK)              \
+        {                                                                           \
+            npy_intp be = (b + RUN_BLOCK < n) ? b + RUN_BLOCK : n;                  \
+            if ((be - b == RUN_BLOCK) && !memcmp(xt + b - 1, xt + b, RUN_BLOCK * sizeof(T))) \
+                continue;                                                           \
+            for (npy_intp i = b; (i < be) && (j < n_runs); ++i)                     \
+            {                                                                       \
+                /* branchless, overwritten unless there is a change */              \
+                sptr[j] = i;                                                        \
+                j += (xt[i] != xt[i - 1]);                                          \
+            }                                                                       \
+        }                                                                           \
+    }
+
+
+PyObject * rle(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *x_;
+
+    if (!PyArg_ParseTuple(args, "O:rle", &x_))
+        return NULL;
+
+    PyArrayObject *data = (PyArrayObject *)PyArray_FromAny(
+        x_,
+        NULL,
+        1,
+        1,
+        NPY_ARRAY_ENSUREARRAY | NPY_ARRAY_CARRAY_RO,
+        NULL
+    );
+    if (!data)
+        return NULL;
+
+    npy_intp n = PyArray_SIZE(data);
+    npy_intp k = PyArray_ITEMSIZE(data);
+    const char *dptr = (const char *)PyArray_DATA(data);
+
+    // first pass to count the runs
+    npy_intp n_runs = 0;
+
+    Py_BEGIN_ALLOW_THREADS
+    switch (k)
+    {
+        case 1: COUNT_RUNS(npy_uint8); break;
+        case 2: COUNT_RUNS(npy_uint16); break;
+        case 4: COUNT_RUNS(npy_uint32); break;
+        case 8: COUNT_RUNS(npy_uint64); break;
+        default:
+            for (npy_intp i = 0; i < n; i = run_end(dptr, n, k, i))
+                ++n_runs;
+    }
+    Py_END_ALLOW_THREADS
+
+    PyArrayObject *lengths = (PyArrayObject *)PyArray_EMPTY(1, &n_runs, NPY_INT64, 0);
+    PyArrayObject *starts = (PyArrayObject *)PyArray_EMPTY(1, &n_runs, NPY_INT64, 0);
+
+    if (!lengths || !starts)
+    {
+        Py_XDECREF(data);
+        Py_XDECREF(lengths);
+        Py_XDECREF(starts);
+        return NULL;
+    }
+
+    npy_int64 *lptr = (npy_int64 *)PyArray_DATA(lengths);
+    npy_int64 *sptr = (npy_int64 *)PyArray_DATA(starts);
+
+    Py_BEGIN_ALLOW_THREADS
+    if (n_runs > 0)
+    {
+        switch (k)
+        {
+            case 1: FILL_STARTS(npy_uint8); break;
+            case 2: FILL_STARTS(npy_uint16); break;
+            case 4: FILL_STARTS(npy_uint32); break;
+            case 8: FILL_STARTS(npy_uint64); break;
+            default:
+            {
+                npy_intp j = 0;
+                for (npy_intp i = 0; i < n; i = run_end(dptr, n, k, i))
+                    sptr[j++] = i;
+            }
+        }
+        for (npy_intp j = 0; j < (n_runs - 1); ++j)
+            lptr[j] = sptr[j + 1] - sptr[j];
+        lptr[n_runs - 1] = n - sptr[n_runs - 1];
+    }
+    Py_END_ALLOW_THREADS
+
+    Py_XDECREF(data);
+
+    return Py_BuildValue("NN", (PyObject *)lengths, (PyObject *)starts);
+}
+
+
+PyObject * replace_runs(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *x_;
+    const char *value, *replacement;
+    Py_ssize_t nvalue, nreplacement;
+    long min_len, max_len, nb_min_len;
+    int skip_bounds;
+
+    if (!PyArg_ParseTuple(
+        args,
+        "Oy#y#lllp:replace_runs",
+        &x_,
+        &value,
+        &nvalue,
+        &replacement,
+        &nreplacement,
+        &min_len,
+        &max_len,
+        &nb_min_len,
+        &skip_bounds
+    ))
+        return NULL;
+
+    if (!PyArray_Check(x_))
+    {
+        PyErr_SetString(PyExc_TypeError, "`x` must be a numpy array.");
+        return NULL;
+    }
+    PyArrayObject *data = (PyArrayObject *)x_;
+
+    if ((PyArray_NDIM(data) != 1) || !PyArray_ISCARRAY(data))
+    {
+        PyErr_SetString(PyExc_ValueError, "`x` must be a writeable, contiguous, 1D array.");
+        return NULL;
+    }
+
+    npy_intp n = PyArray_SIZE(data);
+    npy_intp k = PyArray_ITEMSIZE(data);
+
+    if ((nvalue != k) || (nreplacement != k))
+    {
+        PyErr_SetString(PyExc_ValueError, "`value` and `replacement` must be the size of an element of `x`.");
+        return NULL;
+    }
+
+    char *dptr = (char *)PyArray_DATA(data);
+    long n_replaced = 0;
+
+    Py_BEGIN_ALLOW_THREADS
+    if (n > 0)
+    {
+        // current run [cs, ce), and the original length of the previous run
+        npy_intp cs = 0, ce = run_end(dptr, n, k, 0);
+        npy_intp prev_len = 0;
+
+        while (cs < n)
+        {
+            // find the next run before (possibly) overwriting the current one
+            npy_intp ne = (ce < n) ? run_end(dptr, n, k, ce) : n;
+            npy_intp len = ce - cs;
+            int bound = (cs == 0) || (ce == n);
+
+            int match = (memcmp(dptr + cs * k, value, k) == 0);
+            match &= (len >= min_len) && ((max_len < 0) || (len <= max_len));
+            match &= !(skip_bounds && bound);
+            if (nb_min_len > 0)
+                match &= !bound && (prev_len >= nb_min_len) && ((ne - ce) >= nb_min_len);
+
+            if (match)
+            {
+                for (npy_intp i = cs; i < ce; ++i)
+                    memcpy(dptr + i * k, replacement, k);
+                ++n_replaced;
+            }
+
+            prev_len = len;
+            cs = ce;
+            ce = ne;
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    return PyLong_FromLong(n_replaced);
+}
+
+
+static const char rle_doc[] = "rle(x)\n\n"
+"Run length encoding of a 1D array. Elements are compared bytewise.\n\n"
+"Parameters\n"
+"----------\n"
+"x : numpy.ndarray\n"
+"    1D array to encode.\n\n"
+"Returns\n"
+"-------\n"
+"lengths : numpy.ndarray\n"
+"    Length of each run.\n"
+"starts : numpy.ndarray\n"
+"    Start index of each run.\n";
+
+static const char replace_runs_doc[] = "replace_runs(x, value, replacement, min_len, max_len, nb_min_len, skip_bounds)\n\n"
+"Replace runs of `value` matching the length conditions in place, in a single pass. "
+"Conditions use the lengths of the runs before any replacement.\n\n"
+"Parameters\n"
+"----------\n"
+"x : numpy.ndarray\n"
+"    Writeable, contiguous, 1D array.\n"
+"value : bytes\n"
+"    Bytes of the value of runs to replace.\n"
+"replacement : bytes\n"
+"    Bytes of the value to replace matching runs with.\n"
+"min_len : int\n"
+"    Minimum length of runs to replace.\n"
+"max_len : int\n"
+"    Maximum length of runs to replace. Negative for no limit.\n"
+"nb_min_len : int\n"
+"    Minimum length of both neighboring runs. Ignored if less than 1.\n"
+"skip_bounds : bool\n"
+"    Never replace the first and last runs.\n\n"
+"Returns\n"
+"-------\n"
+"n_replaced : int\n"
+"    Number of runs replaced.\n";
+
+static struct PyMethodDef methods[] = {
+    {"rle", rle, 1, rle_doc},
+    {"replace_runs", replace_runs, 1, replace_runs_doc},
+    {NULL, NULL, 0, NULL}          /* sentinel */
+};
+
+static struct PyModuleDef moduledef = {
+        PyModuleDef_HEAD_INIT,
+        "run_length",
+        NULL,
+        -1,
+        methods,
+        NULL,
+        NULL,
+        NULL,
+        NULL
+};
+
+/* Initialization function for the module */
+PyMODINIT_FUNC PyInit_run_length(void)
+{
+    PyObject *m;
+    m = PyModule_Create(&moduledef);
+    if (m == NULL) {
+        return NULL;
+    }
+
+    /* Import the array object */
+    import_array();
+
+    return m;
+}
@@ -45,7 +45,7 @@ output_coef = array(
 )
 
 
-def get_activity_counts(fs, time, accel, epoch_seconds=60):
+def get_activity_counts(fs, time, accel, epoch_seconds=60, polyphase=False):
     """
     Compute the activity counts from acceleration.
 
@@ -59,6 +59,11 @@ def get_activity_counts(fs, time, accel, epoch_seconds=60):
         Nx3 array of measured acceleration values, in units of g.
     epoch_seconds : int, optional
         Number of seconds in an epoch (time unit for counts). Default is 60 seconds.
+    polyphase : bool, optional
+        Downsample to 30Hz with a polyphase filter, which is faster for rational,
+        non-integer downsampling factors (eg 100 -> 30Hz), but gives slightly
+        different results. See :func:`skdh.utility.internal.apply_resample`.
+        Default is False.
 
     Returns
     -------
@@ -84,6 +89,7 @@ def get_activity_counts(fs, time, accel, epoch_seconds=60):
         data=(accel,),
         aa_filter=True,
         fs=fs,
+        polyphase=polyphase,
     )
 
     # 4. filter the data
@@ -5,12 +5,16 @@ Lukas Adamowicz
 Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
+from collections import OrderedDict
+from contextvars import ContextVar
+from fractions import Fraction
+from inspect import signature
+
 from numpy import (
     all,
     asarray,
     argsort,
     array,
-    clip,
     nonzero,
     insert,
     append,
@@ -25,8 +29,285 @@ from numpy import (
     ndarray,
     concatenate,
     roll,
+    int64,
+    lexsort,
+    cumsum,
+    maximum,
+    searchsorted,
+    ones,
+    full,
+    flatnonzero,
+    empty,
+    repeat,
+    where,
 )
-from scipy.signal import cheby1, sosfiltfilt
+from numpy.linalg import norm
+from scipy.signal import cheby1, sosfiltfilt, firwin, upfirdn
+
+from skdh.utility import _extensions
+
+
+class IntervalSet:
+    """
+    Set of half-open integer index intervals `[start, stop)`, stored as sorted
+    arrays of starts and stops with no overlapping, touching, or empty intervals.
+    This is the canonical form of the start/stop index pairs used for wear, days,
+    sleep, and bouts, and supports vectorized set operations on them.
+
+    Parameters
+    ----------
+    starts : array-like, optional
+        Interval start indices.
+    stops : array-like, optional
+        Interval stop indices (exclusive). Must be the same size as `starts`.
+
+    Examples
+    --------
+    >>> wear = IntervalSet([0, 500], [300, 900])
+    >>> sleep = IntervalSet([250], [600])
+    >>> wear - sleep
+    IntervalSet(starts=[0 600], stops=[250 900])
+    >>> (wear & IntervalSet([0], [700])).clip_many([0, 400], [400, 800])
+    [IntervalSet(starts=[0], stops=[300]), IntervalSet(starts=[500], stops=[700])]
+    """
+
+    __slots__ = ("starts", "stops")
+
+    def __init__(self, starts=(), stops=()):
+        starts = asarray(starts, dtype=int64).ravel()
+        stops = asarray(stops, dtype=int64).ravel()
+
+        if starts.size != stops.size:
+            raise ValueError("starts and stops indices arrays must be the same size")
+
+        self.starts, self.stops = self._normalize(starts, stops)
+
+    @classmethod
+    def _from_canonical(cls, starts, stops):
+        # skip normalization for results already in canonical form
+        res = cls.__new__(cls)
+        res.starts, res.stops = starts, stops
+        return res
+
+    @staticmethod
+    def _normalize(starts, stops):
+        mask = stops > starts
+        starts, stops = starts[mask], stops[mask]
+        if starts.size < 2:
+            return starts, stops
+
+        i_sort = argsort(starts, kind="stable")
+        starts, stops = starts[i_sort], stops[i_sort]
+
+        # an interval starts a new group if it starts after all previous intervals end
+        run_stop = maximum.accumulate(stops)
+        new = ones(starts.size, dtype=bool)
+        new[1:] = starts[1:] > run_stop[:-1]
+
+        i_new = flatnonzero(new)
+        i_end = append(i_new[1:] - 1, starts.size - 1)
+
+        return starts[i_new], run_stop[i_end]
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Create an interval set from the `True` runs of a boolean array.
+
+        Parameters
+        ----------
+        mask : array-like
+            Boolean array.
+
+        Returns
+        -------
+        intervals : IntervalSet
+        """
+        m = zeros(len(mask) + 2, dtype="int8")
+        m[1:-1] = asarray(mask, dtype=bool)
+        changes = flatnonzero(diff(m))
+
+        return cls._from_canonical(
+            changes[::2].astype(int64), changes[1::2].astype(int64)
+        )
+
+    def __repr__(self):
+        return f"IntervalSet(starts={self.starts}, stops={self.stops})"
+
+    def __len__(self):
+        return self.starts.size
+
+    def __iter__(self):
+        return zip(self.starts, self.stops)
+
+    def __eq__(self, other):
+        if isinstance(other, IntervalSet):
+            return (self.starts.size == other.starts.size) and bool(
+                all(self.starts == other.starts) and all(self.stops == other.stops)
+            )
+        return NotImplemented
+
+    @property
+    def lengths(self):
+        """
+        Length of each interval.
+        """
+        return self.stops - self.starts
+
+    @property
+    def total(self):
+        """
+        Total length of all the intervals.
+        """
+        return int(self.lengths.sum())
+
+    @classmethod
+    def _coverage(cls, sets, n):
+        """
+        Intervals covered by at least `n` of `sets`, found by sweeping over all
+        the interval boundaries at once.
+        """
+        pos = concatenate([i.starts for i in sets] + [i.stops for i in sets])
+        delta = concatenate(
+            [ones(i.starts.size, dtype=int64) for i in sets]
+            + [full(i.stops.size, -1, dtype=int64) for i in sets]
+        )
+        # at the same position process stops before starts (half-open intervals)
+        order = lexsort((delta, pos))
+        pos, delta = pos[order], delta[order]
+        count = cumsum(delta)
+
+        starts = pos[(delta == 1) & (count == n)]
+        stops = pos[(delta == -1) & (count == n - 1)]
+
+        # touching intervals produce empty intervals here, remove them
+        return cls(starts, stops)
+
+    def union(self, *others):
+        """
+        Union with one or more other interval sets.
+        """
+        sets = (self,) + others
+        return IntervalSet(
+            concatenate([i.starts for i in sets]), concatenate([i.stops for i in sets])
+        )
+
+    def intersection(self, *others):
+        """
+        Intersection with one or more other interval sets.
+        """
+        return self._coverage((self,) + others, 1 + len(others))
+
+    def difference(self, *others):
+        """
+        Indices in this set that are not in any of the other interval sets.
+        """
+        if len(self) == 0:
+            return self
+        exclude = IntervalSet().union(*others)
+        return self.intersection(exclude.invert(self.starts[0], self.stops[-1]))
+
+    def invert(self, start, stop):
+        """
+        Gaps between the intervals, within `[start, stop)`.
+        """
+        c = self.clip(start, stop)
+
+        return IntervalSet(
+            insert(c.stops, 0, start).astype(int64),
+            append(c.starts, stop).astype(int64),
+        )
+
+    def clip(self, start, stop):
+        """
+        Restrict the intervals to `[start, stop)`.
+        """
+        i0 = searchsorted(self.stops, start, side="right")
+        i1 = searchsorted(self.starts, stop, side="left")
+
+        starts = self.starts[i0:i1].copy()
+        stops = self.stops[i0:i1].copy()
+        if starts.size > 0:
+            starts[0] = max(starts[0], start)
+            stops[-1] = min(stops[-1], stop)
+
+        return IntervalSet._from_canonical(starts, stops)
+
+    def clip_many(self, starts, stops):
+        """
+        Restrict the intervals to each of several windows, eg days.
+
+        Parameters
+        ----------
+        starts : array-like
+            Window start indices.
+        stops : array-like
+            Window stop indices.
+
+        Returns
+        -------
+        clipped : list of IntervalSet
+            Intervals within each window.
+        """
+        starts = asarray(starts, dtype=int64)
+        stops = asarray(stops, dtype=int64)
+
+        # find the range of intervals overlapping each window at once
+        i0 = searchsorted(self.stops, starts, side="right")
+        i1 = searchsorted(self.starts, stops, side="left")
+
+        res = []
+        for a, b, start, stop in zip(i0, i1, starts, stops):
+            w_starts = self.starts[a:b].copy()
+            w_stops = self.stops[a:b].copy()
+            if w_starts.size > 0:
+                w_starts[0] = max(w_starts[0], start)
+                w_stops[-1] = min(w_stops[-1], stop)
+                mask = w_stops > w_starts
+                w_starts, w_stops = w_starts[mask], w_stops[mask]
+            res.append(IntervalSet._from_canonical(w_starts, w_stops))
+
+        return res
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+def _combine_index_sets(starts, stops, for_inclusion, start, stop):
+    """
+    Combine sets of start and stop indices into one :class:`IntervalSet` within
+    `[start, stop)`, including or excluding each set.
+    """
+    # make a common format instead of having to deal with different formats later
+    if isinstance(starts, ndarray):
+        starts = (starts,)
+    if isinstance(stops, ndarray):
+        stops = (stops,)
+
+    if len(starts) != len(stops):
+        raise ValueError("Number of start arrays does not match number of stop arrays.")
+    if isinstance(for_inclusion, bool):
+        for_inclusion = (for_inclusion,) * len(starts)
+
+    # check if we should just return empty
+    if all(
+        [
+            i.size == 0 and j.size == 0 and k
+            for i, j, k in zip(starts, stops, for_inclusion)
+        ]
+    ):
+        return IntervalSet()
+
+    include = [IntervalSet([start], [stop])]
+    exclude = []
+    for s, e, fi in zip(starts, stops, for_inclusion):
+        # empty sets are ignored, whether or not they are for inclusion
+        if s.size == 0 or e.size == 0:
+            continue
+        (include if fi else exclude).append(IntervalSet(s, e))
+
+    return include[0].intersection(*include[1:]).difference(*exclude)
 
 
 def get_day_index_intersection(starts, stops, for_inclusion, day_start, day_stop):
@@ -59,112 +340,451 @@ def get_day_index_intersection(starts, stops, for_inclusion, day_start, day_stop
     """
     day_start, day_stop = int(day_start), int(day_stop)
 
-    # make a common format instead of having to deal with different formats later
-    if isinstance(starts, ndarray):
-        starts = (starts,)
-    if isinstance(stops, ndarray):
-        stops = (stops,)
+    res = _combine_index_sets(starts, stops, for_inclusion, day_start, day_stop)
 
-    if len(starts) != len(stops):
-        raise ValueError("Number of start arrays does not match number of stop arrays.")
-    if isinstance(for_inclusion, bool):
-        for_inclusion = (for_inclusion,) * len(starts)
+    return res.starts, res.stops
 
-    # check if we should just return empty
-    if all(
-        [
-            i.size == 0 and j.size == 0 and k
-            for i, j, k in zip(starts, stops, for_inclusion)
-        ]
-    ):
-        return asarray([], dtype=int), asarray([], dtype=int)
 
-    # get the subset that intersect the day in a roundabout way
-    starts_subset, stops_subset = [], []
-    for start, stop, fi in zip(starts, stops, for_inclusion):
-        if start.size == 0 or stop.size == 0:
-            continue
-        if fi:  # flip everything to being an "exclude" window
-            # # 1. sort based on the ends
-            # i_e = argsort(stop)
-            # start = start[i_e]
-            # stop = stop[i_e]
-            #
-            # # 2. create the temporary ends by appending day_stop to the starts
-            # tmp_stop = append(start, day_stop)
-            #
-            # # 3. sort based on the starts
-            # i_s = argsort(start)
-            # stop = stop[i_s]
-            #
-            # # 4. create the temp starts by inserting day_start to the stops
-            # tmp_start = insert(stop, 0, day_start)
-
-            # 1. sort based on starts
-            i_sort = argsort(start)
-            start = start[i_sort]
-            stop = stop[i_sort]
-
-            # clip to day starts and stops
-            start = clip(start, day_start, day_stop)
-            stop = clip(stop, day_start, day_stop)
-
-            # 2. check that stops are increasing (ie sorted as well)
-            if not all(stop[1:] >= stop[:-1]):
-                raise NotImplementedError(
-                    "Window ends are not monotonically increasing after sorting by window starts. "
-                    "This behavior is not currently supported."
-                )
-
-            tmp_stop = append(start, day_stop)
-            tmp_start = insert(stop, 0, day_start)
-
-            starts_subset.append(tmp_start[tmp_stop != tmp_start])
-            stops_subset.append(tmp_stop[tmp_stop != tmp_start])
-        else:
-            # clip to day starts and stops
-            start = clip(start, day_start, day_stop)
-            stop = clip(stop, day_start, day_stop)
+def get_days_index_intersection(starts, stops, for_inclusion, day_starts, day_stops):
+    """
+    Get the intersection between each of several days and various start and stop
+    indices, in one call. Equivalent to calling :func:`get_day_index_intersection`
+    for each day.
+
+    Parameters
+    ----------
+    starts : numpy.ndarray, tuple
+        Single ndarray or tuple of ndarrays indicating the starts of events to either include or
+        exclude from during the day.
+    stops : numpy.ndarray, tuple
+        Single ndarray or tuple of ndarrays indicating the stops of events to either include or
+        exclude from during the day.
+    for_inclusion : bool, tuple
+        Single or tuple of booleans indicating if the corresponding start & stop indices are
+        for inclusion or not.
+    day_starts : numpy.ndarray
+        Day start indices.
+    day_stops : numpy.ndarray
+        Day stop indices.
 
-            starts_subset.append(start[start != stop])
-            stops_subset.append(stop[start != stop])
+    Returns
+    -------
+    valid : list of tuple
+        For each day, the `(valid_starts, valid_stops)` index arrays.
+    """
+    day_starts = asarray(day_starts, dtype=int64)
+    day_stops = asarray(day_stops, dtype=int64)
+    if day_starts.size == 0:
+        return []
 
-    # get overlap
-    all_starts = (
-        concatenate(starts_subset) if len(starts_subset) > 0 else asarray(starts_subset)
+    # combine the sets once over the span of all days, then split into days
+    res = _combine_index_sets(
+        starts, stops, for_inclusion, day_starts.min(), day_stops.max()
     )
-    all_stops = (
-        concatenate(stops_subset) if len(starts_subset) > 0 else asarray(starts_subset)
+
+    return [(i.starts, i.stops) for i in res.clip_many(day_starts, day_stops)]
+
+
+# signal cache used by `apply_resample` and `get_derived_signal`, if any is active
+_active_signal_cache = ContextVar("skdh_signal_cache", default=None)
+
+
+def _array_key(x):
+    """
+    Key identifying the memory an array views. Equal for different views of the
+    same memory with the same layout, eg repeated slices `accel[start:stop]`.
+    """
+    if x is None:
+        return None
+    return (x.__array_interface__["data"][0], x.shape, x.strides, x.dtype.str)
+
+
+def _nbytes(value):
+    if isinstance(value, ndarray):
+        return value.nbytes
+    elif isinstance(value, (tuple, list)):
+        return sum(_nbytes(i) for i in value)
+    return 0
+
+
+class SignalCache:
+    """
+    Cache of signals derived from the same input data, shared between processing
+    steps. While the cache is active (used as a context manager),
+    :func:`apply_resample` and :func:`get_derived_signal` return previously
+    computed results for the same source data (by memory location) and settings
+    instead of re-computing them. :class:`skdh.Pipeline` activates a cache for
+    the duration of each run.
+
+    Parameters
+    ----------
+    max_bytes : {None, int}, optional
+        Maximum size of the cached values, in bytes. When adding a value would
+        exceed this, the least recently used values are evicted. Values larger
+        than `max_bytes` are not cached. Default is None (no limit).
+
+    Notes
+    -----
+    Cached arrays are shared between consumers, and must not be modified in place.
+    Source arrays are held by the cache while their derived values are cached, so
+    that their memory location remains a valid key.
+
+    Examples
+    --------
+    >>> with SignalCache(max_bytes=2**30) as cache:
+    >>>     t1, (acc1,) = apply_resample(time=time, goal_fs=20.0, data=(accel,), fs=50.0)
+    >>>     t2, (acc2,) = apply_resample(time=time, goal_fs=20.0, data=(accel,), fs=50.0)
+    >>> acc1 is acc2
+    True
+    >>> cache.hits
+    2
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+
+        self._store = OrderedDict()
+        self._nbytes = 0
+        self._token = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __enter__(self):
+        self._token = _active_signal_cache.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _active_signal_cache.reset(self._token)
+        self._token = None
+        self.clear()
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, key):
+        return key in self._store
+
+    @property
+    def nbytes(self):
+        """
+        Total size of the cached values, in bytes.
+        """
+        return self._nbytes
+
+    def get(self, key, sources, fn):
+        """
+        Get a cached value, computing and storing it if not present.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable key for the value.
+        sources : tuple
+            Objects the value is derived from. Kept alive with the value.
+        fn : callable
+            Function with no arguments that computes the value.
+
+        Returns
+        -------
+        value : object
+            Cached or computed value.
+        """
+        if key in self._store:
+            self._store.move_to_end(key)
+            self.hits += 1
+            return self._store[key][1]
+
+        value = fn()
+        self.misses += 1
+
+        size = _nbytes(value)
+        if self.max_bytes is not None:
+            if size > self.max_bytes:
+                return value
+            # evict least recently used values until the new value fits
+            while self._nbytes + size > self.max_bytes:
+                _, (_, old) = self._store.popitem(last=False)
+                self._nbytes -= _nbytes(old)
+                self.evictions += 1
+
+        self._store[key] = (sources, value)
+        self._nbytes += size
+
+        return value
+
+    def clear(self):
+        """
+        Clear all cached values.
+        """
+        self._store.clear()
+        self._nbytes = 0
+
+
+def _cached(key, sources, fn):
+    cache = _active_signal_cache.get()
+    if cache is None:
+        return fn()
+    return cache.get(key, sources, fn)
+
+
+def _in_cache(key):
+    cache = _active_signal_cache.get()
+    return cache is not None and key in cache
+
+
+def _magnitude(x):
+    return norm(x, axis=-1)
+
+
+def _moving_mean(x, w_len, skip, trim=True, axis=-1):
+    from skdh.utility.math import moving_mean
+
+    return moving_mean(x, w_len, skip, trim=trim, axis=axis)
+
+
+def _moving_sd(x, w_len, skip, trim=True, axis=-1):
+    from skdh.utility.math import moving_sd
+
+    # always compute the mean as well, it is free and lets all requests share
+    return moving_sd(x, w_len, skip, trim=trim, axis=axis, return_previous=True)
+
+
+def _moving_median(x, w_len, skip=1, trim=True, axis=-1):
+    from skdh.utility.math import moving_median
+
+    return moving_median(x, w_len, skip=skip, trim=trim, axis=axis)
+
+
+def _moving_stats(
+    x, w_len, skip, stats=("mean", "sd", "min", "max", "median"), trim=True, axis=-1
+):
+    from skdh.utility.math import moving_stats
+
+    stats = tuple(stats)
+    # share the SD (and mean) with "moving_sd" requests for the same windows
+    sd_key = _derived_key(
+        "moving_sd", x, dict(w_len=w_len, skip=skip, trim=trim, axis=axis)
     )
+    res = {}
+    if "sd" in stats and _in_cache(sd_key):
+        res["sd"], res["mean"] = _cached(sd_key, (x,), None)
+
+    compute = [i for i in stats if i not in res]
+    if "sd" in compute and "mean" not in compute:
+        compute.append("mean")  # free with the SD
+    if compute:
+        res.update(
+            zip(compute, moving_stats(x, w_len, skip, compute, trim=trim, axis=axis))
+        )
+        if "sd" in compute:
+            _cached(sd_key, (x,), lambda: (res["sd"], res["mean"]))
+
+    return tuple(res[i] for i in stats)
+
+
+_DERIVED_SIGNALS = {
+    "magnitude": _magnitude,
+    "moving_mean": _moving_mean,
+    "moving_sd": _moving_sd,
+    "moving_median": _moving_median,
+    "moving_stats": _moving_stats,
+}
 
-    valid_starts, valid_stops = [day_start], [day_stop]
-
-    for start, stop in zip(all_starts, all_stops):
-        cond1 = [i <= start <= j for i, j in zip(valid_starts, valid_stops)]
-        cond2 = [i <= stop <= j for i, j in zip(valid_starts, valid_stops)]
-
-        for i, (c1, c2) in enumerate(zip(cond1, cond2)):
-            if c1 and c2:
-                valid_starts.insert(
-                    i + 1, stop
-                )  # valid_starts[i] = [valid_starts[i], stop]
-                valid_stops.insert(i, start)  # valid_stops[i] = [start, valid_stops[i]]
-            elif c1:
-                valid_stops[i] = start
-            elif c2:
-                valid_starts[i] = stop
-
-    valid_starts = asarray(valid_starts)
-    valid_stops = asarray(valid_stops)
-
-    return (
-        valid_starts[valid_starts != valid_stops],
-        valid_stops[valid_starts != valid_stops],
+
+def _derived_key(name, x, kwargs):
+    """
+    Canonical cache key of a derived signal, with default parameters filled in.
+    """
+    params = signature(_DERIVED_SIGNALS[name]).bind(x, **kwargs)
+    params.apply_defaults()
+    if "stats" in params.arguments:
+        params.arguments["stats"] = tuple(params.arguments["stats"])
+    return (name, _array_key(x)) + tuple(
+        sorted((k, v) for k, v in params.arguments.items() if k != "x")
     )
 
 
+def get_derived_signal(name, x, **kwargs):
+    """
+    Get a signal derived from `x`. If a :class:`SignalCache` is active (eg while
+    running a :class:`skdh.Pipeline`), the result is shared with any other step
+    requesting the same derived signal from the same data.
+
+    Parameters
+    ----------
+    name : {"magnitude", "moving_mean", "moving_sd", "moving_median", "moving_stats"}
+        Derived signal to get. "magnitude" is the euclidean norm over the last
+        axis. The moving statistics are computed with the functions of the same
+        name in :mod:`skdh.utility.math`. "moving_stats" shares its SD and mean
+        with "moving_sd" requests for the same windows.
+    x : numpy.ndarray
+        Source data.
+    kwargs
+        Parameters for the derived signal, eg `w_len`, `skip`, `trim`, and `axis`
+        for the moving statistics, and `stats` for "moving_stats". For "moving_sd",
+        `return_previous` (default True) determines if the moving mean is also
+        returned.
+
+    Returns
+    -------
+    signal : numpy.ndarray, tuple
+        Derived signal.
+    """
+    if name not in _DERIVED_SIGNALS:
+        raise ValueError(f"Derived signal `{name}` not recognized.")
+
+    return_previous = kwargs.pop("return_previous", True)
+    fn = _DERIVED_SIGNALS[name]
+
+    key = _derived_key(name, x, kwargs)
+    res = _cached(key, (x,), lambda: fn(x, **kwargs))
+
+    if name == "moving_sd" and not return_previous:
+        return res[0]
+    return res
+
+
+# number of output samples computed at once by the polyphase resampler
+_POLYPHASE_CHUNK = 2**16
+
+
+def _rational_factor(fs, goal_fs, max_denominator=1000):
+    """
+    Get the `(up, down)` factors for resampling from `fs` to `goal_fs`, or None if
+    the ratio is not a (small) rational number.
+    """
+    ratio = Fraction(goal_fs / fs).limit_denominator(max_denominator)
+    if ratio.numerator == 0:
+        return None
+    if abs(float(ratio) - goal_fs / fs) > 1e-9 * goal_fs / fs:
+        return None
+    return ratio.numerator, ratio.denominator
+
+
+def _polyphase_resample(arrays, up, down, n_out):
+    """
+    Resample arrays by a rational factor `up / down` along the first axis with a
+    polyphase FIR filter, which only computes the filter at the output samples.
+    All the columns of all the arrays are resampled together, in chunks of the
+    output so that memory usage does not scale with the input size. The filter
+    and alignment match :func:`scipy.signal.resample_poly` (zero padding).
+
+    Parameters
+    ----------
+    arrays : list of numpy.ndarray
+        Arrays to resample, all with the same size along the first axis.
+    up : int
+        Upsampling factor.
+    down : int
+        Downsampling factor.
+    n_out : int
+        Number of output samples.
+
+    Returns
+    -------
+    arrays_rs : list of numpy.ndarray
+        Resampled arrays.
+    """
+    n = arrays[0].shape[0]
+    cols = [x.reshape((n, -1)) for x in arrays]
+    n_cols = [c.shape[1] for c in cols]
+
+    # same anti-aliasing filter design and alignment as scipy.signal.resample_poly
+    half_len = 10 * max(up, down)
+    h = firwin(2 * half_len + 1, 1.0 / max(up, down), window=("kaiser", 5.0)) * up
+    n_pre_pad = (down - half_len % down) % down
+    h = concatenate((zeros(n_pre_pad), h))
+    n_pre_remove = (half_len + n_pre_pad) // down
+
+    # input samples before a chunk that affect its outputs, a multiple of `down`
+    # so that chunk outputs line up with the outputs of the whole signal
+    n_overlap = -(-(-(-h.size // up)) // down) * down
+
+    res = empty((n_out, sum(n_cols)), dtype=float_)
+    chunk = max(_POLYPHASE_CHUNK // up, 1) * up
+    n_full = n_pre_remove + n_out
+
+    for m0 in range(0, n_full, chunk):
+        m1 = min(m0 + chunk, n_full)
+        i0 = max((m0 // up) * down - n_overlap, 0)
+        i1 = min(m1 * down // up + 1, n)
+
+        # filter the columns as contiguous rows
+        xc = empty((res.shape[1], i1 - i0), dtype=float_)
+        j = 0
+        for c, nc in zip(cols, n_cols):
+            xc[j : j + nc] = c[i0:i1].T
+            j += nc
+
+        y = upfirdn(h, xc, up, down, axis=-1)
+
+        # outputs of the whole signal in this chunk, without the filter delay
+        k0, k1 = max(m0, n_pre_remove), m1
+        off = i0 * up // down
+        res[k0 - n_pre_remove : k1 - n_pre_remove] = y[:, k0 - off : k1 - off].T
+
+    out, i = [], 0
+    for x, nc in zip(arrays, n_cols):
+        out.append(res[:, i : i + nc].reshape((n_out,) + x.shape[1:]))
+        i += nc
+    return out
+
+
+def remap_indices(t, time_rs, fs=None):
+    """
+    Map times to the nearest indices of a resampled time series. Equivalent to
+    `around(interp(t, time_rs, arange(time_rs.size)))`, without creating any
+    arrays the size of `time_rs`.
+
+    Parameters
+    ----------
+    t : numpy.ndarray
+        Times to map, eg `time[idx]` for an array of indices `idx` into the
+        original time series. Can have any shape.
+    time_rs : numpy.ndarray
+        Resampled, non-decreasing, time series.
+    fs : {None, float}, optional
+        Sampling frequency of `time_rs` if it is regularly sampled, in which case
+        the indices are computed directly. If None (default), `time_rs` may have
+        gaps and the indices are found with a binary search.
+
+    Returns
+    -------
+    idx_rs : numpy.ndarray
+        Indices into `time_rs`, with the same shape as `t`. Times outside of
+        `time_rs` are mapped to the first or last index.
+    """
+    t = asarray(t, dtype=float_)
+    n = time_rs.size
+
+    if n < 2:
+        return zeros(t.shape, dtype=int_)
+
+    if fs is not None:
+        pos = (t - time_rs[0]) * fs
+    else:
+        i = searchsorted(time_rs, t, side="right")
+        i = i.clip(1, n - 1)
+        lo, hi = time_rs[i - 1], time_rs[i]
+        dt = hi - lo
+        # repeated timestamps give an empty interval, take its lower or upper end
+        pos = (i - 1) + where(dt > 0, (t - lo) / where(dt > 0, dt, 1.0), t >= hi)
+
+    return around(pos.clip(0, n - 1)).astype(int_)
+
+
 def apply_resample(
-    *, time, goal_fs=None, time_rs=None, data=(), indices=(), aa_filter=True, fs=None
+    *,
+    time,
+    goal_fs=None,
+    time_rs=None,
+    data=(),
+    indices=(),
+    aa_filter=True,
+    fs=None,
+    polyphase=False,
 ):
     """
     Apply a re-sample to a set of data.
@@ -193,6 +813,11 @@ def apply_resample(
         Original sampling frequency in Hz. If `goal_fs` is an integer factor
         of `fs`, every nth sample will be taken, otherwise `np.interp` will be
         used. Leave blank to always use `np.interp`.
+    polyphase : bool, optional
+        Use a polyphase filter when downsampling with `goal_fs` by a rational,
+        non-integer factor (eg 100 -> 30 Hz) with `aa_filter`, see Notes. If False,
+        the data is filtered at the original rate and interpolated. Default is
+        False, as the two methods give slightly different results.
 
     Returns
     -------
@@ -206,6 +831,19 @@ def apply_resample(
     References
     ----------
     .. [1] https://en.wikipedia.org/wiki/Downsampling_(signal_processing)
+
+    Notes
+    -----
+    If a :class:`SignalCache` is active (eg while running a :class:`skdh.Pipeline`),
+    re-sampled time, data, and indices are looked up in and stored in the cache.
+
+    With `polyphase`, downsampling by a rational, non-integer factor `up / down` to
+    `goal_fs` with the anti-aliasing filter uses a polyphase FIR filter (as in
+    :func:`scipy.signal.resample_poly`) instead of filtering at the full rate and
+    interpolating. The filter is only computed at the output samples, all columns
+    of all `data` arrays are resampled together, and the output is computed in
+    chunks to limit memory usage. This assumes that `time` is uniformly sampled
+    at `fs`.
     """
 
     def resample(x, factor, t, t_rs):
@@ -229,16 +867,30 @@ def apply_resample(
     if time_rs is None and goal_fs is None:
         raise ValueError("One of `time_rs` or `goal_fs` is required.")
 
-    # get resampled time if necessary
-    if time_rs is None:
-        if int(fs / goal_fs) == fs / goal_fs and goal_fs < fs:
-            time_rs = time[:: int(fs / goal_fs)]
+    # rational (non-integer) downsampling to a regular grid uses a polyphase filter
+    poly = None
+    if polyphase and aa_filter and time_rs is None and fs / goal_fs > 1.0:
+        if int(fs / goal_fs) != fs / goal_fs:
+            poly = _rational_factor(fs, goal_fs)
+
+    # cache key for the resampled time. Other arrays build off of this key, and
+    # the resampling method changes the result
+    base_key = (_array_key(time), _array_key(time_rs), goal_fs, fs, poly)
+    base_src = (time, time_rs)
+
+    def get_time_rs():
+        # get resampled time if necessary, and its sampling frequency if regular
+        if time_rs is None:
+            if int(fs / goal_fs) == fs / goal_fs and goal_fs < fs:
+                return time[:: int(fs / goal_fs)], goal_fs, None
+            else:
+                return arange(time[0], time[-1], 1 / goal_fs), goal_fs, goal_fs
         else:
-            time_rs = arange(time[0], time[-1], 1 / goal_fs)
-    else:
-        goal_fs = 1 / mean(diff(time_rs[:5000]))
-        # prevent t_rs from extrapolating
-        time_rs = time_rs[time_rs <= time[-1]]
+            # prevent t_rs from extrapolating
+            t_rs = time_rs[time_rs <= time[-1]]
+            return t_rs, 1 / mean(diff(time_rs[:5000])), None
+
+    time_rs, goal_fs, regular_fs = _cached(("time",) + base_key, base_src, get_time_rs)
 
     # AA filter, if necessary
     if (fs / goal_fs) >= 1.0:
@@ -249,32 +901,59 @@ def apply_resample(
     # resample data
     data_rs = ()
 
+    def data_key(x):
+        return ("data", _array_key(x), aa_filter) + base_key
+
+    # resample all the data not already cached in one call
+    poly_rs = {}
+    if poly is not None:
+        pending = {
+            id(dat): dat
+            for dat in data
+            if dat is not None and dat.ndim in [1, 2] and not _in_cache(data_key(dat))
+        }
+        if pending:
+            res = _polyphase_resample(list(pending.values()), *poly, time_rs.size)
+            poly_rs = dict(zip(pending, res))
+
+    def resample_data(x):
+        if poly is not None:
+            if id(x) not in poly_rs:
+                return (_polyphase_resample([x], *poly, time_rs.size)[0],)
+            return (poly_rs[id(x)],)
+        x_to_rs = sosfiltfilt(sos, x, axis=0) if aa_filter else x
+        return resample(x_to_rs, fs / goal_fs, time, time_rs)
+
     for dat in data:
         if dat is None:
             data_rs += (None,)
         elif dat.ndim in [1, 2]:
-            data_to_rs = sosfiltfilt(sos, dat, axis=0) if aa_filter else dat
-            data_rs += resample(data_to_rs, fs / goal_fs, time, time_rs)
+            data_rs += _cached(
+                data_key(dat),
+                (dat,) + base_src,
+                lambda: resample_data(dat),
+            )
         else:
             raise ValueError("Data dimension exceeds 2, or data not understood.")
 
     # resampling indices
+    def resample_indices(idx):
+        return remap_indices(time[idx], time_rs, fs=regular_fs)
+
     indices_rs = ()
     for idx in indices:
         if idx is None:
             indices_rs += (None,)
-        elif idx.ndim == 1:
+        elif idx.ndim in [1, 2]:
+            # index arrays are small and often re-created (eg day index views),
+            # so key them on their contents instead of their identity
             indices_rs += (
-                around(interp(time[idx], time_rs, arange(time_rs.size))).astype(int_),
+                _cached(
+                    ("indices", idx.dtype.str, idx.shape, idx.tobytes()) + base_key,
+                    base_src,
+                    lambda: resample_indices(idx),
+                ),
             )
-        elif idx.ndim == 2:
-            indices_rs += (zeros(idx.shape, dtype=int_),)
-            for i in range(idx.shape[1]):
-                indices_rs[-1][:, i] = around(
-                    interp(
-                        time[idx[:, i]], time_rs, arange(time_rs.size)
-                    )  # cast to in on insert
-                )
 
     ret = (time_rs,)
     if data_rs != ():
@@ -302,17 +981,113 @@ def rle(to_encode):
     block_values : array
         The value repeated for the duration of each block.
     """
+    x = asarray(to_encode)
+
+    # bool/integer 1D arrays are encoded in a single compiled pass. Other arrays
+    # (eg floats, where values are not equal bytewise) use numpy
+    if x.ndim == 1 and x.dtype.kind in "biu":
+        lengths, starts = _extensions.rle(x)
+        return lengths, starts, x[starts]
+
     starts = nonzero(diff(to_encode))[0] + 1
     # add the end too for length computation
     starts = insert(starts, (0, starts.size), (0, len(to_encode)))
 
     lengths = diff(starts)
     starts = starts[:-1]  # remove that last index which isn't actually a start
-    values = asarray(to_encode)[starts]
+    values = x[starts]
 
     return lengths, starts, values
 
 
+def irle(lengths, values):
+    """
+    Inverse of run length encoding.
+
+    Parameters
+    ----------
+    lengths : array-like
+        Lengths of each block.
+    values : array-like
+        The value of each block.
+
+    Returns
+    -------
+    decoded : numpy.ndarray
+        Array with each value repeated for the length of its block.
+
+    Examples
+    --------
+    Use with a mask of blocks to get the mask for the encoded array:
+
+    >>> lengths, starts, values = rle(x)
+    >>> x[irle(lengths, (lengths < 5) & (values == 1))] = 0
+    """
+    return repeat(values, lengths)
+
+
+def replace_runs(
+    x,
+    value,
+    replacement,
+    min_length=0,
+    max_length=None,
+    skip_bounds=False,
+    neighbor_min_length=0,
+):
+    """
+    Replace runs (blocks) of a value in place, in a single compiled pass over the
+    array. All conditions are evaluated on the runs of the original array, before
+    any replacement.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Writeable, contiguous, 1D boolean or integer array. Modified in place.
+    value : int, bool
+        Value of the runs to replace.
+    replacement : int, bool
+        Value to replace matching runs with.
+    min_length : int, optional
+        Minimum length of runs to replace. Default is 0.
+    max_length : {None, int}, optional
+        Maximum length of runs to replace. Default is None (no limit).
+    skip_bounds : bool, optional
+        Never replace the first and last runs. Default is False.
+    neighbor_min_length : int, optional
+        Minimum length of both neighboring runs for a run to be replaced. If
+        greater than 0, the first and last runs are never replaced. Default is 0.
+
+    Returns
+    -------
+    x : numpy.ndarray
+        Input array, with the runs replaced.
+    n_replaced : int
+        Number of runs replaced.
+
+    Examples
+    --------
+    Remove wear interruptions of 2 samples or less, surrounded by 30 samples or
+    more of non-wear on both sides:
+
+    >>> replace_runs(wear, 1, 0, max_length=2, neighbor_min_length=30)
+    """
+    if x.dtype.kind not in "biu":
+        raise ValueError("`x` must be a boolean or integer array.")
+
+    n = _extensions.replace_runs(
+        x,
+        array(value, dtype=x.dtype).tobytes(),
+        array(replacement, dtype=x.dtype).tobytes(),
+        int(min_length),
+        -1 if max_length is None else int(max_length),
+        int(neighbor_min_length),
+        skip_bounds,
+    )
+
+    return x, n
+
+
 def invert_indices(starts, stops, zero_index, end_index):
     """
     Invert indices from one set of starts and stops, to the opposite
@@ -6,6 +6,8 @@ Copyright (c) 2021. Pfizer Inc. All rights reserved.
 """
 
 from warnings import warn
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
 
 from numpy import (
     moveaxis,
@@ -23,8 +25,8 @@ from numpy import (
     log,
     exp,
     float_,
+    concatenate,
 )
-from scipy.stats import linregress
 
 from skdh.utility import _extensions
 from skdh.utility.windowing import get_windowed_view
@@ -36,13 +38,83 @@ __all__ = [
     "moving_skewness",
     "moving_kurtosis",
     "moving_median",
+    "moving_quantile",
     "moving_max",
     "moving_min",
+    "moving_stats",
     "DFA",
 ]
 
 
-def moving_mean(a, w_len, skip, trim=True, axis=-1):
+def _call_threaded(fn, x, n_threads, *args, n_lead=0, out=None):
+    """
+    Call a moving statistic extension function on `x` (computation axis last),
+    splitting the rows of the leading dimensions across `n_threads` threads. The
+    extension functions release the GIL, so the rows are computed in parallel.
+    `n_lead` is the number of extra leading axes the function adds to its results.
+    `out` (computation axis last) is passed through to the extension function.
+    """
+    if n_threads is None or n_threads == -1:
+        n_threads = cpu_count() or 1
+
+    n_rows = x.size // x.shape[-1]
+    n_threads = min(n_threads, n_rows)
+    if n_threads <= 1:
+        return fn(x, *args, out)
+
+    if out is None and x.flags["C_CONTIGUOUS"]:
+        # rows of all the leading dimensions
+        x2 = x.reshape((n_rows, x.shape[-1]))
+    else:
+        # split the first axis instead, so that strided inputs (and outputs) are
+        # not copied to flatten the leading dimensions
+        x2 = x
+        n_rows = x.shape[0]
+        n_threads = min(n_threads, n_rows)
+        if n_threads <= 1:
+            return fn(x, *args, out)
+
+    bounds = [n_rows * i // n_threads for i in range(n_threads + 1)]
+
+    def call(i):
+        rows = (slice(None),) * n_lead + (slice(bounds[i], bounds[i + 1]),)
+        if out is None:
+            out_i = None
+        elif isinstance(out, tuple):
+            out_i = tuple(o[rows] for o in out)
+        else:
+            out_i = out[rows]
+        return fn(x2[bounds[i] : bounds[i + 1]], *args, out_i)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        parts = list(pool.map(call, range(n_threads)))
+
+    if out is not None:
+        return out
+
+    def join(res):
+        return concatenate(res, axis=n_lead).reshape(
+            res[0].shape[:n_lead] + x.shape[:-1] + (-1,)
+        )
+
+    if isinstance(parts[0], tuple):
+        return tuple(join(res) for res in zip(*parts))
+    return join(parts)
+
+
+def _move_out(out, axis):
+    """
+    View of `out` (None, an array, or a tuple of arrays) with `axis` moved last,
+    to match the input passed to the extension functions.
+    """
+    if out is None:
+        return None
+    if isinstance(out, tuple):
+        return tuple(moveaxis(o, axis, -1) for o in out)
+    return moveaxis(out, axis, -1)
+
+
+def moving_mean(a, w_len, skip, trim=True, axis=-1, n_threads=1, out=None):
     r"""
     Compute the moving mean.
 
@@ -59,6 +131,12 @@ def moving_mean(a, w_len, skip, trim=True, axis=-1):
         these values will be set to NaN. Default is True.
     axis : int, optional
         Axis to compute the moving mean along. Default is -1.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : numpy.ndarray, optional
+        Array with the shape of the result to write the result into, instead of
+        allocating a new array. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -140,13 +218,25 @@ def moving_mean(a, w_len, skip, trim=True, axis=-1):
     if w_len > x.shape[-1]:
         raise ValueError("Window length is larger than the computation axis.")
 
-    rmean = _extensions.moving_mean(x, w_len, skip, trim)
+    rmean = _call_threaded(
+        _extensions.moving_mean,
+        x,
+        n_threads,
+        w_len,
+        skip,
+        trim,
+        out=_move_out(out, axis),
+    )
+    if out is not None:
+        return out
 
     # move computation axis back to original place and return
     return moveaxis(rmean, -1, axis)
 
 
-def moving_sd(a, w_len, skip, trim=True, axis=-1, return_previous=True):
+def moving_sd(
+    a, w_len, skip, trim=True, axis=-1, return_previous=True, n_threads=1, out=None
+):
     r"""
     Compute the moving sample standard deviation.
 
@@ -166,6 +256,13 @@ def moving_sd(a, w_len, skip, trim=True, axis=-1, return_previous=True):
     return_previous : bool, optional
         Return previous moments. These are computed either way, and are therefore optional returns.
         Default is True.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : tuple, numpy.ndarray, optional
+        Arrays with the shape of the results to write each returned result into,
+        instead of allocating new arrays. A single array if
+        `return_previous=False`. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -255,7 +352,18 @@ def moving_sd(a, w_len, skip, trim=True, axis=-1, return_previous=True):
             "Cannot have a window length larger than the computation axis."
         )
 
-    res = _extensions.moving_sd(x, w_len, skip, trim, return_previous)
+    res = _call_threaded(
+        _extensions.moving_sd,
+        x,
+        n_threads,
+        w_len,
+        skip,
+        trim,
+        return_previous,
+        out=_move_out(out, axis),
+    )
+    if out is not None:
+        return out
 
     # move computation axis back to original place and return
     if return_previous:
@@ -264,7 +372,9 @@ def moving_sd(a, w_len, skip, trim=True, axis=-1, return_previous=True):
         return moveaxis(res, -1, axis)
 
 
-def moving_skewness(a, w_len, skip, trim=True, axis=-1, return_previous=True):
+def moving_skewness(
+    a, w_len, skip, trim=True, axis=-1, return_previous=True, n_threads=1, out=None
+):
     r"""
     Compute the moving sample skewness.
 
@@ -284,6 +394,13 @@ def moving_skewness(a, w_len, skip, trim=True, axis=-1, return_previous=True):
     return_previous : bool, optional
         Return previous moments. These are computed either way, and are therefore optional returns.
         Default is True.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : tuple, numpy.ndarray, optional
+        Arrays with the shape of the results to write each returned result into,
+        instead of allocating new arrays. A single array if
+        `return_previous=False`. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -373,11 +490,23 @@ def moving_skewness(a, w_len, skip, trim=True, axis=-1, return_previous=True):
             "Cannot have a window length larger than the computation axis."
         )
 
-    res = _extensions.moving_skewness(x, w_len, skip, trim, return_previous)
+    res = _call_threaded(
+        _extensions.moving_skewness,
+        x,
+        n_threads,
+        w_len,
+        skip,
+        trim,
+        return_previous,
+        out=_move_out(out, axis),
+    )
 
     if isnan(res).any():
         warn("NaN values present in output, possibly due to catastrophic cancellation.")
 
+    if out is not None:
+        return out
+
     # move computation axis back to original place and return
     if return_previous:
         return tuple(moveaxis(i, -1, axis) for i in res)
@@ -385,7 +514,9 @@ def moving_skewness(a, w_len, skip, trim=True, axis=-1, return_previous=True):
         return moveaxis(res, -1, axis)
 
 
-def moving_kurtosis(a, w_len, skip, trim=True, axis=-1, return_previous=True):
+def moving_kurtosis(
+    a, w_len, skip, trim=True, axis=-1, return_previous=True, n_threads=1, out=None
+):
     r"""
     Compute the moving sample kurtosis.
 
@@ -405,6 +536,13 @@ def moving_kurtosis(a, w_len, skip, trim=True, axis=-1, return_previous=True):
     return_previous : bool, optional
         Return previous moments. These are computed either way, and are therefore optional returns.
         Default is True.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : tuple, numpy.ndarray, optional
+        Arrays with the shape of the results to write each returned result into,
+        instead of allocating new arrays. A single array if
+        `return_previous=False`. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -496,11 +634,23 @@ def moving_kurtosis(a, w_len, skip, trim=True, axis=-1, return_previous=True):
             "Cannot have a window length larger than the computation axis."
         )
 
-    res = _extensions.moving_kurtosis(x, w_len, skip, trim, return_previous)
+    res = _call_threaded(
+        _extensions.moving_kurtosis,
+        x,
+        n_threads,
+        w_len,
+        skip,
+        trim,
+        return_previous,
+        out=_move_out(out, axis),
+    )
 
     if isnan(res).any():
         warn("NaN values present in output, possibly due to catastrophic cancellation.")
 
+    if out is not None:
+        return out
+
     # move computation axis back to original place and return
     if return_previous:
         return tuple(moveaxis(i, -1, axis) for i in res)
@@ -508,7 +658,7 @@ def moving_kurtosis(a, w_len, skip, trim=True, axis=-1, return_previous=True):
         return moveaxis(res, -1, axis)
 
 
-def moving_median(a, w_len, skip=1, trim=True, axis=-1):
+def moving_median(a, w_len, skip=1, trim=True, axis=-1, n_threads=1, out=None):
     r"""
     Compute the moving mean.
 
@@ -525,6 +675,12 @@ def moving_median(a, w_len, skip=1, trim=True, axis=-1):
         these values will be set to NaN. Default is True.
     axis : int, optional
         Axis to compute the moving mean along. Default is -1.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : numpy.ndarray, optional
+        Array with the shape of the result to write the result into, instead of
+        allocating a new array. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -598,13 +754,121 @@ def moving_median(a, w_len, skip=1, trim=True, axis=-1):
             "Cannot have a window length larger than the computation axis."
         )
 
-    rmed = _extensions.moving_median(x, w_len, skip, trim)
+    rmed = _call_threaded(
+        _extensions.moving_median,
+        x,
+        n_threads,
+        w_len,
+        skip,
+        trim,
+        out=_move_out(out, axis),
+    )
+    if out is not None:
+        return out
 
     # move computation axis back to original place and return
     return moveaxis(rmed, -1, axis)
 
 
-def moving_max(a, w_len, skip, trim=True, axis=-1):
+def moving_quantile(a, w_len, skip, q, trim=True, axis=-1, n_threads=1, out=None):
+    r"""
+    Compute moving quantiles.
+
+    Parameters
+    ----------
+    a : array-like
+        Signal to compute moving quantiles for.
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    q : float, array-like
+        Quantile(s) to compute, between 0 and 1 inclusive.
+    trim : bool, optional
+        Trim the ends of the result, where a value cannot be calculated. If False,
+        these values will be set to NaN. Default is True.
+    axis : int, optional
+        Axis to compute the moving quantiles along. Default is -1.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : numpy.ndarray, optional
+        Array with the shape of the result to write the result into, instead of
+        allocating a new array. Any strides are accepted. Default is None.
+
+    Returns
+    -------
+    mquant : numpy.ndarray
+        Moving quantiles. If `q` is an array, the first axis of the result
+        corresponds to the quantiles, as with :func:`numpy.quantile`. Note that if
+        the moving axis is not the last axis, then the result will *not* be
+        c-contiguous.
+
+    Notes
+    -----
+    Quantiles are linearly interpolated between the two closest values in each
+    window, matching the default method of :func:`numpy.quantile`. Each quantile is
+    tracked with a pair of heaps, the same as :func:`moving_median`, which takes
+    :math:`O(n\log w_{len})` time instead of the :math:`O(n w_{len}\log w_{len})` of
+    sorting each window. All the quantiles are computed in one pass over the data.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> x = np.arange(10)
+    >>> moving_quantile(x, 5, 5, 0.25)
+    array([1., 6.])
+
+    Compute the interquartile range:
+
+    >>> q25, q75 = moving_quantile(x, 5, 1, [0.25, 0.75])
+    >>> q75 - q25
+    array([2., 2., 2., 2., 2., 2.])
+    """
+    if w_len <= 0 or skip <= 0:
+        raise ValueError("`wlen` and `skip` cannot be less than or equal to 0.")
+
+    q_arr = asarray(q, dtype=float_)
+    if q_arr.ndim > 1:
+        raise ValueError("`q` must be a scalar or 1D array.")
+    if ((q_arr < 0) | (q_arr > 1)).any():
+        raise ValueError("Quantiles must be in the range [0, 1].")
+
+    # move computation axis to end
+    x = moveaxis(a, axis, -1)
+
+    # check that there are enough samples
+    if w_len > x.shape[-1]:
+        raise ValueError("Window length is larger than the computation axis.")
+
+    # account for the leading quantile axis of the results
+    r_axis = axis + 1 if axis >= 0 else axis
+    if out is not None and q_arr.ndim == 0:
+        out_ = moveaxis(out[None], r_axis, -1)
+    else:
+        out_ = _move_out(out, r_axis)
+
+    rquant = _call_threaded(
+        _extensions.moving_quantile,
+        x,
+        n_threads,
+        w_len,
+        skip,
+        trim,
+        q_arr.reshape(-1),
+        n_lead=1,
+        out=out_,
+    )
+    if out is not None:
+        return out
+
+    # move computation axis back to original place and return
+    rquant = moveaxis(rquant, -1, r_axis)
+
+    return rquant if q_arr.ndim == 1 else rquant[0]
+
+
+def moving_max(a, w_len, skip, trim=True, axis=-1, n_threads=1, out=None):
     r"""
     Compute the moving maximum value.
 
@@ -621,6 +885,12 @@ def moving_max(a, w_len, skip, trim=True, axis=-1):
         these values will be set to NaN. Default is True.
     axis : int, optional
         Axis to compute the moving max along. Default is -1.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : numpy.ndarray, optional
+        Array with the shape of the result to write the result into, instead of
+        allocating a new array. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -690,7 +960,8 @@ def moving_max(a, w_len, skip, trim=True, axis=-1):
     cond1 = a.ndim == 1 and (skip / w_len) < 0.005
     cond2 = a.ndim > 1 and (skip / w_len) < 0.3  # due to c-contiguity?
     cond3 = a.ndim > 2  # windowing doesnt handle more than 2 dimensions currently
-    if any([cond1, cond2, cond3]):
+    cond4 = out is not None  # write directly into `out`
+    if any([cond1, cond2, cond3, cond4]):
         # move computation axis to end
         x = moveaxis(a, axis, -1)
 
@@ -698,7 +969,17 @@ def moving_max(a, w_len, skip, trim=True, axis=-1):
         if w_len > x.shape[-1]:
             raise ValueError("Window length is larger than the computation axis.")
 
-        rmax = _extensions.moving_max(x, w_len, skip, trim)
+        rmax = _call_threaded(
+            _extensions.moving_max,
+            x,
+            n_threads,
+            w_len,
+            skip,
+            trim,
+            out=_move_out(out, axis),
+        )
+        if out is not None:
+            return out
 
         # move computation axis back to original place and return
         return moveaxis(rmax, -1, axis)
@@ -719,7 +1000,7 @@ def moving_max(a, w_len, skip, trim=True, axis=-1):
         return moveaxis(res, 0, axis)
 
 
-def moving_min(a, w_len, skip, trim=True, axis=-1):
+def moving_min(a, w_len, skip, trim=True, axis=-1, n_threads=1, out=None):
     r"""
     Compute the moving maximum value.
 
@@ -736,6 +1017,12 @@ def moving_min(a, w_len, skip, trim=True, axis=-1):
         these values will be set to NaN. Default is True.
     axis : int, optional
         Axis to compute the moving max along. Default is -1.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : numpy.ndarray, optional
+        Array with the shape of the result to write the result into, instead of
+        allocating a new array. Any strides are accepted. Default is None.
 
     Returns
     -------
@@ -806,7 +1093,8 @@ def moving_min(a, w_len, skip, trim=True, axis=-1):
     cond1 = a.ndim == 1 and (skip / w_len) < 0.005
     cond2 = a.ndim > 1 and (skip / w_len) < 0.3  # due to c-contiguity?
     cond3 = a.ndim > 2  # windowing doesnt handle more than 2 dimensions currently
-    if any([cond1, cond2, cond3]):
+    cond4 = out is not None  # write directly into `out`
+    if any([cond1, cond2, cond3, cond4]):
         # move computation axis to end
         x = moveaxis(a, axis, -1)
 
@@ -814,7 +1102,17 @@ def moving_min(a, w_len, skip, trim=True, axis=-1):
         if w_len > x.shape[-1]:
             raise ValueError("Window length is larger than the computation axis.")
 
-        rmin = _extensions.moving_min(x, w_len, skip, trim)
+        rmin = _call_threaded(
+            _extensions.moving_min,
+            x,
+            n_threads,
+            w_len,
+            skip,
+            trim,
+            out=_move_out(out, axis),
+        )
+        if out is not None:
+            return out
 
         # move computation axis back to original place and return
         return moveaxis(rmin, -1, axis)
@@ -835,6 +1133,103 @@ def moving_min(a, w_len, skip, trim=True, axis=-1):
         return moveaxis(res, 0, axis)
 
 
+def moving_stats(
+    a,
+    w_len,
+    skip,
+    stats=("mean", "sd", "min", "max", "median"),
+    trim=True,
+    axis=-1,
+    n_threads=1,
+    out=None,
+):
+    r"""
+    Compute several moving statistics over the same windows in one pass.
+
+    Parameters
+    ----------
+    a : array-like
+        Signal to compute moving statistics for.
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    stats : iterable of {"mean", "sd", "min", "max", "median"}, optional
+        Statistics to compute. Default is all of them.
+    trim : bool, optional
+        Trim the ends of the result, where a value cannot be calculated. If False,
+        these values will be set to NaN. Default is True.
+    axis : int, optional
+        Axis to compute the moving statistics along. Default is -1.
+    n_threads : int, optional
+        Number of threads to use, parallelizing the computation over the
+        non-computation axes. -1 uses all available CPUs. Default is 1.
+    out : tuple, optional
+        Arrays with the shape of the results to write each statistic into, in the
+        same order as `stats`, instead of allocating new arrays. Any strides are
+        accepted. Default is None.
+
+    Returns
+    -------
+    res : tuple of numpy.ndarray
+        Moving statistics, in the same order as `stats`. Note that if the moving
+        axis is not the last axis, then the results will *not* be c-contiguous.
+
+    Notes
+    -----
+    The input is converted at most once (float64 inputs are never copied, even if
+    the computation axis is strided), and every requested statistic is computed
+    for each row (ie axis of a triaxial signal) before moving on to the next row.
+    The mean is free if the SD is also requested. Results match those
+    of the individual moving statistic functions for finite values. The minimum
+    and maximum may be computed with a different algorithm than :func:`moving_min`
+    and :func:`moving_max` depending on the window overlap, and are NaN for any
+    window containing a NaN value.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> x = np.arange(10)
+    >>> moving_stats(x, 3, 3, stats=("max", "mean"))
+    (array([2., 5., 8.]), array([1., 4., 7.]))
+    """
+    order = ("mean", "sd", "min", "max", "median")
+    stats = tuple(stats)
+    if len(stats) == 0 or not set(stats).issubset(order):
+        raise ValueError(f"`stats` must be a non-empty selection from {order}.")
+    if w_len <= 0 or skip <= 0:
+        raise ValueError("`wlen` and `skip` cannot be less than or equal to 0.")
+
+    # move computation axis to end
+    x = moveaxis(a, axis, -1)
+
+    # check that there are enough samples
+    if w_len > x.shape[-1]:
+        raise ValueError("Window length is larger than the computation axis.")
+
+    flags = [i in stats for i in order]
+    if out is not None:
+        if not isinstance(out, tuple) or len(out) != len(stats):
+            raise ValueError("`out` must be a tuple with an array for each statistic.")
+        # the extension function uses a fixed order
+        out_ = dict(zip(stats, _move_out(out, axis)))
+        out_ = tuple(out_[i] for i in order if i in stats)
+    else:
+        out_ = None
+
+    res = _call_threaded(
+        _extensions.moving_stats, x, n_threads, w_len, skip, trim, *flags, out=out_
+    )
+    if out is not None:
+        return out
+
+    # results are returned in the fixed order of the extension function
+    res = dict(zip([i for i, f in zip(order, flags) if f], res))
+
+    # move computation axis back to original place and return
+    return tuple(moveaxis(res[i], -1, axis) for i in stats)
+
+
 def DFA(a, scale=2 ** (1 / 8), box_sizes=None):
     """
     Detrended Fluctuation Analysis
@@ -842,7 +1237,9 @@ def DFA(a, scale=2 ** (1 / 8), box_sizes=None):
     Parameters
     ----------
     a : numpy.ndarray
-        1d array to compute DFA on
+        Array to compute DFA on. DFA is computed along the last axis, so a
+        batch of equal length series (eg from many subjects) can be processed
+        in one call with a 2D array.
     scale : {float, optional}, optional
         Ratio between succesive box sizes. Default is 2**(1/8). Overwritten by
         `box_sizes` if provided.
@@ -854,14 +1251,22 @@ def DFA(a, scale=2 ** (1 / 8), box_sizes=None):
     box_sizes : numpy.ndarray
         Array of box sizes.
     dfa : numpy.ndarray
-        DFA values for each box size.
-    alpha : float
+        DFA values for each box size, along the last axis.
+    alpha : float, numpy.ndarray
         Log-log relationship slope of the dfa values.
-    abi : float
+    abi : float, numpy.ndarray
         Activity Balance Index [2]_. Values are re-scaled from `alpha` to (0, 1].
         The theory is that higher values present as more healthy (ie activity
         is close to fractal noise) [2]_.
 
+    Notes
+    -----
+    The linear trend of each box is removed in closed form, from the sums of
+    :math:`y`, :math:`y^2`, and :math:`xy` in each box, so all boxes of a given
+    size are detrended at once. The sums are computed per box, after removing the
+    box mean, instead of from cumulative sums over the whole series, which
+    lose precision on long (eg multi-week) series.
+
     References
     ----------
     .. [1] Victor Barreto Mesquita, Florêncio Mendes Oliveira Filho, Paulo Canas Rodrigues,
@@ -875,40 +1280,42 @@ def DFA(a, scale=2 ** (1 / 8), box_sizes=None):
         Goldberger, “Mosaic organization of DNA nucleotides,” Phys. Rev. E, vol. 49,
         no. 2, pp. 1685–1689, Feb. 1994, doi: 10.1103/PhysRevE.49.1685.
     """
+    a = asarray(a, dtype=float_)
+    n = a.shape[-1]
+
     if box_sizes is None:
         if scale is None:
             raise ValueError("One of `scale` or `box_sizes` must be provided.")
         box_sizes = [4]
-        while box_sizes[-1] < round(a.size / 4):
+        while box_sizes[-1] < round(n / 4):
             box_sizes += [int(ceil(box_sizes[-1] * scale))]
 
     box_sizes = asarray(box_sizes)
 
     # subtract the mean and compute cumulative sum
-    y = cumsum(a - mean(a))
+    y = cumsum(a - mean(a, axis=-1, keepdims=True), axis=-1)
     # allocate results
-    dfa = zeros(box_sizes.size, dtype=float_)
+    dfa = zeros(a.shape[:-1] + (box_sizes.size,), dtype=float_)
 
     # iterate over window sizes
     for i, wlen in enumerate(box_sizes):
-        # get a windowed view of y
-        yw = get_windowed_view(y, wlen, wlen)
-        # allocate results
-        f1w = zeros(yw.shape, dtype=float_)
-        # allocate x array for LM fit
-        x = arange(wlen)
-        # iterate over windows
-        for j, dat in enumerate(yw):
-            lr = linregress(x, dat)
-            f1w[j, :] = dat - (lr.slope * x + lr.intercept)
-        # make result 1d
-        f1 = f1w.ravel()
-
-        dfa[i] = sqrt(mean(f1**2))
-
-    # compute alpha
-    lr_dfa = linregress(log(box_sizes), log(dfa))
-    alpha = lr_dfa.slope
+        nw = n // wlen
+        # non-overlapping boxes, centered on their means
+        yw = y[..., : nw * wlen].reshape(a.shape[:-1] + (nw, wlen))
+        yw = yw - mean(yw, axis=-1, keepdims=True)
+        # centered x values for the linear fit
+        x = arange(wlen) - (wlen - 1) / 2
+
+        # residual sum of squares of the linear fit in each box
+        sxy = yw @ x
+        rss = (yw**2).sum(axis=-1) - sxy**2 / (x @ x)
+
+        dfa[..., i] = sqrt(rss.sum(axis=-1) / (nw * wlen))
+
+    # compute alpha, the slope of the log-log fit
+    lx = log(box_sizes) - mean(log(box_sizes))
+    ly = log(dfa)
+    alpha = ((ly - mean(ly, axis=-1, keepdims=True)) @ lx) / (lx @ lx)
 
     abi = exp((-abs(alpha - 1)) / exp(-2))
 
@@ -0,0 +1,390 @@
+"""
+Streaming (incrementally updated) moving statistics
+
+Lukas Adamowicz
+Copyright (c) 2024. Pfizer Inc. All rights reserved.
+"""
+
+from numpy import asarray, concatenate, moveaxis, empty, prod
+
+from skdh.utility import _extensions
+from skdh.utility.math import (
+    moving_mean,
+    moving_sd,
+    moving_skewness,
+    moving_kurtosis,
+)
+
+__all__ = [
+    "MovingMean",
+    "MovingSD",
+    "MovingSkewness",
+    "MovingKurtosis",
+    "MovingMedian",
+    "MovingMax",
+    "MovingMin",
+]
+
+
+class _MovingStatistic:
+    """
+    Base class for streaming moving statistics.
+
+    Only the samples needed for windows that have not been completed yet are kept
+    between updates. Windows are computed with the same functions as the batch
+    (whole array) versions in :mod:`skdh.utility.math`, so that the concatenated
+    results of all updates match the batch results with `trim=True`. See
+    `_WindowStatistic` for statistics that keep the window itself between updates.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the statistic is computed.
+        Default is -1.
+    n_threads : int, optional
+        Number of threads to use for each update. See the batch functions.
+        Default is 1.
+    """
+
+    _fn = None
+    _n_out = 1
+
+    def __init__(self, w_len, skip, axis=-1, n_threads=1):
+        if w_len <= 0 or skip <= 0:
+            raise ValueError("`w_len` and `skip` cannot be less than or equal to 0.")
+
+        self.w_len = int(w_len)
+        self.skip = int(skip)
+        self.axis = axis
+        self.n_threads = n_threads
+
+        self.reset()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(w_len={self.w_len}, skip={self.skip})"
+
+    def reset(self):
+        """
+        Clear any stored samples, returning to the initial state.
+        """
+        # samples from the start of the next window onwards, computation axis last
+        self._buffer = None
+        # samples still to drop from the next chunks if `skip > w_len`
+        self._n_drop = 0
+
+    def _compute(self, x):
+        return self._fn(x, self.w_len, self.skip, axis=-1, n_threads=self.n_threads)
+
+    def _empty(self, shape):
+        res = tuple(
+            moveaxis(empty(shape[:-1] + (0,)), -1, self.axis)
+            for _ in range(self._n_out)
+        )
+        return res if self._n_out > 1 else res[0]
+
+    def update(self, chunk):
+        """
+        Add the next chunk of samples, and compute any windows completed by it.
+
+        Parameters
+        ----------
+        chunk : array-like
+            Next samples of the signal. Must have the same shape as previous
+            chunks on all axes other than `axis`.
+
+        Returns
+        -------
+        res : numpy.ndarray, tuple
+            Statistic values for the windows completed by this chunk, in the
+            same format as the batch function. May have length 0 along `axis`.
+        """
+        x = moveaxis(asarray(chunk, dtype=float), self.axis, -1)
+
+        if self._n_drop > 0:
+            n = min(self._n_drop, x.shape[-1])
+            x = x[..., n:]
+            self._n_drop -= n
+
+        if self._buffer is not None:
+            if self._buffer.shape[:-1] != x.shape[:-1]:
+                raise ValueError("Chunk shape does not match previous chunks.")
+            x = concatenate((self._buffer, x), axis=-1)
+
+        if x.shape[-1] < self.w_len:
+            self._buffer = x.copy()
+            return self._empty(x.shape)
+
+        n_windows = (x.shape[-1] - self.w_len) // self.skip + 1
+        res = self._compute(x)
+
+        # keep only the samples from the start of the next window. Copy so that
+        # the rest of the chunk can be freed
+        n_used = n_windows * self.skip
+        self._buffer = x[..., n_used:].copy()
+        self._n_drop = max(n_used - x.shape[-1], 0)
+
+        if isinstance(res, tuple):
+            return tuple(moveaxis(i, -1, self.axis) for i in res)
+        return moveaxis(res, -1, self.axis)
+
+
+class _WindowStatistic(_MovingStatistic):
+    """
+    Base class for streaming moving statistics that keep the state of the window of
+    each signal (the heaps of the moving median, or the queue of the moving extrema)
+    between updates, instead of the samples. Every sample is inserted into the window
+    once as it arrives, so that updates with a few samples cost the same per sample as
+    the batch computation, no matter the window length.
+
+    The state is not protected against concurrent updates from several threads.
+    """
+
+    _kind = None
+
+    def reset(self):
+        """
+        Clear the window state, returning to the initial state.
+        """
+        self._state = None
+        # shape of all but the computation axis, fixed by the first update
+        self._shape = None
+
+    def update(self, chunk):
+        """
+        Add the next chunk of samples, and compute any windows completed by it.
+
+        Parameters
+        ----------
+        chunk : array-like
+            Next samples of the signal. Must have the same shape as previous
+            chunks on all axes other than `axis`.
+
+        Returns
+        -------
+        res : numpy.ndarray
+            Statistic values for the windows completed by this chunk, in the
+            same format as the batch function. May have length 0 along `axis`.
+        """
+        x = moveaxis(asarray(chunk, dtype=float), self.axis, -1)
+
+        if self._state is None:
+            self._shape = x.shape[:-1]
+            self._state = _extensions.moving_stream_new(
+                self._kind, int(prod(self._shape)), self.w_len, self.skip
+            )
+        elif x.shape[:-1] != self._shape:
+            raise ValueError("Chunk shape does not match previous chunks.")
+
+        res = _extensions.moving_stream_update(self._state, x)
+        return moveaxis(res, -1, self.axis)
+
+
+class MovingMean(_MovingStatistic):
+    """
+    Streaming moving mean. Call `update` with each new chunk of data to get the
+    moving mean of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the mean is computed. Default is -1.
+    n_threads : int, optional
+        Number of threads to use for each update. Default is 1.
+
+    See Also
+    --------
+    skdh.utility.math.moving_mean
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> mm = MovingMean(3, 3)
+    >>> mm.update(np.arange(5))
+    array([1.])
+    >>> mm.update(np.arange(5, 10))
+    array([4., 7.])
+    """
+
+    _fn = staticmethod(moving_mean)
+
+
+class MovingSD(_MovingStatistic):
+    """
+    Streaming moving sample standard deviation. Call `update` with each new
+    chunk of data to get the moving SD of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the SD is computed. Default is -1.
+    return_previous : bool, optional
+        Also return the moving mean. Default is True.
+    n_threads : int, optional
+        Number of threads to use for each update. Default is 1.
+
+    See Also
+    --------
+    skdh.utility.math.moving_sd
+    """
+
+    _fn = staticmethod(moving_sd)
+    _n_prev = 1
+
+    def __init__(self, w_len, skip, axis=-1, return_previous=True, n_threads=1):
+        super().__init__(w_len, skip, axis=axis, n_threads=n_threads)
+
+        self.return_previous = return_previous
+        self._n_out = 1 + self._n_prev if return_previous else 1
+
+    def _compute(self, x):
+        return self._fn(
+            x,
+            self.w_len,
+            self.skip,
+            axis=-1,
+            return_previous=self.return_previous,
+            n_threads=self.n_threads,
+        )
+
+
+class MovingSkewness(MovingSD):
+    """
+    Streaming moving skewness. Call `update` with each new chunk of data to get
+    the moving skewness of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the skewness is computed.
+        Default is -1.
+    return_previous : bool, optional
+        Also return the moving SD and mean. Default is True.
+    n_threads : int, optional
+        Number of threads to use for each update. Default is 1.
+
+    See Also
+    --------
+    skdh.utility.math.moving_skewness
+    """
+
+    _fn = staticmethod(moving_skewness)
+    _n_prev = 2
+
+
+class MovingKurtosis(MovingSD):
+    """
+    Streaming moving kurtosis. Call `update` with each new chunk of data to get
+    the moving kurtosis of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the kurtosis is computed.
+        Default is -1.
+    return_previous : bool, optional
+        Also return the moving skewness, SD, and mean. Default is True.
+    n_threads : int, optional
+        Number of threads to use for each update. Default is 1.
+
+    See Also
+    --------
+    skdh.utility.math.moving_kurtosis
+    """
+
+    _fn = staticmethod(moving_kurtosis)
+    _n_prev = 3
+
+
+class MovingMedian(_WindowStatistic):
+    """
+    Streaming moving median. Call `update` with each new chunk of data to get
+    the moving median of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the median is computed.
+        Default is -1.
+    n_threads : int, optional
+        Not used, each sample is inserted into the window as it arrives.
+
+    See Also
+    --------
+    skdh.utility.math.moving_median
+    """
+
+    _kind = "median"
+
+
+class MovingMax(_WindowStatistic):
+    """
+    Streaming moving maximum. Call `update` with each new chunk of data to get
+    the moving maximum of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the maximum is computed.
+        Default is -1.
+    n_threads : int, optional
+        Not used, each sample is inserted into the window as it arrives.
+
+    See Also
+    --------
+    skdh.utility.math.moving_max
+    """
+
+    _kind = "max"
+
+
+class MovingMin(_WindowStatistic):
+    """
+    Streaming moving minimum. Call `update` with each new chunk of data to get
+    the moving minimum of the windows completed by that chunk.
+
+    Parameters
+    ----------
+    w_len : int
+        Window length in number of samples.
+    skip : int
+        Window start location skip in number of samples.
+    axis : int, optional
+        Axis along which chunks are appended and the minimum is computed.
+        Default is -1.
+    n_threads : int, optional
+        Not used, each sample is inserted into the window as it arrives.
+
+    See Also
+    --------
+    skdh.utility.math.moving_min
+    """
+
+    _kind = "min"
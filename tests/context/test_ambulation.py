@@ -2,6 +2,7 @@ import pytest
 import numpy as np
 from lightgbm import Booster
 from skdh.context import Ambulation
+from skdh.utility.internal import apply_resample
 
 
 # Test input check on real data
@@ -127,3 +128,25 @@ def test_11_integration_ambulation_downsample(ambulation_negative_data_50hz):
     assert (
         sum(prd) < len(prd) * 0.15
     )  # confirm detecting less than 15% of walking data as ambulation on downsampled data
+
+
+# Integration test 4: polyphase downsampling is passed through to the resampling
+def test_12_integration_ambulation_polyphase(
+    ambulation_negative_data_50hz, monkeypatch
+):
+    from skdh.context import core
+
+    calls = []
+
+    def spy(**kwargs):
+        calls.append(kwargs["polyphase"])
+        return apply_resample(**kwargs)
+
+    monkeypatch.setattr(core, "apply_resample", spy)
+
+    time, accel = ambulation_negative_data_50hz
+    res = Ambulation(downsample_polyphase=True).predict(time=time, accel=accel)
+    prd = res["ambulation_3s_epochs_predictions"]
+
+    assert calls == [True]
+    assert sum(prd) < len(prd) * 0.15
@@ -3,6 +3,7 @@ from numpy import allclose, array
 
 from skdh.context import PredictGaitLumbarLgbm
 from skdh.utility.exceptions import LowFrequencyError
+from skdh.utility.internal import apply_resample
 
 
 class TestPredictGaitLumbarLgbm:
@@ -24,6 +25,26 @@ class TestPredictGaitLumbarLgbm:
         # check kw shape
         assert kw["gait_bouts"].shape == (3, 2)
 
+    def test_polyphase(self, gait_input_50, monkeypatch):
+        from skdh.context import gait_classification
+
+        calls = []
+
+        def spy(**kwargs):
+            calls.append(kwargs["polyphase"])
+            return apply_resample(**kwargs)
+
+        monkeypatch.setattr(gait_classification, "apply_resample", spy)
+
+        # upsample to 75hz, which has to be downsampled by a rational factor
+        t, acc = gait_input_50
+        t75, (acc75,) = apply_resample(time=t, goal_fs=75.0, data=(acc,), fs=50.0)
+
+        proc = PredictGaitLumbarLgbm(downsample_polyphase=True)
+        proc.predict(time=t75, accel=acc75, fs=75.0)
+
+        assert calls == [True]
+
     def test_warnings_errors(self, gait_input_50):
         t, acc = gait_input_50
         proc = PredictGaitLumbarLgbm()
@@ -52,6 +52,35 @@ def testprocess3():
     return TestProcess3
 
 
+@pytest.fixture(scope="module")
+def resampleprocess():
+    from skdh.utility.internal import apply_resample
+
+    class ResampleProcess(BaseProcess):
+        def __init__(self, goal_fs=20.0):
+            super().__init__(goal_fs=goal_fs)
+            self.goal_fs = goal_fs
+            self.accel_rs = None
+
+        @handle_process_returns(results_to_kwargs=False)
+        def predict(self, *, time, accel, fs=None, **kwargs):
+            super().predict(
+                expect_days=False,
+                expect_wear=False,
+                time=time,
+                accel=accel,
+                fs=fs,
+                **kwargs,
+            )
+            _, (self.accel_rs,) = apply_resample(
+                time=time, goal_fs=self.goal_fs, data=(accel,), fs=fs
+            )
+
+            return {"n": self.accel_rs.shape[0]}
+
+    return ResampleProcess
+
+
 @pytest.fixture(scope="module")
 def dummy_pipeline():
     exp = {
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+import skdh
+
+
+def run_python(code):
+    res = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return res.stdout.strip()
+
+
+def test_lazy_import_modules():
+    code = (
+        "import sys, skdh\n"
+        "heavy = ['matplotlib', 'lightgbm', 'pywt', 'sklearn', 'h5py', 'avro', 'pandas']\n"
+        "print([m for m in heavy if m in sys.modules])\n"
+        "print([m for m in skdh._submodules if f'skdh.{m}' in sys.modules])"
+    )
+    heavy, submodules = run_python(code).split("\n")
+
+    assert heavy == "[]"
+    assert submodules == "[]"
+
+
+@pytest.mark.parametrize("name", skdh._submodules)
+def test_lazy_submodule_access(name):
+    mod = getattr(skdh, name)
+
+    assert mod.__name__ == f"skdh.{name}"
+    assert name in dir(skdh)
+
+
+def test_missing_attribute():
+    with pytest.raises(AttributeError):
+        skdh.not_a_submodule
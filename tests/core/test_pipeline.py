@@ -3,9 +3,12 @@ from pathlib import Path
 
 import pytest
 import yaml
+from numpy import arange, allclose, zeros
 
 from skdh.pipeline import Pipeline, NotAProcessError, ProcessNotFoundError, VersionError
 from skdh.gait import GaitLumbar
+from skdh.io import ReadCwa
+from skdh.preprocessing import CalibrateAccelerometer
 from skdh import __version__ as skdh_vers
 
 
@@ -40,6 +43,83 @@ class TestPipeline:
 
         assert res == exp_res
 
+    @pytest.mark.parametrize("cache", (True, False))
+    def test_run_cache_signals(self, resampleprocess, np_rng, cache):
+        p = Pipeline(cache_signals=cache)
+
+        p.add(resampleprocess(goal_fs=20.0))
+        p.add(resampleprocess(goal_fs=20.0))
+
+        time = arange(0, 60, 0.02)
+        accel = np_rng.random((time.size, 3))
+
+        p.run(time=time, accel=accel, fs=50.0)
+
+        assert (p._steps[0].accel_rs is p._steps[1].accel_rs) == cache
+        assert allclose(p._steps[0].accel_rs, p._steps[1].accel_rs)
+
+    def test_plan(self, testprocess, testprocess2):
+        p = Pipeline(cache_max_bytes=1000)
+        p.add(testprocess())
+        p.add(testprocess2())
+
+        inputs = [
+            {"time": arange(100.0), "accel": zeros((100, 3))},
+            {"time": arange(1000.0), "accel": zeros((1000, 3))},
+        ]
+        plan = p.plan(inputs, reference_time=1e-6)
+
+        assert len(plan["inputs"]) == 2
+        assert plan["warnings"] == []
+        assert [i["n_samples"] for i in plan["inputs"]] == [100, 1000]
+        # 2 steps with 2x reference work per sample by default
+        assert allclose(plan["runtime"], 1100 * 2 * 2 * 1e-6)
+        # input data, 48 bytes per sample working memory, cache capped at 1000
+        assert plan["peak_memory"] == 1000 * (32 + 48) + 1000
+        assert plan["inputs"][0]["cache_memory"] == 1000
+
+        p.cache_signals = False
+        assert p.plan(inputs, reference_time=1e-6)["peak_memory"] == 1000 * 80
+
+    def test_plan_file(self, path_tests):
+        p = Pipeline()
+        p.add(ReadCwa())
+        p.add(CalibrateAccelerometer())
+
+        file = path_tests / "io" / "data" / "ax3_sample.cwa"
+
+        with pytest.warns(UserWarning) as record:
+            plan = p.plan([file, "not_a_file.abc"], reference_time=1e-6)
+
+        msgs = [str(i.message) for i in record]
+        assert any("converts raw data to float64" in i for i in msgs)
+        assert any(
+            "Cannot determine the size of input not_a_file.abc" in i for i in msgs
+        )
+        assert len(plan["inputs"]) == 1
+        assert plan["inputs"][0]["n_samples"] == 58800
+        assert plan["inputs"][0]["fs"] == 200.0
+        assert plan["inputs"][0]["steps"][1]["input"] == 58800 * 40
+
+    def test_plan_not_inspectable(self, testprocess):
+        p = Pipeline()
+        p.add(testprocess())
+
+        with pytest.warns(UserWarning, match="Cannot determine the size"):
+            plan = p.plan(["test.abc"], reference_time=1e-6)
+
+        assert plan["inputs"] == []
+        assert plan["peak_memory"] == 0
+
+    def test_plan_copy_warning(self, testprocess):
+        p = Pipeline()
+        proc = testprocess()
+        proc._plan_memory = 1000.0
+        p.add(proc)
+
+        with pytest.warns(UserWarning, match=r"working memory \(31.2x its input"):
+            p.plan([{"time": arange(100.0), "accel": zeros((100, 3))}])
+
     def test_str_repr(self, testprocess):
         p = Pipeline()
 
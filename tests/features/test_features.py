@@ -1,5 +1,5 @@
 import pytest
-from numpy import zeros, allclose, isclose, sqrt, diff, sum, std, abs, array
+from numpy import zeros, allclose, isclose, isnan, sqrt, diff, sum, std, abs, array, nan
 
 from skdh.features.lib import (
     Mean,
@@ -29,33 +29,48 @@ from skdh.features.lib import (
     DetailPower,
     DetailPowerRatio,
 )
+from skdh.features.lib import wavelet
+from skdh.features.lib.extensions import sample_entropy_pairwise, SPARC_segments
+
+
+EXT_FEATURES = [
+    DominantFrequency,
+    DominantFrequencyValue,
+    PowerSpectralSum,
+    SpectralFlatness,
+    SpectralEntropy,
+    Autocorrelation,
+    LinearSlope,
+    ComplexityInvariantDistance,
+    RangeCountPercentage,
+    RatioBeyondRSigma,
+    SignalEntropy,
+    SampleEntropy,
+    PermutationEntropy,
+    JerkMetric,
+    DimensionlessJerk,
+    SPARC,
+]
 
 
 def test_size_0_input():
-    ext_features = [
-        DominantFrequency,
-        DominantFrequencyValue,
-        PowerSpectralSum,
-        SpectralFlatness,
-        SpectralEntropy,
-        Autocorrelation,
-        LinearSlope,
-        ComplexityInvariantDistance,
-        RangeCountPercentage,
-        RatioBeyondRSigma,
-        SignalEntropy,
-        SampleEntropy,
-        PermutationEntropy,
-        JerkMetric,
-        DimensionlessJerk,
-        SPARC,
-    ]
-
-    for fn in ext_features:
+    for fn in EXT_FEATURES:
         with pytest.raises(ValueError):
             fn().compute(array([]))
 
 
+@pytest.mark.parametrize("feature", EXT_FEATURES)
+def test_strided_input(feature, get_sin_signal):
+    # the computation axis is strided, and is not copied to be made contiguous
+    fs, x = get_sin_signal([1.0, 0.5], [1.0, 5.0], scale=0.1)
+    x = x[:, None] * array([[1.0, 0.5, 2.0]]) + array([[0.0, 0.1, -0.3]])
+
+    pred = feature().compute(x, fs=fs, axis=0)
+    truth = feature().compute(x.T.copy(), fs=fs, axis=-1)
+
+    assert allclose(pred, truth, equal_nan=True)
+
+
 def test_Mean(get_linear_accel):
     x = get_linear_accel(0.025)
 
@@ -215,6 +230,32 @@ def test_Autocorrelation(get_sin_signal):
     assert isclose(res_2, 1.0, atol=0.003)
 
 
+@pytest.mark.parametrize("normalize", (True, False))
+@pytest.mark.parametrize("method", ("direct", "fft"))
+def test_Autocorrelation_lags(normalize, method, np_rng):
+    x = np_rng.standard_normal((4, 3, 200)) + 2.0
+    lags = [1, 5, 10, 20, 199]
+
+    res = Autocorrelation(lag=lags, normalize=normalize, method=method).compute(x)
+
+    assert res.shape == (5, 4, 3)
+    for r, lag in zip(res, lags):
+        truth = Autocorrelation(lag=lag, normalize=normalize).compute(x)
+        assert allclose(r, truth, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+    # single lag with the fft method
+    res = Autocorrelation(lag=5, normalize=normalize, method=method).compute(x)
+    assert allclose(res, Autocorrelation(lag=5, normalize=normalize).compute(x))
+
+
+def test_Autocorrelation_errors(np_rng):
+    with pytest.raises(ValueError):
+        Autocorrelation(method="other")
+
+    with pytest.raises(ValueError):
+        Autocorrelation(lag=[1, -1]).compute(np_rng.random(20))
+
+
 def test_LinearSlope(get_cubic_signal):
     x = get_cubic_signal(0.0, 0.0, 1.375, -13.138, 0.0)
 
@@ -265,6 +306,19 @@ def test_SampleEntropy(get_sin_signal):
     assert isclose(res, 0.01959076)
 
 
+@pytest.mark.parametrize("m", (1, 2, 4))
+@pytest.mark.parametrize("r", (0.0, 0.2, 1.0, 3.0, 10.0))
+def test_SampleEntropy_pairwise(m, r, np_rng):
+    # both the matching and non-matching counts, with repeated values and NaNs
+    x = np_rng.standard_normal((4, 500)).round(1)
+    x[1, [5, 200, 201]] = nan
+
+    res = SampleEntropy(m=m, r=r).compute(x)
+    truth = sample_entropy_pairwise(x, m, r)
+
+    assert allclose(res, truth, rtol=0, atol=0, equal_nan=True)
+
+
 def test_PermutationEntropy(get_sin_signal):
     fs, x = get_sin_signal(1.0, 0.2, 0.0)
 
@@ -310,6 +364,28 @@ def test_SPARC(get_sin_signal):
     assert res2 < res
 
 
+def test_SPARC_segments(np_rng):
+    x = np_rng.standard_normal(2000)
+    starts = np_rng.integers(0, 1500, 50)
+    stops = starts + np_rng.integers(2, 400, 50)
+    # empty segment
+    stops[3] = starts[3]
+
+    res = SPARC_segments(x, starts, stops, 50.0, 4, 10.0, 0.05)
+
+    ft = SPARC(padlevel=4, fc=10.0, amplitude_threshold=0.05)
+    for i, (i1, i2) in enumerate(zip(starts, stops)):
+        if i == 3:
+            assert isnan(res[i])
+        else:
+            assert res[i] == ft.compute(x[i1:i2], fs=50.0)
+
+    with pytest.raises(ValueError):
+        SPARC_segments(x, [0, 10], [5], 50.0, 4, 10.0, 0.05)
+    with pytest.raises(ValueError):
+        SPARC_segments(x, [0], [2001], 50.0, 4, 10.0, 0.05)
+
+
 def test_DetailPower(get_sin_signal):
     fs, x = get_sin_signal([2.0, 0.5], [1.5, 5.0], 0.0)
 
@@ -337,3 +413,17 @@ def test_DetailPowerRatio(get_sin_signal):
     assert isclose(res_high, res_low, atol=0.03)
     assert res_high < res_all
     assert res_low < res_all
+
+
+@pytest.mark.parametrize("feature", (DetailPower, DetailPowerRatio))
+def test_wavelet_blocks(feature, np_rng, monkeypatch):
+    # strided input, and blocks that do not divide the number of windows
+    x = np_rng.standard_normal((3, 25, 200)).transpose((1, 0, 2))
+
+    truth = feature(freq_band=[2.0, 12.0]).compute(x, fs=50.0)
+
+    monkeypatch.setattr(wavelet, "_BLOCK_SAMPLES", 7 * 200)
+    res = feature(freq_band=[2.0, 12.0]).compute(x, fs=50.0)
+
+    assert res.shape == (25, 3)
+    assert allclose(res, truth)
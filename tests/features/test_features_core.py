@@ -1,4 +1,18 @@
+import pickle
+
 import pytest
+from numpy import (
+    zeros,
+    allclose,
+    nan,
+    inf,
+    isnan,
+    arange,
+    repeat,
+    concatenate,
+    moveaxis,
+)
+from numpy.lib.stride_tricks import sliding_window_view
 from pandas import DataFrame
 
 from skdh.features.core import (
@@ -7,10 +21,29 @@ from skdh.features.core import (
     normalize_indices,
     normalize_axes,
     Bank,
+    CompiledBank,
     Feature,
     ArrayConversionError,
 )
-from skdh.features.lib.moments import Mean, StdDev, Skewness, Kurtosis
+from skdh.features.lib.moments import Mean, MeanCrossRate, StdDev, Skewness, Kurtosis
+from skdh.features.lib.frequency import (
+    DominantFrequency,
+    DominantFrequencyValue,
+    PowerSpectralSum,
+    SpectralFlatness,
+    SpectralEntropy,
+)
+from skdh.features.lib.smoothness import SPARC
+from skdh.features.lib.statistics import (
+    Range,
+    IQR,
+    RMS,
+    Autocorrelation,
+    LinearSlope,
+)
+from skdh.features.lib.entropy import SampleEntropy
+from skdh.features.lib.wavelet import DetailPower, DetailPowerRatio
+from skdh.utility.windowing import get_windowed_view
 
 
 @pytest.mark.parametrize(
@@ -195,6 +228,416 @@ class TestBank:
 
         assert res.shape == out_shape
 
+    def test_plan(self):
+        bank = Bank()
+        bank.add(
+            [
+                DominantFrequency(),
+                IQR(),
+                SpectralEntropy(low_cutoff=1.0),
+                SpectralFlatness(padlevel=3),
+                PowerSpectralSum(),
+                PowerSpectralSum(),
+            ],
+            [..., ..., ..., ..., ..., [0, 1]],
+        )
+
+        plan = bank._plan(bank._indices)
+
+        assert [members for _, members in plan] == [[0, 2, 4], [1], [3], [5]]
+        assert plan[1][0] is None
+
+    @pytest.mark.parametrize("index_axis", (None, 1))
+    def test_shared_spectrum(self, index_axis, np_rng):
+        feats = [
+            DominantFrequency(low_cutoff=0.5, high_cutoff=8.0),
+            Mean(),
+            DominantFrequencyValue(),
+            PowerSpectralSum(),
+            SpectralFlatness(),
+            SpectralEntropy(padlevel=1),
+            SpectralEntropy(high_cutoff=12.0),
+        ]
+        bank = Bank()
+        bank.add(feats)
+
+        x = np_rng.random((20, 3, 150))
+        res = bank.compute(x, 50.0, axis=-1, index_axis=index_axis)
+
+        truth = [ft.compute(x, fs=50.0, axis=-1) for ft in feats]
+        if index_axis is None:
+            for r, t in zip(res, truth):
+                assert (r == t).all()
+        else:
+            for i, t in enumerate(truth):
+                assert (res[:, 3 * i : 3 * i + 3] == t).all()
+
+    @pytest.mark.parametrize("index_axis", (None, 1))
+    def test_fused_moments(self, index_axis, np_rng):
+        feats = [
+            Mean(),
+            Kurtosis(),
+            MeanCrossRate(),
+            DominantFrequency(),
+            StdDev(),
+            Range(),
+            Skewness(),
+            RMS(),
+        ]
+        bank = Bank()
+        bank.add(feats)
+
+        assert [members for _, members in bank._plan(bank._indices)] == [
+            [0, 1, 2, 4, 5, 6, 7],
+            [3],
+        ]
+
+        x = np_rng.random((20, 3, 150))
+        x[2, 1, 7] = nan
+        res = bank.compute(x, 50.0, axis=-1, index_axis=index_axis)
+
+        truth = [ft.compute(x, fs=50.0, axis=-1) for ft in feats]
+        if index_axis is None:
+            for r, t in zip(res, truth):
+                assert allclose(r, t, equal_nan=True)
+        else:
+            for i, t in enumerate(truth):
+                assert allclose(res[:, 3 * i : 3 * i + 3], t, equal_nan=True)
+
+    def test_autocorrelation(self, np_rng):
+        lags = (1, 5, 10, 20)
+        bank = Bank()
+        bank.add([Autocorrelation(lag=i) for i in lags])
+
+        assert [members for _, members in bank._plan(bank._indices)] == [[0, 1, 2, 3]]
+
+        x = np_rng.random((20, 3, 150))
+        res = bank.compute(x, 50.0)
+
+        for r, lag in zip(res, lags):
+            assert allclose(r, Autocorrelation(lag=lag).compute(x))
+
+    @pytest.mark.parametrize("index_axis", (None, 1))
+    def test_shared_wavelet(self, index_axis, np_rng):
+        feats = [
+            DetailPower(),
+            DetailPowerRatio(freq_band=[0.5, 8.0]),
+            DetailPower(wavelet="db2"),
+            DetailPower(freq_band=[2.0, 12.0]),
+        ]
+        bank = Bank()
+        bank.add(feats)
+
+        plan = bank._plan(bank._indices)
+        assert [members for _, members in plan] == [[0, 1, 3], [2]]
+
+        x = np_rng.random((20, 3, 150))
+        res = bank.compute(x, 50.0, index_axis=index_axis)
+
+        truth = [ft.compute(x, fs=50.0) for ft in feats]
+        if index_axis is None:
+            assert allclose(res, truth)
+        else:
+            for i, t in enumerate(truth):
+                assert allclose(res[:, 3 * i : 3 * i + 3], t)
+
+    @pytest.mark.parametrize("index_axis", (None, 1))
+    def test_multiple_outputs(self, index_axis, np_rng):
+        feats = [
+            Mean(),
+            Autocorrelation(lag=[1, 2, 3]),
+            Autocorrelation(lag=range(1, 10), method="fft"),
+        ]
+        bank = Bank()
+        bank.add(feats)
+
+        x = np_rng.random((20, 3, 150))
+        res = bank.compute(x, 50.0, index_axis=index_axis)
+
+        truth = [ft.compute(x, fs=50.0).reshape((-1, 20, 3)) for ft in feats]
+        if index_axis is None:
+            assert res.shape == (13, 20, 3)
+            assert allclose(res, concatenate(truth, axis=0))
+        else:
+            # blocks of the index axis for each output of each feature
+            assert res.shape == (20, 13 * 3)
+            truth = concatenate(truth, axis=0).transpose((1, 0, 2)).reshape((20, -1))
+            assert allclose(res, truth)
+
+    @pytest.mark.parametrize("index_axis", (None, 1))
+    @pytest.mark.parametrize("n_jobs", (3, -1, 50))
+    def test_n_jobs(self, index_axis, n_jobs, np_rng):
+        bank = Bank()
+        bank.add(
+            [
+                Mean(),
+                DominantFrequency(),
+                SpectralEntropy(),
+                SPARC(),
+                SampleEntropy(),
+                StdDev(),
+            ]
+        )
+
+        x = np_rng.random((20, 3, 150))
+        truth = bank.compute(x, 50.0, axis=-1, index_axis=index_axis)
+        res = bank.compute(x, 50.0, axis=-1, index_axis=index_axis, n_jobs=n_jobs)
+
+        assert res.shape == truth.shape
+        assert (res == truth).all()
+
+    @pytest.mark.parametrize("index_axis", (None, 2))
+    @pytest.mark.parametrize(
+        ("chunk_size", "n_jobs"), ((1, 1), (7, 1), (7, 2), (100, 1))
+    )
+    def test_chunk_size(self, index_axis, chunk_size, n_jobs, np_rng):
+        bank = Bank()
+        bank.add([Mean(), StdDev(), DominantFrequency(), SpectralEntropy(), SPARC()])
+
+        # strided (non-contiguous) windowed view
+        x = get_windowed_view(np_rng.random((1000, 3)), 50, 20)
+        truth = bank.compute(x, 50.0, axis=1, index_axis=index_axis)
+        res = bank.compute(
+            x,
+            50.0,
+            axis=1,
+            index_axis=index_axis,
+            chunk_size=chunk_size,
+            n_jobs=n_jobs,
+        )
+
+        assert (res == truth).all()
+
+    def test_chunk_size_error(self, np_rng):
+        bank = Bank()
+        bank.add(Mean())
+
+        with pytest.raises(ValueError):
+            bank.compute(np_rng.random((10, 50)), chunk_size=0)
+
+    @pytest.mark.parametrize("index_axis", (None, 0))
+    def test_out(self, index_axis, np_rng):
+        bank = Bank()
+        bank.add([Mean(), DominantFrequency(), StdDev()])
+
+        x = np_rng.random((3, 20, 100))
+        truth = bank.compute(x, 20.0, index_axis=index_axis)
+
+        out = zeros(truth.shape)
+        res = bank.compute(x, 20.0, index_axis=index_axis, out=out, chunk_size=6)
+
+        assert res is out
+        assert (out == truth).all()
+
+    @pytest.mark.parametrize("shape", ((3, 20), (2, 20, 1), (2, 19)))
+    def test_out_error(self, shape, np_rng):
+        bank = Bank()
+        bank.add([Mean(), StdDev()])
+
+        with pytest.raises(ValueError):
+            bank.compute(np_rng.random((20, 100)), out=zeros(shape))
+
+    def test_out_type_error(self, np_rng):
+        bank = Bank()
+        bank.add([Mean(), StdDev()])
+        x = np_rng.random((20, 100))
+
+        with pytest.raises(ValueError):
+            bank.compute(x, out=zeros((2, 20), dtype="float32"))
+
+        out = zeros((2, 20))
+        out.flags.writeable = False
+        with pytest.raises(ValueError):
+            bank.compute(x, out=out)
+
+    def test_n_jobs_no_split(self, np_rng):
+        bank = Bank()
+        bank.add([Mean(), DominantFrequency()])
+
+        x = np_rng.random(150)
+
+        assert (bank.compute(x, 50.0, n_jobs=4) == bank.compute(x, 50.0)).all()
+
+    @pytest.mark.parametrize(
+        ("shape", "axis", "index_axis"),
+        (
+            ((600,), -1, None),
+            ((600, 3), 0, None),
+            ((600, 3), 0, 1),
+            ((3, 600), 1, 0),
+            ((2, 600, 3), 1, 2),
+            ((2, 600, 3), 1, None),
+            ((3, 2, 600), -1, 0),
+        ),
+    )
+    @pytest.mark.parametrize("step", (1, 7, 50, 60))
+    def test_compute_windows(self, shape, axis, index_axis, step, np_rng):
+        bank = Bank()
+        bank.add(
+            [
+                Mean(),
+                StdDev(),
+                Skewness(),
+                Kurtosis(),
+                MeanCrossRate(),
+                Range(),
+                RMS(),
+                LinearSlope(),
+                DominantFrequency(),
+                Autocorrelation(lag=[1, 2]),
+            ]
+        )
+
+        x = np_rng.standard_normal(shape).cumsum(axis=axis)
+        res = bank.compute_windows(
+            x, 50, step, 20.0, axis=axis, index_axis=index_axis, chunk_size=4
+        )
+
+        # windows in place of the window axis, samples last
+        axis = axis % x.ndim
+        xw = moveaxis(sliding_window_view(x, 50, axis=axis), axis, 0)[::step]
+        xw = moveaxis(xw, 0, axis)
+        truth = bank.compute(xw, 20.0, axis=-1, index_axis=index_axis)
+
+        assert res.shape == truth.shape
+        assert allclose(res, truth)
+
+    def test_compute_windows_nan(self, np_rng):
+        bank = Bank()
+        bank.add(
+            [
+                Mean(),
+                StdDev(),
+                RMS(),
+                Skewness(),
+                Kurtosis(),
+                MeanCrossRate(),
+                Range(),
+                LinearSlope(),
+            ]
+        )
+
+        x = np_rng.standard_normal(1000)
+        x[[0, 100, 600, 601]] = nan
+        x[[300, 800]] = inf
+
+        res = bank.compute_windows(x, 100, 3)
+        truth = bank.compute(sliding_window_view(x, 100)[::3])
+
+        assert allclose(res, truth, equal_nan=True)
+        # the mean of windows with an infinite sample is infinite
+        assert (res[0, 67:100] == inf).all()
+
+    @pytest.mark.parametrize("feats", ([MeanCrossRate()], [Mean(), MeanCrossRate()]))
+    def test_compute_windows_quantized(self, feats, np_rng):
+        bank = Bank()
+        bank.add(feats)
+
+        # many windows have a mean equal to one of the samples
+        x = (np_rng.standard_normal(20000) / 0.02).round() * 0.02
+
+        res = bank.compute_windows(x, 250, 1)
+        truth = bank.compute(sliding_window_view(x, 250))
+
+        assert allclose(res, truth)
+
+    @pytest.mark.parametrize(("w_len", "step"), ((150, 30), (250, 1)))
+    def test_compute_windows_range_nan(self, w_len, step, np_rng):
+        bank = Bank()
+        bank.add(Range())
+
+        x = np_rng.standard_normal((2000, 3))
+        x.flat[np_rng.choice(x.size, 10, replace=False)] = nan
+
+        res = bank.compute_windows(x, w_len, step, axis=0)
+        truth = bank.compute(sliding_window_view(x, w_len, axis=0)[::step])
+
+        assert isnan(truth).any()
+        assert allclose(res, truth, equal_nan=True)
+
+    @pytest.mark.parametrize("step", (1, 3))
+    def test_compute_windows_piecewise_constant(self, step, np_rng):
+        bank = Bank()
+        bank.add([Mean(), StdDev(), RMS(), Skewness(), Kurtosis()])
+
+        x = repeat(np_rng.standard_normal(30) * 100, 20)
+
+        res = bank.compute_windows(x, 15, step)
+        truth = bank.compute(sliding_window_view(x, 15)[::step])
+
+        assert allclose(res, truth, equal_nan=True)
+        # windows inside a level have no skewness or kurtosis
+        inside = arange(0, x.size - 14, step) % 20 <= 5
+        assert isnan(res[3:, inside]).all()
+
+    def test_compute_windows_errors(self, np_rng):
+        bank = Bank()
+        bank.add([Mean(), DominantFrequency()])
+
+        with pytest.raises(ValueError):
+            bank.compute_windows(np_rng.random(100), 101, 1)
+        with pytest.raises(ValueError):
+            bank.compute_windows(np_rng.random(100), 10, 0)
+
+    @pytest.mark.parametrize("index_axis", (None, 1))
+    def test_duplicates(self, index_axis, np_rng):
+        bank = Bank()
+        bank.add([Mean(), DominantFrequency()])
+        with pytest.warns(UserWarning):
+            bank.add([Mean(), Range(), DominantFrequency()], [..., ..., [0, 1]])
+
+        assert bank._duplicates(bank._indices) == {2: 0}
+        assert bank._duplicates([...] * 5) == {2: 0, 4: 1}
+
+        x = np_rng.random((20, 3, 150))
+        res = bank.compute(x, 50.0, axis=-1, index_axis=index_axis)
+
+        truth = [ft.compute(x, fs=50.0, axis=-1) for ft in bank._feats]
+        if index_axis is None:
+            for r, t in zip(res, truth):
+                assert allclose(r, t)
+        else:
+            truth[4] = truth[4][:, :2]
+            assert allclose(res, concatenate(truth, axis=1))
+
+        resw = bank.compute_windows(x, 50, 10, 50.0, index_axis=index_axis)
+        xw = sliding_window_view(x, 50, axis=-1)[..., ::10, :]
+        truth = bank.compute(xw, 50.0, axis=-1, index_axis=index_axis)
+        assert allclose(resw, truth)
+
+    def test_compile(self, tmp_path, np_rng):
+        file = tmp_path / "bank.json"
+        bank = Bank()
+        bank.add([Mean(), StdDev(), Skewness()], [..., [0, 2], 1])
+        bank.save(file)
+
+        cbank = Bank(file).compile()
+
+        assert isinstance(cbank, CompiledBank)
+        assert cbank.compile() is cbank
+        assert cbank.names == ("Mean()", "StdDev()", "Skewness()")
+        assert len(cbank) == 3
+        assert Mean() in cbank
+
+        with pytest.raises(TypeError):
+            cbank.add(Kurtosis())
+        with pytest.raises(TypeError):
+            cbank.load(file)
+        x = np_rng.random((20, 3, 150))
+        for kw in ({}, {"index_axis": 1}, {"index_axis": 1, "indices": [0, 1, 2]}):
+            truth = bank.compute(x, 50.0, **kw)
+            assert (cbank.compute(x, 50.0, **kw) == truth).all()
+
+        cbank2 = pickle.loads(pickle.dumps(cbank))
+        assert cbank2.names == cbank.names
+        truth = bank.compute(x, 50.0, index_axis=1)
+        assert (cbank2.compute(x, 50.0, index_axis=1) == truth).all()
+
+        # the compiled bank is a copy
+        cbank = bank.compile()
+        bank.add(Kurtosis())
+        assert len(cbank) == 3
+
 
 class TestFeature:
     def test_eq(self):
@@ -37,6 +37,20 @@ class TestReadCwa:
             # were truncated by rounding
             assert allclose(res[k], ax6_truth[k], atol=5e-5)
 
+    @pytest.mark.parametrize("axes", (3, 6))
+    def test_plan_inspect(self, axes, ax3_file, ax6_file):
+        file = ax3_file if axes == 3 else ax6_file
+        res = ReadCwa().predict(file=file)
+        info = ReadCwa()._plan_inspect(file)
+
+        nbytes = sum(
+            res[k].nbytes for k in ["time", "temperature", "accel", "gyro"] if k in res
+        )
+
+        assert info["n_samples"] == res["accel"].shape[0]
+        assert info["fs"] == res["fs"]
+        assert info["nbytes"] == nbytes
+
     def test_extension(self):
         with NamedTemporaryFile(suffix=".abc") as tmpf:
             with pytest.warns(UserWarning, match=r"expected \[.cwa\]"):
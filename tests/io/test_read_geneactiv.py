@@ -21,6 +21,16 @@ class TestReadBin:
             # were truncated by rounding
             assert allclose(res[k], gnactv_truth[k], atol=5e-5)
 
+    def test_plan_inspect(self, gnactv_file):
+        res = ReadBin().predict(file=gnactv_file)
+        info = ReadBin()._plan_inspect(gnactv_file)
+
+        nbytes = sum(res[k].nbytes for k in ["time", "accel", "temperature", "light"])
+
+        assert info["n_samples"] == res["accel"].shape[0]
+        assert info["fs"] == res["fs"]
+        assert info["nbytes"] == nbytes
+
     def test_extension(self):
         with NamedTemporaryFile(suffix=".abc") as tmpf:
             with pytest.warns(UserWarning, match=r"expected \[.bin\]"):
@@ -0,0 +1,121 @@
+from tempfile import TemporaryDirectory
+from pathlib import Path
+
+import pytest
+from numpy import arange, allclose
+from pandas import read_csv, read_parquet, read_feather
+
+from skdh import Pipeline, BaseProcess, handle_process_returns
+from skdh.gait import GaitLumbar
+from skdh.io.writers import (
+    CSVWriter,
+    ParquetWriter,
+    FeatherWriter,
+    CohortParquetWriter,
+    get_writer,
+    read_result_metadata,
+)
+
+
+class ResultsProcess(BaseProcess):
+    def __init__(self, kw1=1):
+        super().__init__(kw1=kw1)
+        self.kw1 = kw1
+
+    @handle_process_returns(results_to_kwargs=False)
+    def predict(self, **kwargs):
+        super().predict(expect_days=False, expect_wear=False, **kwargs)
+
+        return {"a": arange(5) * self.kw1, "b": arange(5) / 2}
+
+
+@pytest.mark.parametrize(
+    ("fname", "wclass"),
+    (
+        ("res.csv", CSVWriter),
+        ("res.txt", CSVWriter),
+        ("res.parquet", ParquetWriter),
+        ("res.PQ", ParquetWriter),
+        ("res.feather", FeatherWriter),
+        ("res.arrow", FeatherWriter),
+    ),
+)
+def test_get_writer(fname, wclass):
+    assert isinstance(get_writer(fname), wclass)
+
+
+class TestWriters:
+    def test_csv(self):
+        proc = ResultsProcess(kw1=2)
+
+        with TemporaryDirectory() as tdir:
+            fname = proc.save_results(
+                proc.predict(file="subject1.bin"), str(Path(tdir) / "{file}.csv")
+            )
+            with open(fname) as f:
+                header = [f.readline() for _ in range(3)]
+            df = read_csv(fname, skiprows=5)
+
+        assert Path(fname).name == "subject1.csv"
+        assert header[0] == "Scikit-Digital-Health\n"
+        assert allclose(df["a"], arange(5) * 2)
+
+    @pytest.mark.parametrize(
+        ("suffix", "reader"), ((".parquet", read_parquet), (".feather", read_feather))
+    )
+    def test_columnar(self, suffix, reader):
+        pytest.importorskip("pyarrow")
+        proc = ResultsProcess(kw1=3)
+
+        with TemporaryDirectory() as tdir:
+            fname = proc.save_results(
+                proc.predict(file="subject1.bin"), str(Path(tdir) / f"{{file}}{suffix}")
+            )
+            df = reader(fname)
+            meta = read_result_metadata(fname)
+
+        assert df["a"].dtype.kind == "i"
+        assert allclose(df["a"], arange(5) * 3)
+        assert allclose(df["b"], arange(5) / 2)
+        assert meta["parameters"] == {"kw1": 3}
+        assert meta["process"] == "ResultsProcess"
+        assert meta["file"] == "subject1"
+
+    def test_cohort(self):
+        pytest.importorskip("pyarrow")
+        with TemporaryDirectory() as tdir:
+            p = Pipeline()
+            p.add(
+                ResultsProcess(kw1=2),
+                save_file=str(Path(tdir) / "cohort"),
+                writer=CohortParquetWriter(),
+            )
+
+            p.run(file="subject1.bin")
+            p.run(file="subject2.bin")
+
+            df = read_parquet(Path(tdir) / "cohort")
+            parts = sorted(i.name for i in (Path(tdir) / "cohort").iterdir())
+
+        assert parts == ["file=subject1", "file=subject2"]
+        assert df.shape[0] == 10
+        assert set(df["file"]) == {"subject1", "subject2"}
+
+    def test_pipeline_save_load(self):
+        p = Pipeline()
+        p.add(GaitLumbar(), save_file="res.parquet", writer=ParquetWriter("gzip"))
+
+        with TemporaryDirectory() as tdir:
+            fname = Path(tdir) / "pipe.skdh"
+            p.save(str(fname))
+
+            res = Pipeline._handle_load_input(None, str(fname))
+
+            p2 = Pipeline()
+            p2.load(str(fname))
+
+        assert res["Steps"][0]["writer"] == {
+            "name": "ParquetWriter",
+            "parameters": {"compression": "gzip"},
+        }
+        assert p2._steps[0].pipe_writer == ParquetWriter(compression="gzip")
@@ -6,6 +6,7 @@ from skdh.preprocessing.wear_detection import (
     DETACH,
     CountWearDetection,
 )
+from skdh.utility.internal import apply_resample
 
 
 class TestDETACH:
@@ -107,6 +108,33 @@ class TestCountWearDetection:
 
         assert allclose(res["wear"], wear_true)
 
+    def test_polyphase(self, np_rng, monkeypatch):
+        from skdh.utility import activity_counts
+
+        calls = []
+
+        def spy(**kwargs):
+            calls.append(kwargs["polyphase"])
+            return apply_resample(**kwargs)
+
+        monkeypatch.setattr(activity_counts, "apply_resample", spy)
+
+        fs = 50.0
+        t = arange(0, 3600 * 4, 1 / fs)
+        x = zeros((t.size, 3))
+        x[:, 2] = 1.0
+        # wear in the middle 2 hours
+        i1, i2 = int(3600 * fs), int(3 * 3600 * fs)
+        x[i1:i2] = np_rng.normal(scale=0.1, size=(i2 - i1, 3))
+
+        res = CountWearDetection().predict(time=t, accel=x, fs=fs)
+        res_poly = CountWearDetection(downsample_polyphase=True).predict(
+            time=t, accel=x, fs=fs
+        )
+
+        assert calls == [False, True]
+        assert allclose(res_poly["wear"], res["wear"])
+
 
 class TestDetectWearAccelThreshold:
     @pytest.mark.parametrize(("setup", "ship"), ((False, [0, 0]), (True, [12, 12])))
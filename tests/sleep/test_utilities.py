@@ -5,6 +5,7 @@ Yiorgos Christakis
 Pfizer DMTI 2021
 """
 
+import pytest
 import numpy as np
 
 from skdh.utility import moving_median
@@ -137,6 +138,27 @@ class TestDropMinBlocks:
         expected = np.asarray([1, 1, 0, 3, 0, 0, 0, 0, 1, 1])
         assert np.array_equal(out, expected)
 
+    @pytest.mark.parametrize("min_block_size", (0, -1))
+    def test_no_minimum(self, min_block_size):
+        arr = np.asarray([1, 1, 0, 1, 0, 0, 0, 0, 1, 1])
+        out = drop_min_blocks(
+            arr,
+            min_block_size=min_block_size,
+            drop_value=1,
+            replace_value=3,
+            skip_bounds=False,
+        )
+        expected = np.asarray([1, 1, 0, 1, 0, 0, 0, 0, 1, 1])
+        assert np.array_equal(out, expected)
+
+    def test_fractional_size(self):
+        arr = np.asarray([1, 1, 0, 1, 0, 0, 0, 0, 1, 1, 1])
+        out = drop_min_blocks(
+            arr, min_block_size=2.5, drop_value=1, replace_value=3, skip_bounds=False
+        )
+        expected = np.asarray([3, 3, 0, 3, 0, 0, 0, 0, 1, 1, 1])
+        assert np.array_equal(out, expected)
+
 
 class TestArgLongestBout:
     def test(self):
@@ -1,10 +1,32 @@
 import pytest
-from numpy import allclose, array, arange
+from numpy import (
+    allclose,
+    array,
+    arange,
+    zeros,
+    array_equal,
+    interp,
+    around,
+    nonzero,
+    diff,
+)
+from numpy.linalg import norm
+from scipy.signal import resample_poly, cheby1, sosfiltfilt
+
+from skdh.utility import moving_mean, moving_sd, moving_median, moving_stats
 
+from skdh.utility import internal
 from skdh.utility.internal import (
     get_day_index_intersection,
+    get_days_index_intersection,
+    IntervalSet,
+    remap_indices,
     apply_resample,
+    SignalCache,
+    get_derived_signal,
     rle,
+    irle,
+    replace_runs,
     invert_indices,
 )
 
@@ -75,18 +97,15 @@ class TestGetDayIndexIntersection:
         true_starts = array([200, 380])
         true_stops = array([230, 400])
 
-        # FOR NOW, this will raise an error with unsupported behavior
+        p_starts, p_stops = get_day_index_intersection(
+            starts, stops, True, day_start, day_stop
+        )
 
-        with pytest.raises(NotImplementedError):
-            p_starts, p_stops = get_day_index_intersection(
-                starts, stops, True, day_start, day_stop
-            )
+        assert p_starts.size == true_starts.size
+        assert p_stops.size == true_stops.size
 
-        # assert p_starts.size == true_starts.size
-        # assert p_stops.size == true_stops.size
-        #
-        # assert allclose(p_starts, true_starts)
-        # assert allclose(p_stops, true_stops)
+        assert allclose(p_starts, true_starts)
+        assert allclose(p_stops, true_stops)
 
     def test_wear_only(self, day_ends, wear_ends):
         day_start, day_stop = day_ends
@@ -155,6 +174,102 @@ class TestGetDayIndexIntersection:
         assert starts[0] == 0
         assert stops[0] == 4000
 
+    def test_exclusion_covers_window(self):
+        starts, stops = get_day_index_intersection(
+            (array([0, 100]), array([90])),
+            (array([50, 150]), array([200])),
+            (True, False),
+            0,
+            200,
+        )
+
+        assert allclose(starts, [0])
+        assert allclose(stops, [50])
+
+    def test_days(self, np_rng):
+        wear_starts = array([0, 300, 900, 1500])
+        wear_stops = array([250, 800, 1400, 2000])
+        sleep_starts = array([-1, 200, 1300, -1])
+        sleep_stops = array([-1, 450, 1600, -1])
+        day_starts = array([0, 500, 1000, 1500])
+        day_stops = array([500, 1000, 1500, 2000])
+
+        res = get_days_index_intersection(
+            (wear_starts, sleep_starts),
+            (wear_stops, sleep_stops),
+            (True, False),
+            day_starts,
+            day_stops,
+        )
+
+        assert len(res) == day_starts.size
+        for (p_starts, p_stops), d0, d1 in zip(res, day_starts, day_stops):
+            t_starts, t_stops = get_day_index_intersection(
+                (wear_starts, sleep_starts),
+                (wear_stops, sleep_stops),
+                (True, False),
+                d0,
+                d1,
+            )
+            assert array_equal(p_starts, t_starts)
+            assert array_equal(p_stops, t_stops)
+
+
+def to_mask(intervals, n):
+    m = zeros(n, dtype=bool)
+    for s, e in intervals:
+        m[s:e] = True
+    return m
+
+
+class TestIntervalSet:
+    def test_normalize(self):
+        iset = IntervalSet([50, 5, 115, 215, 300, 310], [100, 110, 230, 220, 310, 310])
+
+        assert allclose(iset.starts, [5, 115, 300])
+        assert allclose(iset.stops, [110, 230, 310])
+        assert iset.total == 230
+        # touching intervals are merged
+        assert IntervalSet([0, 10], [10, 20]) == IntervalSet([0], [20])
+
+    def test_size_error(self):
+        with pytest.raises(ValueError):
+            IntervalSet([0, 1], [5])
+
+    def test_from_mask(self, np_rng):
+        mask = np_rng.random(500) > 0.5
+        iset = IntervalSet.from_mask(mask)
+
+        assert array_equal(to_mask(iset, 500), mask)
+        assert iset == IntervalSet(iset.starts, iset.stops)
+
+    def test_operations(self, np_rng):
+        n = 1000
+        m1, m2, m3 = (np_rng.random((3, n)) > 0.4) | (np_rng.random((3, n)) > 0.9)
+        a, b, c = (IntervalSet.from_mask(m) for m in (m1, m2, m3))
+
+        assert array_equal(to_mask(a | b, n), m1 | m2)
+        assert array_equal(to_mask(a.union(b, c), n), m1 | m2 | m3)
+        assert array_equal(to_mask(a & b, n), m1 & m2)
+        assert array_equal(to_mask(a.intersection(b, c), n), m1 & m2 & m3)
+        assert array_equal(to_mask(a - b, n), m1 & ~m2)
+        assert array_equal(to_mask(a.difference(b, c), n), m1 & ~m2 & ~m3)
+        assert array_equal(to_mask(a.invert(0, n), n), ~m1)
+
+    def test_clip(self, np_rng):
+        n = 1000
+        mask = np_rng.random(n) > 0.5
+        iset = IntervalSet.from_mask(mask)
+        starts = array([0, 100, 333, 700, 999])
+        stops = array([100, 333, 700, 999, 1000])
+
+        for res, s, e in zip(iset.clip_many(starts, stops), starts, stops):
+            truth = zeros(n, dtype=bool)
+            truth[s:e] = mask[s:e]
+
+            assert res == iset.clip(s, e)
+            assert array_equal(to_mask(res, n), truth)
+
 
 class TestApplyResample:
     def test_downsample(self, np_rng):
@@ -213,6 +328,226 @@ class TestApplyResample:
         assert allclose(x_rs, arange(0, t.size - 1, 0.5))
         assert allclose(ix_rs, [4, 8, 12])
 
+    @pytest.mark.parametrize("chunk", (40, 2**16))
+    def test_polyphase(self, chunk, np_rng, monkeypatch):
+        monkeypatch.setattr(internal, "_POLYPHASE_CHUNK", chunk)
+        t = arange(0, 100, 0.01)
+        x = np_rng.random((t.size, 3))
+        y = np_rng.random(t.size)
+
+        trs, (x_rs, y_rs) = apply_resample(
+            time=t, goal_fs=30.0, data=(x, y), fs=100.0, polyphase=True
+        )
+
+        assert allclose(trs, arange(0, t[-1], 1 / 30))
+        assert x_rs.shape == (trs.size, 3)
+        assert allclose(x_rs, resample_poly(x, 3, 10, axis=0)[: trs.size])
+        assert allclose(y_rs, resample_poly(y, 3, 10)[: trs.size])
+
+    def test_polyphase_off(self, np_rng):
+        t = arange(0, 100, 0.01)
+        x = np_rng.random((t.size, 3))
+
+        # off by default
+        trs, (x_rs,) = apply_resample(time=t, goal_fs=30.0, data=(x,), fs=100.0)
+        sos = cheby1(8, 0.05, 0.8 / (100 / 30), output="sos")
+        x_f = sosfiltfilt(sos, x, axis=0)
+
+        assert allclose(x_rs[:, 1], interp(trs, t, x_f[:, 1]))
+
+    def test_polyphase_cached(self, np_rng):
+        t = arange(0, 100, 0.01)
+        x = np_rng.random((t.size, 3))
+
+        with SignalCache():
+            _, (x_poly,) = apply_resample(
+                time=t, goal_fs=30.0, data=(x,), fs=100.0, polyphase=True
+            )
+            trs, (x_rs,) = apply_resample(
+                time=t, goal_fs=30.0, data=(x,), fs=100.0, polyphase=False
+            )
+            _, (x_poly2,) = apply_resample(
+                time=t, goal_fs=30.0, data=(x,), fs=100.0, polyphase=True
+            )
+        sos = cheby1(8, 0.05, 0.8 / (100 / 30), output="sos")
+        x_f = sosfiltfilt(sos, x, axis=0)
+
+        # each resampling method gets its own result
+        assert allclose(x_rs[:, 1], interp(trs, t, x_f[:, 1]))
+        assert allclose(x_poly, resample_poly(x, 3, 10, axis=0)[: trs.size])
+        assert x_poly2 is x_poly
+
+
+class TestRemapIndices:
+    @pytest.mark.parametrize("regular", (True, False))
+    def test(self, regular, np_rng):
+        time_rs = arange(0, 100, 0.05)
+        if not regular:
+            # add a gap
+            time_rs = time_rs[(time_rs < 40) | (time_rs > 55)]
+        t = np_rng.uniform(-1, 101, (50, 2))
+
+        truth = around(interp(t, time_rs, arange(time_rs.size))).astype(int)
+        pred = remap_indices(t, time_rs, fs=20.0 if regular else None)
+
+        assert pred.shape == t.shape
+        assert array_equal(pred, truth)
+
+    def test_short(self):
+        assert array_equal(remap_indices(array([0.5, 2.0]), array([1.0])), [0, 0])
+
+    def test_repeated(self):
+        time_rs = array([1.0, 1.0, 2.0, 3.0, 3.0])
+        t = array([0.0, 1.0, 1.4, 2.5, 3.0, 4.0])
+
+        pred = remap_indices(t, time_rs)
+
+        assert array_equal(pred, [0, 1, 1, 2, 4, 4])
+
+
+class TestSignalCache:
+    def test(self, np_rng):
+        t = arange(0, 10, 0.01)
+        x = np_rng.random((t.size, 3))
+        ix = array([100, 200, 300])
+
+        ref = apply_resample(time=t, goal_fs=20.0, data=(x,), indices=(ix,), fs=100.0)
+
+        with SignalCache() as cache:
+            r1 = apply_resample(
+                time=t, goal_fs=20.0, data=(x,), indices=(ix,), fs=100.0
+            )
+            # indices are keyed on content, not identity
+            r2 = apply_resample(
+                time=t, goal_fs=20.0, data=(x,), indices=(ix.copy(),), fs=100.0
+            )
+            assert cache.hits == 3
+            assert cache.misses == 3
+
+            # different settings are computed separately
+            r3 = apply_resample(
+                time=t, goal_fs=20.0, data=(x,), aa_filter=False, fs=100.0
+            )
+            r4 = apply_resample(time=t, goal_fs=25.0, data=(x,), fs=100.0)
+            assert len(cache) == 6
+
+        assert len(cache) == 0
+
+        assert r1[0] is r2[0]
+        assert r1[1][0] is r2[1][0]
+        assert r1[2][0] is r2[2][0]
+        assert allclose(r1[1][0], ref[1][0])
+        assert allclose(r1[2][0], ref[2][0])
+
+        assert r3[1][0] is not r1[1][0]
+        assert allclose(r3[1][0], x[::5])
+        assert r4[0].size == 250
+
+    def test_not_active(self, np_rng):
+        t = arange(0, 10, 0.01)
+        x = np_rng.random((t.size, 3))
+
+        with SignalCache():
+            pass
+
+        r1 = apply_resample(time=t, goal_fs=20.0, data=(x,), fs=100.0)
+        r2 = apply_resample(time=t, goal_fs=20.0, data=(x,), fs=100.0)
+
+        assert r1[1][0] is not r2[1][0]
+
+    def test_eviction(self, np_rng):
+        x = np_rng.random((1000, 3))
+        y = np_rng.random((1000, 3))
+        nb = x.shape[0] * 8  # size of the magnitude
+
+        with SignalCache(max_bytes=int(1.5 * nb)) as cache:
+            m1 = get_derived_signal("magnitude", x)
+            get_derived_signal("magnitude", y)  # evicts the magnitude of x
+            m2 = get_derived_signal("magnitude", x)
+
+            assert cache.evictions == 2
+            assert cache.nbytes == nb
+            assert len(cache) == 1
+
+            # too large to cache
+            get_derived_signal("moving_mean", x, w_len=5, skip=1, axis=0)
+            assert len(cache) == 1
+
+        assert m1 is not m2
+        assert allclose(m1, m2)
+
+
+class TestGetDerivedSignal:
+    def test_magnitude(self, np_rng):
+        x = np_rng.random((500, 3))
+
+        with SignalCache() as cache:
+            m1 = get_derived_signal("magnitude", x)
+            # views of the same memory share results
+            m2 = get_derived_signal("magnitude", x[10:200])
+            m3 = get_derived_signal("magnitude", x[10:200])
+
+        assert allclose(m1, norm(x, axis=1))
+        assert allclose(m2, m1[10:200])
+        assert m2 is m3
+        assert cache.hits == 1
+
+    def test_moving_sd(self, np_rng):
+        x = np_rng.random((500, 3))
+
+        with SignalCache() as cache:
+            sd, mn = get_derived_signal("moving_sd", x, w_len=10, skip=10, axis=0)
+            sd2 = get_derived_signal(
+                "moving_sd", x, w_len=10, skip=10, axis=0, return_previous=False
+            )
+            # default parameters are part of the canonical key
+            sd3 = get_derived_signal(
+                "moving_sd", x, w_len=10, skip=10, axis=0, trim=True
+            )[0]
+
+        assert sd is sd2
+        assert sd is sd3
+        assert cache.misses == 1
+        assert allclose(sd, moving_sd(x, 10, 10, axis=0, return_previous=False))
+        assert allclose(mn, moving_mean(x, 10, 10, axis=0))
+
+    def test_moving_stats(self, np_rng):
+        x = np_rng.random((500, 3))
+        stats = ("sd", "max", "min")
+
+        with SignalCache() as cache:
+            sd, mx, mn = get_derived_signal(
+                "moving_stats", x, w_len=10, skip=10, stats=stats, axis=0
+            )
+            # the SD and mean are shared with "moving_sd"
+            sd2, mean = get_derived_signal("moving_sd", x, w_len=10, skip=10, axis=0)
+
+        assert sd is sd2
+        assert cache.hits == 1
+        for r, t in zip((sd, mx, mn), moving_stats(x, 10, 10, stats, axis=0)):
+            assert allclose(r, t)
+        assert allclose(mean, moving_mean(x, 10, 10, axis=0))
+
+        with SignalCache() as cache:
+            sd, _ = get_derived_signal("moving_sd", x, w_len=10, skip=10, axis=0)
+            sd2, mx = get_derived_signal(
+                "moving_stats", x, w_len=10, skip=10, stats=["sd", "max"], axis=0
+            )
+
+        assert sd is sd2
+        assert allclose(mx, moving_stats(x, 10, 10, ("max",), axis=0)[0])
+
+    def test_moving_median(self, np_rng):
+        x = np_rng.random((500, 3))
+
+        res = get_derived_signal("moving_median", x, w_len=11, axis=0)
+
+        assert allclose(res, moving_median(x, 11, 1, axis=0))
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            get_derived_signal("not_a_signal", array([1.0, 2.0]))
+
 
 class TestRLE:
     def test_full_expected_input(self, rle_arr, rle_truth):
@@ -230,6 +565,83 @@ class TestRLE:
         assert allclose(starts, [0])
         assert allclose(vals, [0])
 
+    @pytest.mark.parametrize("dtype", ("bool", "int8", "int32", "int64", "float64"))
+    def test_dtypes(self, dtype, np_rng):
+        x = np_rng.integers(0, 2, 1000).astype(dtype)
+        starts = nonzero(diff(x.astype(int)))[0] + 1
+
+        lengths, p_starts, vals = rle(x)
+
+        assert array_equal(p_starts[1:], starts)
+        assert lengths.sum() == x.size
+        assert vals.dtype == x.dtype
+        assert array_equal(irle(lengths, vals), x)
+
+    @pytest.mark.parametrize("n", (1, 16, 17, 33, 100))
+    def test_sizes(self, n, np_rng):
+        x = np_rng.random(n) > 0.9
+
+        lengths, starts, vals = rle(x)
+
+        assert lengths.sum() == n
+        assert array_equal(irle(lengths, vals), x)
+        assert array_equal(starts[1:], nonzero(diff(x))[0] + 1)
+
+    def test_empty(self):
+        lengths, starts, vals = rle(array([], dtype=bool))
+
+        assert lengths.size == starts.size == vals.size == 0
+
+
+def replace_runs_truth(x, value, replacement, max_length, skip_bounds, nb_length):
+    lengths, starts, vals = rle(x)
+    x = x.copy()
+    for i, (l, s, v) in enumerate(zip(lengths, starts, vals)):
+        bound = i == 0 or i == lengths.size - 1
+        if v != value or l > max_length or (skip_bounds and bound):
+            continue
+        if nb_length > 0:
+            if bound or lengths[i - 1] < nb_length or lengths[i + 1] < nb_length:
+                continue
+        x[s : s + l] = replacement
+    return x
+
+
+class TestReplaceRuns:
+    @pytest.mark.parametrize("skip_bounds", (True, False))
+    @pytest.mark.parametrize("nb_length", (0, 3))
+    @pytest.mark.parametrize("dtype", ("bool", "int64"))
+    def test(self, skip_bounds, nb_length, dtype, np_rng):
+        x = (np_rng.random(500) > 0.6).astype(dtype)
+        truth = replace_runs_truth(x, 1, 0, 2, skip_bounds, nb_length)
+
+        res, n = replace_runs(
+            x,
+            1,
+            0,
+            max_length=2,
+            skip_bounds=skip_bounds,
+            neighbor_min_length=nb_length,
+        )
+
+        assert res is x
+        assert n > 0
+        assert array_equal(x, truth)
+
+    def test_min_length(self):
+        x = array([0, 1, 1, 0, 2, 2, 2, 2, 0, 2])
+
+        _, n = replace_runs(x, 2, -1, min_length=2, max_length=4)
+
+        assert n == 1
+        assert array_equal(x, [0, 1, 1, 0, -1, -1, -1, -1, 0, 2])
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            replace_runs(array([0.0, 1.0]), 1, 0)
+        with pytest.raises(ValueError):
+            replace_runs(arange(10)[::2], 1, 0)
+
 
 class TestInvertIndices:
     def test(self):
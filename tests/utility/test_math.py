@@ -1,7 +1,21 @@
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
-from numpy import allclose, isclose, mean, std, median, max, min, nan, full, random
+from numpy import (
+    allclose,
+    isclose,
+    mean,
+    std,
+    median,
+    max,
+    min,
+    nan,
+    isnan,
+    full,
+    random,
+    quantile,
+)
 from scipy.stats import skew, kurtosis
 
 from skdh.utility.windowing import get_windowed_view
@@ -11,8 +25,10 @@ from skdh.utility.math import (
     moving_skewness,
     moving_kurtosis,
     moving_median,
+    moving_quantile,
     moving_max,
     moving_min,
+    moving_stats,
     DFA,
 )
 
@@ -154,6 +170,72 @@ class BaseMovingStatsTester:
 
             assert allclose(pred, truth, equal_nan=True)
 
+    @pytest.mark.parametrize("axis", (0, -1))
+    @pytest.mark.parametrize("n_threads", (2, 4, -1))
+    def test_n_threads(self, axis, n_threads, np_rng):
+        x = np_rng.random((3, 7, 1000)) if axis == -1 else np_rng.random((1000, 3, 7))
+
+        truth = self.function(x, 100, 7, trim=False, axis=axis)
+        pred = self.function(x, 100, 7, trim=False, axis=axis, n_threads=n_threads)
+
+        if isinstance(truth, tuple):
+            for p, t in zip(pred, truth):
+                assert allclose(p, t, equal_nan=True)
+        else:
+            assert allclose(pred, truth, equal_nan=True)
+
+    @pytest.mark.parametrize("n_threads", (1, 3))
+    def test_strided(self, n_threads, np_rng):
+        # computation axis is strided, and is used without a copy
+        x = np_rng.random((2000, 3))
+
+        truth = self.function(x.T.copy(), 150, 7, trim=False)
+        pred = self.function(x, 150, 7, trim=False, axis=0, n_threads=n_threads)
+
+        if isinstance(truth, tuple):
+            for p, t in zip(pred, truth):
+                assert allclose(p, t.T, equal_nan=True)
+        else:
+            assert allclose(pred, truth.T, equal_nan=True)
+
+    @pytest.mark.parametrize("n_threads", (1, 3))
+    def test_out(self, n_threads, np_rng):
+        x = np_rng.random((2000, 3))
+
+        truth = self.function(x, 150, 7, axis=0)
+        if isinstance(truth, tuple):
+            out = tuple(full(t.shape, 5.0) for t in truth)
+        else:
+            out = full(truth.shape, 5.0)
+        pred = self.function(x, 150, 7, axis=0, n_threads=n_threads, out=out)
+
+        assert pred is out
+        if isinstance(truth, tuple):
+            for p, t in zip(pred, truth):
+                assert allclose(p, t)
+        else:
+            assert allclose(pred, truth)
+
+    def test_out_error(self, np_rng):
+        x = np_rng.random((2000, 3))
+        truth = self.function(x, 150, 7, axis=0)
+        shape = (truth[0] if isinstance(truth, tuple) else truth).shape
+
+        with pytest.raises(ValueError):
+            self.function(x, 150, 7, axis=0, out=full(shape[::-1], 0.0))
+
+    def test_concurrent_calls(self, np_rng):
+        # kernels must not share any state between calls running in parallel
+        x = np_rng.random(5000)
+        w_lens = [51, 150, 250, 400] * 4
+
+        truth = [self.function(x, w, 3) for w in w_lens]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            pred = list(pool.map(lambda w: self.function(x, w, 3), w_lens))
+
+        for p, t in zip(pred, truth):
+            assert allclose(p, t, equal_nan=True)
+
 
 class TestMovingMean(BaseMovingStatsTester):
     function = staticmethod(moving_mean)
@@ -190,6 +272,41 @@ class TestMovingMedian(BaseMovingStatsTester):
     truth_kw = {}
 
 
+class TestMovingQuantile(BaseMovingStatsTester):
+    function = staticmethod(
+        lambda a, w_len, skip, **kw: moving_quantile(a, w_len, skip, 0.3, **kw)
+    )
+    truth_function = staticmethod(lambda x, axis: quantile(x, 0.3, axis=axis))
+    truth_kw = {}
+
+    @pytest.mark.parametrize("w_len", (1, 2, 5, 100, 101))
+    @pytest.mark.parametrize("skip", (1, 3, 150))
+    def test_multiple(self, w_len, skip, np_rng):
+        x = np_rng.random((1000, 2))
+        xw = get_windowed_view(x, w_len, skip)
+        q = [0, 0.1, 0.25, 0.5, 0.9, 1.0]
+
+        pred = moving_quantile(x, w_len, skip, q, axis=0)
+        truth = quantile(xw, q, axis=1)
+
+        assert pred.shape == truth.shape
+        assert allclose(pred, truth)
+
+    def test_median_min_max(self, np_rng):
+        x = np_rng.random((3, 1000))
+
+        pred = moving_quantile(x, 250, 7, [0, 0.5, 1])
+
+        assert allclose(pred[0], moving_min(x, 250, 7))
+        assert allclose(pred[1], moving_median(x, 250, 7))
+        assert allclose(pred[2], moving_max(x, 250, 7))
+
+    @pytest.mark.parametrize("q", (-0.1, 1.1, [0.5, 2], [[0.5]]))
+    def test_quantile_error(self, q, np_rng):
+        with pytest.raises(ValueError):
+            moving_quantile(np_rng.random(100), 10, 1, q)
+
+
 class TestMovingMax(BaseMovingStatsTester):
     function = staticmethod(moving_max)
     truth_function = staticmethod(max)
@@ -217,3 +334,112 @@ def test_DFA(np_rng):
     assert allclose(box_sizes, [4, 8, 12])
     assert allclose(dfa, [0.12859269, 0.20931833, 0.25553007])
     assert allclose(alpha, 0.6334340246131107)
+
+
+def test_DFA_batch(np_rng):
+    x = np_rng.random((4, 1000))
+
+    box_sizes, dfa, alpha, abi = DFA(x)
+
+    assert dfa.shape == (4, box_sizes.size)
+    assert alpha.shape == abi.shape == (4,)
+    for i in range(4):
+        _, dfa_i, alpha_i, abi_i = DFA(x[i])
+        assert allclose(dfa[i], dfa_i)
+        assert isclose(alpha[i], alpha_i)
+        assert isclose(abi[i], abi_i)
+
+
+class TestMovingStats:
+    functions = {
+        "mean": moving_mean,
+        "sd": lambda *a, **k: moving_sd(*a, return_previous=False, **k),
+        "min": moving_min,
+        "max": moving_max,
+        "median": moving_median,
+    }
+
+    @pytest.mark.parametrize(
+        "stats",
+        (
+            ("mean", "sd", "min", "max", "median"),
+            ("sd",),
+            ("median", "mean"),
+            ("max", "min", "sd"),
+        ),
+    )
+    @pytest.mark.parametrize("trim", (True, False))
+    @pytest.mark.parametrize("skip", (1, 7, 300))
+    def test(self, stats, trim, skip, np_rng):
+        x = np_rng.random((2000, 3))
+
+        res = moving_stats(x, 150, skip, stats=stats, trim=trim, axis=0)
+
+        assert len(res) == len(stats)
+        for s, r in zip(stats, res):
+            truth = self.functions[s](x, 150, skip, trim=trim, axis=0)
+            assert r.shape == truth.shape
+            assert allclose(r, truth, equal_nan=True)
+
+    @pytest.mark.parametrize(
+        ("w_len", "skip"),
+        ((1, 1), (2, 3), (5, 5), (7, 2), (10, 25), (150, 149), (999, 1), (1000, 1)),
+    )
+    def test_extrema(self, w_len, skip, np_rng):
+        x = np_rng.random(1000)
+        xw = get_windowed_view(x, w_len, skip)
+
+        rmin, rmax = moving_stats(x, w_len, skip, stats=("min", "max"))
+
+        assert allclose(rmin, xw.min(axis=1))
+        assert allclose(rmax, xw.max(axis=1))
+
+    @pytest.mark.parametrize(("w_len", "skip"), ((3, 1), (10, 3), (150, 30), (250, 1)))
+    def test_extrema_nan(self, w_len, skip, np_rng):
+        x = np_rng.random(3000)
+        x[np_rng.choice(x.size, 10, replace=False)] = nan
+        x[1] = nan
+        xw = get_windowed_view(x, w_len, skip)
+
+        rmin, rmax = moving_stats(x, w_len, skip, stats=("min", "max"))
+
+        assert isnan(rmax[0]) and isnan(rmin[0])
+        assert allclose(rmin, xw.min(axis=1), equal_nan=True)
+        assert allclose(rmax, xw.max(axis=1), equal_nan=True)
+
+    def test_n_threads(self, np_rng):
+        x = np_rng.random((3, 5, 1000))
+
+        truth = moving_stats(x, 100, 10)
+        pred = moving_stats(x, 100, 10, n_threads=3)
+
+        for p, t in zip(pred, truth):
+            assert allclose(p, t)
+
+    @pytest.mark.parametrize("n_threads", (1, 3))
+    def test_out(self, n_threads, np_rng):
+        x = np_rng.random((2000, 3))
+        stats = ("median", "max", "sd")
+
+        truth = moving_stats(x, 100, 10, stats=stats, axis=0)
+        out = tuple(full(t.shape, 5.0) for t in truth)
+        pred = moving_stats(
+            x, 100, 10, stats=stats, axis=0, n_threads=n_threads, out=out
+        )
+
+        assert pred is out
+        for p, t in zip(pred, truth):
+            assert allclose(p, t)
+
+    def test_out_error(self, np_rng):
+        with pytest.raises(ValueError):
+            moving_stats(np_rng.random(100), 10, 1, stats=("mean",), out=full(91, 0.0))
+
+    @pytest.mark.parametrize("stats", ((), ("mean", "iqr")))
+    def test_stats_error(self, stats, np_rng):
+        with pytest.raises(ValueError):
+            moving_stats(np_rng.random(100), 10, 1, stats=stats)
+
+    def test_window_length_error(self, np_rng):
+        with pytest.raises(ValueError):
+            moving_stats(np_rng.random((5, 10)), 11, 1)
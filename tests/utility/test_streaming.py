@@ -0,0 +1,132 @@
+import pytest
+from numpy import allclose, concatenate, cumsum, split
+
+from skdh.utility.math import (
+    moving_mean,
+    moving_sd,
+    moving_skewness,
+    moving_kurtosis,
+    moving_median,
+    moving_max,
+    moving_min,
+)
+from skdh.utility.streaming import (
+    MovingMean,
+    MovingSD,
+    MovingSkewness,
+    MovingKurtosis,
+    MovingMedian,
+    MovingMax,
+    MovingMin,
+)
+
+CLASSES = (
+    (MovingMean, moving_mean),
+    (MovingSD, moving_sd),
+    (MovingSkewness, moving_skewness),
+    (MovingKurtosis, moving_kurtosis),
+    (MovingMedian, moving_median),
+    (MovingMax, moving_max),
+    (MovingMin, moving_min),
+)
+
+
+def stream(obj, x, chunk_sizes, axis):
+    idx = cumsum(chunk_sizes)
+    parts = [obj.update(c) for c in split(x, idx[idx < x.shape[axis]], axis=axis)]
+
+    if isinstance(parts[0], tuple):
+        return tuple(concatenate(p, axis=axis) for p in zip(*parts))
+    return concatenate(parts, axis=axis)
+
+
+def assert_parity(pred, truth):
+    if isinstance(truth, tuple):
+        assert len(pred) == len(truth)
+        for p, t in zip(pred, truth):
+            assert p.shape == t.shape
+            assert allclose(p, t)
+    else:
+        assert pred.shape == truth.shape
+        assert allclose(pred, truth)
+
+
+@pytest.mark.parametrize(("cls", "fn"), CLASSES)
+class TestStreaming:
+    @pytest.mark.parametrize(
+        ("w_len", "skip"), ((50, 1), (50, 7), (50, 50), (50, 80), (3, 200))
+    )
+    @pytest.mark.parametrize("chunk", (1, 13, 64, 500))
+    def test_parity(self, cls, fn, w_len, skip, chunk, np_rng):
+        x = np_rng.random(2000)
+
+        truth = fn(x, w_len, skip)
+        pred = stream(cls(w_len, skip), x, [chunk] * (x.size // chunk + 1), -1)
+
+        assert_parity(pred, truth)
+
+    def test_parity_random_chunks(self, cls, fn, np_rng):
+        x = np_rng.random((3000, 3))
+        chunks = np_rng.integers(1, 300, 100)
+
+        truth = fn(x, 100, 25, axis=0)
+        pred = stream(cls(100, 25, axis=0), x, chunks, 0)
+
+        assert_parity(pred, truth)
+
+    def test_short_update(self, cls, fn, np_rng):
+        obj = cls(10, 5)
+        res = obj.update(np_rng.random((3, 4)))
+
+        for r in res if isinstance(res, tuple) else (res,):
+            assert r.shape == (3, 0)
+
+    def test_reset(self, cls, fn, np_rng):
+        x = np_rng.random(500)
+        obj = cls(50, 10)
+
+        obj.update(np_rng.random(77))
+        obj.reset()
+
+        assert_parity(obj.update(x), fn(x, 50, 10))
+
+    def test_shape_mismatch(self, cls, fn, np_rng):
+        obj = cls(10, 5)
+        obj.update(np_rng.random((3, 4)))
+
+        with pytest.raises(ValueError):
+            obj.update(np_rng.random((2, 4)))
+
+    @pytest.mark.parametrize("args", ((-1, 10), (10, -1), (0, 5)))
+    def test_negative_error(self, cls, fn, args):
+        with pytest.raises(ValueError):
+            cls(*args)
+
+
+def test_return_previous(np_rng):
+    x = np_rng.random(1000)
+    obj = MovingSD(100, 10, return_previous=False)
+
+    assert_parity(stream(obj, x, [37] * 30, -1), moving_sd(x, 100, 10)[0])
+
+
+@pytest.mark.parametrize(
+    ("cls", "fn"),
+    ((MovingMedian, moving_median), (MovingMax, moving_max), (MovingMin, moving_min)),
+)
+class TestWindowStatistic:
+    @pytest.mark.parametrize(("w_len", "skip"), ((1, 1), (1, 3), (2, 1)))
+    def test_short_windows(self, cls, fn, w_len, skip, np_rng):
+        x = np_rng.random((2, 300))
+
+        pred = stream(cls(w_len, skip), x, [1] * 300, -1)
+
+        assert_parity(pred, fn(x, w_len, skip))
+
+    def test_reset_shape(self, cls, fn, np_rng):
+        obj = cls(10, 5)
+        obj.update(np_rng.random((3, 40)))
+        obj.reset()
+
+        x = np_rng.random((2, 40))
+        assert_parity(obj.update(x), fn(x, 10, 5))